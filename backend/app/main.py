@@ -1,17 +1,34 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException, Query
+from fastapi import FastAPI, UploadFile, File, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 from typing import List, Optional
+import asyncio
 import os
+from dataclasses import asdict
 from dotenv import load_dotenv
 
-from .services.resume_parser import parse_resume
-from .services.scraper import scrape_institutions
-from .services.matching import rank_professors
-from .services.email_generator import generate_cold_email
-
+# Load .env before the services read their configuration at import time
 load_dotenv()
 
+from .services.cache import match_cache, match_cache_key, parsed_resume_cache
+from .services.http_client import close_http_client
+from .services.resume_parser import preload_resume_parser
+from .services.parse_pool import ParserBusy, ParseTimeout, close_parse_pool, get_parse_pool
+from .services.catalog import ensure_fresh, get_catalog, refresh_loop
+from .services.scraper import close_selenium_pool
+from .services.matching import (
+    rank_professors,
+    rank_professors_batch,
+    load_scorer,
+    is_scorer_ready,
+    index_version,
+    close_index_writer,
+    RANKING_VERSION,
+    ScorerNotReady,
+)
+from .services.email_generator import generate_cold_email
+
 app = FastAPI(title="Labmate API", version="1.0.0")
 
 # CORS middleware
@@ -32,6 +49,18 @@ ALLOWED_INSTITUTIONS = [
     "Seton Hall",
 ]
 
+# Upper bound on resumes accepted by one /match/batch call
+MAX_BATCH_RESUMES = int(os.getenv("MAX_BATCH_RESUMES", "50"))
+# Largest resume PDF accepted, in bytes
+MAX_RESUME_BYTES = int(os.getenv("MAX_RESUME_BYTES", str(10 * 1024 * 1024)))
+UPLOAD_CHUNK_BYTES = 64 * 1024
+# Multipart framing allowance on top of the file bytes
+UPLOAD_OVERHEAD_BYTES = 64 * 1024
+
+# Load spaCy at import so a preforking server (gunicorn --preload) shares it
+if os.getenv("PRELOAD_RESUME_PARSER", "0") == "1":
+    preload_resume_parser()
+
 
 class Professor(BaseModel):
     id: str
@@ -48,6 +77,17 @@ class MatchResponse(BaseModel):
     top_professors: List[Professor]
 
 
+class BatchMatchResult(BaseModel):
+    filename: str
+    resume_profile: Optional[dict] = None
+    top_professors: List[Professor] = []
+    error: Optional[str] = None
+
+
+class BatchMatchResponse(BaseModel):
+    results: List[BatchMatchResult]
+
+
 class EmailRequest(BaseModel):
     resume_profile: dict
     professor: Professor
@@ -58,11 +98,92 @@ class EmailResponse(BaseModel):
     email_text: str
 
 
+@app.on_event("startup")
+async def load_models():
+    """
+    Load the BERTScore model and start the resume parser pool in the background.
+
+    The worker starts answering immediately; /health/ready reports
+    not-ready until the scorer has finished its warm-up pass.
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.run_in_executor(None, load_scorer)
+    parser_future = loop.run_in_executor(None, get_parse_pool().start)
+
+    def _report_failure(fut):
+        if fut.exception() is not None:
+            print(f"Failed to load BERTScorer: {fut.exception()}")
+
+    def _report_parser_failure(fut):
+        if fut.exception() is not None:
+            print(f"Failed to start resume parser pool: {fut.exception()}")
+
+    future.add_done_callback(_report_failure)
+    parser_future.add_done_callback(_report_parser_failure)
+
+
+@app.on_event("startup")
+async def start_catalog_refresher():
+    """Keep the faculty catalog fresh in the background."""
+    if os.getenv("CATALOG_REFRESH_ENABLED", "1") == "1":
+        app.state.catalog_refresher = asyncio.create_task(refresh_loop())
+
+
+@app.on_event("shutdown")
+async def close_clients():
+    refresher = getattr(app.state, "catalog_refresher", None)
+    if refresher is not None:
+        refresher.cancel()
+    await close_http_client()
+    close_selenium_pool()
+    close_parse_pool()
+    close_index_writer()
+
+
+@app.middleware("http")
+async def limit_upload_size(request: Request, call_next):
+    """Turn away oversized uploads by Content-Length before the body is read."""
+    limits = {
+        "/match": MAX_RESUME_BYTES + UPLOAD_OVERHEAD_BYTES,
+        "/match/batch": MAX_BATCH_RESUMES * (MAX_RESUME_BYTES + UPLOAD_OVERHEAD_BYTES),
+    }
+    limit = limits.get(request.url.path)
+    content_length = request.headers.get("content-length")
+    if limit is not None and content_length and content_length.isdigit() and int(content_length) > limit:
+        return JSONResponse(status_code=413, content={"detail": "Upload too large"})
+    return await call_next(request)
+
+
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/health/ready")
+async def readiness_check():
+    """Readiness probe: 503 until the matching model is warm."""
+    if not is_scorer_ready():
+        return JSONResponse(status_code=503, content={"status": "warming_up"})
+    return {"status": "ready"}
+
+
+@app.get("/catalog/status")
+async def catalog_status():
+    """Per-institution freshness of the faculty catalog."""
+    catalog = get_catalog()
+    return {"version": catalog.version(), "institutions": catalog.freshness()}
+
+
+@app.get("/cache/stats")
+async def cache_stats():
+    """Hit/miss counters and memory footprint of the caches, plus parser pool counters."""
+    return {
+        "match": match_cache.stats(),
+        "parsed_resume": parsed_resume_cache.stats(),
+        "resume_parser": get_parse_pool().stats,
+    }
+
+
 @app.post("/match", response_model=MatchResponse)
 async def match_professors(
     institutions: List[str] = Query(..., description="List of institutions to search"),
@@ -72,54 +193,219 @@ async def match_professors(
     Match user's resume with professors from selected institutions.
     Returns top 3 matches ranked by semantic similarity.
     """
-    # Validate institutions
-    invalid = [inst for inst in institutions if inst not in ALLOWED_INSTITUTIONS]
-    if invalid:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Invalid institutions: {invalid}. Allowed: {ALLOWED_INSTITUTIONS}",
-        )
+    validate_institutions(institutions)
+    require_scorer()
 
-    # Read resume file
-    resume_bytes = await resume.read()
-    if not resume_bytes:
-        raise HTTPException(status_code=400, detail="Resume file is empty")
+    resume_bytes = await read_resume_upload(resume)
+
+    # Serve repeat uploads from the match cache
+    # Off the loop: the index version check may load a newer index from disk
+    cache_key = match_cache_key(resume_bytes, institutions, 3, await asyncio.to_thread(catalog_version))
+    cached = match_cache.get(cache_key)
+    if cached is not None:
+        return MatchResponse(**cached)
 
     # Parse resume
     try:
-        resume_profile = parse_resume(resume_bytes)
+        resume_profile, _ = await get_parse_pool().parse(resume_bytes)
+    except ParserBusy:
+        raise HTTPException(
+            status_code=503,
+            detail="Resume parser is busy, try again shortly",
+            headers={"Retry-After": "1"},
+        )
+    except ParseTimeout as e:
+        raise HTTPException(status_code=504, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"Failed to parse resume: {str(e)}"
         )
 
-    # Scrape institutions
+    professors_df = await load_professors(institutions)
+
+    # Rank professors on a worker thread; encoding and scoring would stall the loop
     try:
-        professors_df = await scrape_institutions(institutions)
-        if professors_df.empty:
-            raise HTTPException(
-                status_code=500,
-                detail="No professors found. Scraping may have failed.",
-            )
+        top_professors = await asyncio.to_thread(rank_professors, resume_profile, professors_df, top_k=3)
+    except ScorerNotReady:
+        raise scorer_loading()
     except Exception as e:
         raise HTTPException(
-            status_code=500, detail=f"Failed to scrape institutions: {str(e)}"
+            status_code=500, detail=f"Failed to rank professors: {str(e)}"
+        )
+
+    response = MatchResponse(
+        resume_profile=asdict(resume_profile),
+        top_professors=[Professor(**prof) for prof in top_professors],
+    )
+    match_cache.set(cache_key, response.model_dump())
+    return response
+
+
+@app.post("/match/batch", response_model=BatchMatchResponse)
+async def match_professors_batch(
+    institutions: List[str] = Query(..., description="List of institutions to search"),
+    resumes: List[UploadFile] = File(..., description="Resume PDF files"),
+    top_k: int = Query(3, ge=1, le=20, description="Matches to return per resume"),
+):
+    """
+    Match many resumes against one set of institutions.
+
+    Professors are fetched once and all resumes are scored in a single
+    resumes x professors pass. A resume that fails to parse gets an error
+    entry instead of failing the whole batch.
+    """
+    validate_institutions(institutions)
+    require_scorer()
+    if len(resumes) > MAX_BATCH_RESUMES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many resumes: {len(resumes)}. Max per batch: {MAX_BATCH_RESUMES}",
+        )
+
+    pool = get_parse_pool()
+    if pool.saturated():
+        raise HTTPException(
+            status_code=503,
+            detail="Resume parser is busy, try again shortly",
+            headers={"Retry-After": "1"},
         )
 
-    # Rank professors
+    parsed = []
+
+    async def parse_upload(upload: UploadFile) -> BatchMatchResult:
+        result = BatchMatchResult(filename=upload.filename or "")
+        try:
+            resume_bytes = await read_resume_upload(upload)
+        except HTTPException as e:
+            result.error = e.detail
+            return result
+        try:
+            # A batch queues for parser slots rather than being turned away halfway
+            resume_profile, _ = await pool.parse(resume_bytes, wait=True)
+        except Exception as e:
+            result.error = f"Failed to parse resume: {str(e)}"
+            return result
+        result.resume_profile = asdict(resume_profile)
+        parsed.append((result, resume_profile))
+        return result
+
+    # Parse resumes across the pool, keeping per-file errors
+    results = list(await asyncio.gather(*(parse_upload(upload) for upload in resumes)))
+
+    if not parsed:
+        return BatchMatchResponse(results=results)
+
+    professors_df = await load_professors(institutions)
+
+    # Score the whole batch on a worker thread so other requests keep being served
     try:
-        top_professors = rank_professors(resume_profile, professors_df, top_k=3)
+        rankings = await asyncio.to_thread(
+            rank_professors_batch,
+            [resume_profile for _, resume_profile in parsed],
+            professors_df,
+            top_k=top_k,
+        )
+    except ScorerNotReady:
+        raise scorer_loading()
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"Failed to rank professors: {str(e)}"
         )
 
-    return MatchResponse(
-        resume_profile=resume_profile,
-        top_professors=[Professor(**prof) for prof in top_professors],
+    for (result, _), top_professors in zip(parsed, rankings):
+        result.top_professors = [Professor(**prof) for prof in top_professors]
+
+    return BatchMatchResponse(results=results)
+
+
+def validate_institutions(institutions: List[str]) -> None:
+    invalid = [inst for inst in institutions if inst not in ALLOWED_INSTITUTIONS]
+    if invalid:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid institutions: {invalid}. Allowed: {ALLOWED_INSTITUTIONS}",
+        )
+
+
+def require_scorer() -> None:
+    """
+    Turn matching away with 503 until the model has loaded at startup.
+
+    The model is never loaded inside a request: that would block the event
+    loop for the whole load, stalling every other request with it.
+    """
+    if not is_scorer_ready():
+        raise scorer_loading()
+
+
+def scorer_loading() -> HTTPException:
+    """503 answered while the matching model is still loading."""
+    return HTTPException(
+        status_code=503,
+        detail="Matching model is still loading, try again shortly",
+        headers={"Retry-After": "10"},
     )
 
 
+async def read_resume_upload(upload: UploadFile) -> bytes:
+    """
+    Read an uploaded resume in chunks, validating it as it streams.
+
+    The multipart parser has already spooled the upload to a temporary
+    file; this reads it back chunk by chunk so a non-PDF is rejected
+    after its first chunk and an oversized one as soon as it passes
+    MAX_RESUME_BYTES, without loading the whole upload first.
+    """
+    first = await upload.read(UPLOAD_CHUNK_BYTES)
+    if not first:
+        raise HTTPException(status_code=400, detail="Resume file is empty")
+    # The header may follow a little leading junk, as PDF readers allow
+    if b"%PDF-" not in first[:1024]:
+        raise HTTPException(status_code=415, detail="Resume file is not a PDF")
+
+    chunks = [first]
+    size = len(first)
+    while True:
+        if size > MAX_RESUME_BYTES:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Resume file is too large. Max size: {MAX_RESUME_BYTES // (1024 * 1024)} MB",
+            )
+        chunk = await upload.read(UPLOAD_CHUNK_BYTES)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        size += len(chunk)
+    return b"".join(chunks)
+
+
+def catalog_version() -> str:
+    """Version of the professor data a match result depends on."""
+    return f"catalog-v{get_catalog().version()}:{index_version()}:rank-{RANKING_VERSION}"
+
+
+async def load_professors(institutions: List[str]):
+    """
+    Read the institutions' professors from the faculty catalog.
+
+    Only institutions never scraped before are scraped inline; stale ones
+    are served from the catalog while a background refresh runs.
+    """
+    try:
+        await ensure_fresh(institutions)
+        professors_df = await asyncio.to_thread(get_catalog().get_professors, institutions)
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Failed to load professors: {str(e)}"
+        )
+    if professors_df.empty:
+        raise HTTPException(
+            status_code=503,
+            detail="No professors available yet for these institutions. Scraping may have failed; try again later.",
+        )
+    return professors_df
+
+
 @app.post("/generate_email", response_model=EmailResponse)
 async def generate_email(payload: EmailRequest):
     """
@@ -0,0 +1,180 @@
+import json
+import math
+import os
+import shutil
+from pathlib import Path
+from typing import Optional, Tuple
+
+import numpy as np
+
+
+class IVFFlatIndex:
+    """
+    Inverted-file (IVF-flat) approximate nearest-neighbour index.
+
+    Vectors are L2-normalized and compared by inner product (cosine).
+    Training runs spherical k-means to get nlist centroids; every vector
+    is stored in the list of its closest centroid, and the lists are laid
+    out contiguously so a query scans nprobe slices of one array.
+
+    Accuracy/latency knobs:
+        nlist  - number of lists (build time); more lists, smaller scans
+        nprobe - lists scanned per query; higher is slower but more exact
+
+    On disk every array is a plain .npy file opened with mmap_mode="r",
+    so workers share the pages through the OS cache and opening an index
+    costs no deserialization. A save writes a complete directory next to
+    the target and renames it into place, so a reader opens either the
+    old index or the new one, never a mix of both.
+    """
+
+    def __init__(
+        self,
+        centroids: np.ndarray,
+        vectors: np.ndarray,
+        list_offsets: np.ndarray,
+        positions: np.ndarray,
+        version: int = 0,
+    ):
+        self.centroids = centroids
+        self.vectors = vectors
+        self.list_offsets = list_offsets
+        self.positions = positions
+        self.version = version
+
+    @property
+    def nlist(self) -> int:
+        return len(self.centroids)
+
+    def __len__(self) -> int:
+        return len(self.vectors)
+
+    @classmethod
+    def build(
+        cls,
+        vectors: np.ndarray,
+        nlist: Optional[int] = None,
+        iterations: int = 10,
+        sample_size: int = 50000,
+        seed: int = 0,
+        version: int = 0,
+    ) -> "IVFFlatIndex":
+        """
+        Train centroids and bucket vectors.
+
+        Args:
+            vectors: (n, dim) L2-normalized vectors; row i gets position i
+            nlist: Number of lists, defaults to 4 * sqrt(n)
+            iterations: k-means iterations
+            sample_size: Max vectors used to train the centroids
+            seed: Random seed for sampling and initialization
+            version: Version of the data the index was built from
+        """
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        n = len(vectors)
+        if nlist is None:
+            nlist = int(4 * math.sqrt(n))
+        nlist = max(1, min(nlist, n))
+
+        rng = np.random.default_rng(seed)
+        sample = vectors
+        if n > sample_size:
+            sample = vectors[rng.choice(n, sample_size, replace=False)]
+
+        centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+        for _ in range(iterations):
+            assignment = _assign(sample, centroids)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignment, sample)
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            # Empty clusters keep their previous centroid
+            nonempty = norms[:, 0] > 0
+            centroids[nonempty] = sums[nonempty] / norms[nonempty]
+
+        assignment = _assign(vectors, centroids)
+        order = np.argsort(assignment, kind="stable")
+        counts = np.bincount(assignment, minlength=nlist)
+        list_offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+
+        return cls(centroids, vectors[order], list_offsets, order.astype(np.int64), version)
+
+    def search(
+        self, query: np.ndarray, top_k: int, nprobe: int = 16
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find the approximate top_k neighbours of a query vector.
+
+        Returns:
+            Tuple of (positions, scores) sorted by descending score
+        """
+        query = np.asarray(query, dtype=np.float32)
+        nprobe = max(1, min(nprobe, self.nlist))
+
+        centroid_scores = self.centroids @ query
+        if nprobe < self.nlist:
+            probe = np.argpartition(-centroid_scores, nprobe - 1)[:nprobe]
+        else:
+            probe = np.arange(self.nlist)
+
+        starts = self.list_offsets[probe]
+        ends = self.list_offsets[probe + 1]
+        rows = np.concatenate([np.arange(s, e) for s, e in zip(starts, ends)])
+        if len(rows) == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+
+        scores = self.vectors[rows] @ query
+        if top_k < len(rows):
+            best = np.argpartition(-scores, top_k - 1)[:top_k]
+        else:
+            best = np.arange(len(rows))
+        best = best[np.argsort(-scores[best])]
+        return self.positions[rows[best]], scores[best]
+
+    def save(self, index_dir: Path) -> None:
+        """Write the index as .npy files plus a small meta.json, replacing index_dir."""
+        index_dir = Path(index_dir)
+        index_dir.parent.mkdir(parents=True, exist_ok=True)
+        tmp_dir = index_dir.parent / f".{index_dir.name}.tmp-{os.getpid()}"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        tmp_dir.mkdir()
+        try:
+            for name, array in (
+                ("centroids", self.centroids),
+                ("vectors", self.vectors),
+                ("list_offsets", self.list_offsets),
+                ("positions", self.positions),
+            ):
+                np.save(tmp_dir / f"{name}.npy", array)
+            with open(tmp_dir / "meta.json", "w") as f:
+                json.dump({"version": self.version, "nlist": self.nlist, "size": len(self)}, f)
+
+            # A directory can only be renamed over an empty one
+            shutil.rmtree(index_dir, ignore_errors=True)
+            os.replace(tmp_dir, index_dir)
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    @classmethod
+    def open(cls, index_dir: Path) -> Optional["IVFFlatIndex"]:
+        """Memory-map a saved index, or return None if there is none."""
+        index_dir = Path(index_dir)
+        meta_path = index_dir / "meta.json"
+        if not meta_path.exists():
+            return None
+
+        with open(meta_path) as f:
+            meta = json.load(f)
+        arrays = {
+            name: np.load(index_dir / f"{name}.npy", mmap_mode="r")
+            for name in ("centroids", "vectors", "list_offsets", "positions")
+        }
+        return cls(version=meta["version"], **arrays)
+
+
+def _assign(vectors: np.ndarray, centroids: np.ndarray, block_size: int = 8192) -> np.ndarray:
+    """Closest centroid for each vector, in blocks to bound memory."""
+    assignment = np.empty(len(vectors), dtype=np.int64)
+    for start in range(0, len(vectors), block_size):
+        block = vectors[start:start + block_size]
+        assignment[start:start + block_size] = np.argmax(block @ centroids.T, axis=1)
+    return assignment
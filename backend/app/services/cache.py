@@ -0,0 +1,237 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class LRUCache:
+    """
+    Thread-safe LRU cache for JSON-serializable values.
+
+    Entries are kept as compact JSON bytes, which makes the memory bound
+    exact: the cache evicts least recently used entries once either
+    max_entries or max_bytes is exceeded. Entries older than ttl_seconds
+    are treated as misses.
+
+    If disk_dir is set, every entry is also written there as one JSON
+    file, and a memory miss falls back to the disk copy (subject to the
+    same TTL, based on file mtime), so a restart doesn't empty the cache.
+    A disk hit keeps its original write time, so promoting it to memory
+    never extends its life. Once the directory passes disk_max_bytes the
+    oldest files are deleted.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_entries: int = 1024,
+        max_bytes: int = 64 * 1024 * 1024,
+        ttl_seconds: float = 3600,
+        disk_dir: Optional[str] = None,
+        disk_max_bytes: int = 256 * 1024 * 1024,
+    ):
+        self.name = name
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self.disk_max_bytes = disk_max_bytes
+        self._disk_bytes = 0
+        if self.disk_dir:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+            self._disk_bytes = sum(size for _, size, _ in self._disk_files())
+
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.disk_evictions = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value, or None on a miss or expired entry."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                stored_at, payload = entry
+                if now - stored_at <= self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return json.loads(payload)
+                self._remove(key)
+
+        entry = self._read_disk(key, now)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            stored_at, payload = entry
+            self._insert(key, payload, stored_at)
+        return json.loads(payload)
+
+    def set(self, key: str, value: Any) -> None:
+        """Store a value in memory and, if configured, on disk."""
+        payload = json.dumps(value, separators=(",", ":")).encode("utf-8")
+        if len(payload) > self.max_bytes:
+            return
+        with self._lock:
+            self._insert(key, payload, time.time())
+        self._write_disk(key, payload)
+
+    def clear(self) -> None:
+        """Drop every in-memory entry (the disk tier is left alone)."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current footprint."""
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "disk_tier": str(self.disk_dir) if self.disk_dir else None,
+                "disk_bytes": self._disk_bytes,
+                "disk_max_bytes": self.disk_max_bytes,
+                "disk_evictions": self.disk_evictions,
+            }
+
+    def _insert(self, key: str, payload: bytes, stored_at: float) -> None:
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (stored_at, payload)
+        self._bytes += len(payload)
+        while self._entries and (
+            len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+        ):
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def _remove(self, key: str) -> None:
+        _, payload = self._entries.pop(key)
+        self._bytes -= len(payload)
+
+    def _disk_path(self, key: str) -> Path:
+        return self.disk_dir / f"{key}.json"
+
+    def _read_disk(self, key: str, now: float) -> Optional[Tuple[float, bytes]]:
+        """(write time, payload) of an unexpired disk entry, or None."""
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            stored_at = path.stat().st_mtime
+            if now - stored_at > self.ttl_seconds:
+                path.unlink(missing_ok=True)
+                return None
+            return stored_at, path.read_bytes()
+        except OSError:
+            return None
+
+    def _write_disk(self, key: str, payload: bytes) -> None:
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            tmp_path.write_bytes(payload)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Failed to write {self.name} cache entry to disk: {e}")
+            return
+        with self._lock:
+            # Approximate (overwrites and other workers' files); _prune_disk recounts
+            self._disk_bytes += len(payload)
+            over_budget = self._disk_bytes > self.disk_max_bytes
+        if over_budget:
+            self._prune_disk()
+
+    def _disk_files(self) -> List[Tuple[float, int, Path]]:
+        """(mtime, size, path) of every disk entry."""
+        files = []
+        for path in self.disk_dir.glob("*.json"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+        return files
+
+    def _prune_disk(self) -> None:
+        """Delete the oldest disk entries until the tier is back under budget."""
+        files = sorted(self._disk_files())
+        total = sum(size for _, size, _ in files)
+        # Down to 90%, so the writes right after don't each rescan the directory
+        target = 0.9 * self.disk_max_bytes
+        evicted = 0
+        for _, size, path in files:
+            if total <= target:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            evicted += 1
+        with self._lock:
+            self._disk_bytes = total
+            self.disk_evictions += evicted
+
+
+def match_cache_key(
+    resume_bytes: bytes, institutions: List[str], top_k: int, catalog_version: str
+) -> str:
+    """
+    Content-addressed key for a match result.
+
+    Same resume bytes, same institution set (in any order), same top_k
+    and same professor catalog give the same key; a new catalog version
+    changes every key, which invalidates all earlier results at once.
+    """
+    resume_digest = hashlib.sha256(resume_bytes).hexdigest()
+    parts = [resume_digest, ",".join(sorted(set(institutions))), str(top_k), catalog_version]
+    return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()
+
+
+def parsed_resume_cache_key(resume_bytes: bytes, parser_version: str) -> str:
+    """
+    Content-addressed key for a parsed resume.
+
+    Parsing only depends on the PDF bytes and the parser, so the same
+    upload hits the cache whatever institutions it is matched against.
+    """
+    resume_digest = hashlib.sha256(resume_bytes).hexdigest()
+    return hashlib.sha256(f"{resume_digest}|{parser_version}".encode("utf-8")).hexdigest()
+
+
+match_cache = LRUCache(
+    "match",
+    max_entries=int(os.getenv("MATCH_CACHE_MAX_ENTRIES", "1024")),
+    max_bytes=int(os.getenv("MATCH_CACHE_MAX_BYTES", str(32 * 1024 * 1024))),
+    ttl_seconds=float(os.getenv("MATCH_CACHE_TTL_SECONDS", "3600")),
+    disk_dir=os.getenv("MATCH_CACHE_DIR") or None,
+    disk_max_bytes=int(os.getenv("MATCH_CACHE_DISK_MAX_BYTES", str(256 * 1024 * 1024))),
+)
+
+parsed_resume_cache = LRUCache(
+    "parsed_resume",
+    max_entries=int(os.getenv("PARSED_RESUME_CACHE_MAX_ENTRIES", "4096")),
+    max_bytes=int(os.getenv("PARSED_RESUME_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+    ttl_seconds=float(os.getenv("PARSED_RESUME_CACHE_TTL_SECONDS", str(7 * 24 * 3600))),
+    disk_dir=os.getenv("PARSED_RESUME_CACHE_DIR") or None,
+    disk_max_bytes=int(os.getenv("PARSED_RESUME_CACHE_DISK_MAX_BYTES", str(512 * 1024 * 1024))),
+)
@@ -0,0 +1,310 @@
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+import pandas as pd
+
+from .embedding_index import profile_hash
+from .matching import reindex_professors, warm_bm25_indexes
+from .scraper import INSTITUTION_CONFIGS, scrape_institution_limited
+
+
+DEFAULT_CATALOG_PATH = Path(__file__).resolve().parents[2] / "data" / "catalog.sqlite3"
+
+# An institution older than this is served as-is but refreshed in the background
+CATALOG_MAX_AGE_SECONDS = float(os.getenv("CATALOG_MAX_AGE_SECONDS", str(24 * 3600)))
+# Minimum gap between refresh attempts for one institution (failed or not)
+CATALOG_RETRY_SECONDS = float(os.getenv("CATALOG_RETRY_SECONDS", "900"))
+# How often the background refresher looks for stale institutions
+CATALOG_REFRESH_CHECK_SECONDS = float(os.getenv("CATALOG_REFRESH_CHECK_SECONDS", "3600"))
+
+PROFESSOR_COLUMNS = [
+    "id", "name", "institution", "department",
+    "research_focus", "lab_group", "profile_url", "content_hash",
+]
+
+
+class FacultyCatalog:
+    """
+    SQLite store of scraped professors, one snapshot per institution.
+
+    Each refresh replaces an institution's rows in a single transaction
+    and bumps the catalog version, so readers never see a half-written
+    institution and caches keyed on the version invalidate themselves.
+    A failed scrape leaves the previous snapshot in place. Each row keeps
+    the professor's content hash so a refresh can tell which profiles
+    actually changed.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS professors (
+                    id TEXT NOT NULL,
+                    institution TEXT NOT NULL,
+                    name TEXT,
+                    department TEXT,
+                    research_focus TEXT,
+                    lab_group TEXT,
+                    profile_url TEXT,
+                    content_hash TEXT,
+                    PRIMARY KEY (institution, id)
+                );
+                CREATE TABLE IF NOT EXISTS institutions (
+                    institution TEXT PRIMARY KEY,
+                    refreshed_at REAL,
+                    attempted_at REAL,
+                    professor_count INTEGER DEFAULT 0,
+                    last_error TEXT
+                );
+                CREATE TABLE IF NOT EXISTS catalog_meta (
+                    key TEXT PRIMARY KEY,
+                    value INTEGER
+                );
+                INSERT OR IGNORE INTO catalog_meta (key, value) VALUES ('version', 0);
+                """
+            )
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(professors)")}
+            if "content_hash" not in columns:
+                # Catalogs created before content hashes; filled in on the next refresh
+                self._conn.execute("ALTER TABLE professors ADD COLUMN content_hash TEXT")
+
+    def version(self) -> int:
+        """Incremented every time any institution's stored professors change."""
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM catalog_meta WHERE key = 'version'").fetchone()
+        return row[0]
+
+    def get_professors(self, institutions: List[str]) -> pd.DataFrame:
+        """
+        All stored professors of the given institutions.
+
+        The frame's attrs record the catalog version it was read at and the
+        institutions it covers, so indexes built from it can be cached.
+        """
+        placeholders = ",".join("?" for _ in institutions)
+        query = (
+            f"SELECT {', '.join(PROFESSOR_COLUMNS)} FROM professors "
+            f"WHERE institution IN ({placeholders}) ORDER BY institution, rowid"
+        )
+        with self._lock:
+            version = self._conn.execute("SELECT value FROM catalog_meta WHERE key = 'version'").fetchone()[0]
+            rows = self._conn.execute(query, list(institutions)).fetchall()
+        professors_df = pd.DataFrame(rows, columns=PROFESSOR_COLUMNS)
+        professors_df.attrs["catalog_version"] = version
+        professors_df.attrs["institutions"] = tuple(sorted(set(institutions)))
+        return professors_df
+
+    def replace_institution(self, institution: str, professors: List[Dict]) -> Tuple[List[Dict], List[str]]:
+        """
+        Swap in a fresh snapshot of one institution's professors.
+
+        The catalog version is only bumped if a stored row differs, so a
+        periodic refresh that finds nothing new keeps cached matches valid.
+
+        Returns:
+            Tuple of (new or changed professor records, ids no longer listed)
+        """
+        now = time.time()
+        for prof in professors:
+            if not prof.get("content_hash"):
+                prof["content_hash"] = profile_hash(prof)
+        rows = [
+            tuple(prof.get(col) for col in PROFESSOR_COLUMNS)
+            for prof in professors
+        ]
+        with self._lock, self._conn:
+            previous_rows = self._conn.execute(
+                f"SELECT {', '.join(PROFESSOR_COLUMNS)} FROM professors WHERE institution = ?", (institution,)
+            ).fetchall()
+            hash_column = PROFESSOR_COLUMNS.index("content_hash")
+            previous = {row[0]: row[hash_column] for row in previous_rows}
+            # Whole rows, not hashes: profile_url is outside the hash but shows up in results.
+            # Keyed by id, as INSERT OR REPLACE keeps the last of duplicate ids.
+            modified = {row[0]: row for row in previous_rows} != {row[0]: row for row in rows}
+            self._conn.execute("DELETE FROM professors WHERE institution = ?", (institution,))
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO professors ({', '.join(PROFESSOR_COLUMNS)}) "
+                f"VALUES ({', '.join('?' for _ in PROFESSOR_COLUMNS)})",
+                rows,
+            )
+            self._conn.execute(
+                """
+                INSERT INTO institutions (institution, refreshed_at, attempted_at, professor_count, last_error)
+                VALUES (?, ?, ?, ?, NULL)
+                ON CONFLICT(institution) DO UPDATE SET
+                    refreshed_at = excluded.refreshed_at,
+                    attempted_at = excluded.attempted_at,
+                    professor_count = excluded.professor_count,
+                    last_error = NULL
+                """,
+                (institution, now, now, len(rows)),
+            )
+            if modified:
+                self._conn.execute("UPDATE catalog_meta SET value = value + 1 WHERE key = 'version'")
+
+        current_ids = {prof["id"] for prof in professors}
+        changed = [prof for prof in professors if previous.get(prof["id"]) != prof["content_hash"]]
+        removed = [pid for pid in previous if pid not in current_ids]
+        return changed, removed
+
+    def record_failure(self, institution: str, error: str) -> None:
+        """Note a failed refresh without touching the stored professors."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                INSERT INTO institutions (institution, attempted_at, last_error)
+                VALUES (?, ?, ?)
+                ON CONFLICT(institution) DO UPDATE SET
+                    attempted_at = excluded.attempted_at,
+                    last_error = excluded.last_error
+                """,
+                (institution, time.time(), error),
+            )
+
+    def freshness(self) -> Dict[str, Dict]:
+        """Per-institution refresh status for every configured institution."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT institution, refreshed_at, attempted_at, professor_count, last_error FROM institutions"
+            ).fetchall()
+        stored = {row[0]: row[1:] for row in rows}
+        now = time.time()
+
+        status = {}
+        for institution in INSTITUTION_CONFIGS:
+            refreshed_at, attempted_at, count, last_error = stored.get(institution, (None, None, 0, None))
+            age = now - refreshed_at if refreshed_at else None
+            status[institution] = {
+                "refreshed_at": refreshed_at,
+                "attempted_at": attempted_at,
+                "age_seconds": age,
+                "professor_count": count or 0,
+                "stale": age is None or age > CATALOG_MAX_AGE_SECONDS,
+                "last_error": last_error,
+            }
+        return status
+
+
+_catalog: Optional[FacultyCatalog] = None
+_catalog_lock = threading.Lock()
+
+# Institution -> in-flight refresh task, so concurrent callers share one scrape
+_refresh_tasks: Dict[str, asyncio.Task] = {}
+
+
+def get_catalog() -> FacultyCatalog:
+    """Return the process-wide catalog, opening it on first use."""
+    global _catalog
+    with _catalog_lock:
+        if _catalog is None:
+            _catalog = FacultyCatalog(os.getenv("CATALOG_PATH", str(DEFAULT_CATALOG_PATH)))
+    return _catalog
+
+
+async def refresh_institution(institution: str) -> None:
+    """Scrape one institution and store the result."""
+    catalog = get_catalog()
+    try:
+        professors = await scrape_institution_limited(institution)
+    except Exception as e:
+        catalog.record_failure(institution, str(e))
+        print(f"Catalog refresh failed for {institution}: {e}")
+        return
+
+    if not professors:
+        catalog.record_failure(institution, "No professors found")
+        print(f"Catalog refresh for {institution} found no professors, keeping previous data")
+        return
+
+    changed, removed = await asyncio.to_thread(catalog.replace_institution, institution, professors)
+    print(
+        f"✓ Catalog refreshed {institution} ({len(professors)} professors, "
+        f"{len(changed)} new or changed, {len(removed)} removed)"
+    )
+    if changed or removed:
+        try:
+            await asyncio.to_thread(reindex_professors, changed, removed)
+        except Exception as e:
+            print(f"Re-indexing {institution} failed, requests will encode lazily: {e}")
+        try:
+            await asyncio.to_thread(warm_bm25_indexes, catalog.get_professors)
+        except Exception as e:
+            print(f"Rebuilding BM25 indexes after {institution} refresh failed: {e}")
+
+
+def schedule_refresh(institution: str) -> asyncio.Task:
+    """Start a background refresh unless one is already running."""
+    task = _refresh_tasks.get(institution)
+    if task is None or task.done():
+        task = asyncio.create_task(refresh_institution(institution))
+        _refresh_tasks[institution] = task
+    return task
+
+
+async def ensure_fresh(institutions: List[str]) -> None:
+    """
+    Make the institutions servable from the catalog.
+
+    Institutions never scraped before are awaited (cold start). Stale ones
+    are refreshed in the background and served from the current snapshot.
+    """
+    status = get_catalog().freshness()
+    now = time.time()
+    cold = []
+    for institution in institutions:
+        info = status.get(institution)
+        if info is None:
+            continue
+
+        task = _refresh_tasks.get(institution)
+        if task is not None and not task.done():
+            if info["refreshed_at"] is None:
+                cold.append(task)
+            continue
+
+        if info["attempted_at"] and now - info["attempted_at"] < CATALOG_RETRY_SECONDS:
+            continue
+        if info["refreshed_at"] is None:
+            cold.append(schedule_refresh(institution))
+        elif info["stale"]:
+            schedule_refresh(institution)
+
+    if cold:
+        # Shielded so a cancelled request doesn't cancel a scrape others share
+        await asyncio.gather(*(asyncio.shield(task) for task in cold))
+
+
+def stale_institutions() -> Set[str]:
+    """Configured institutions due for a refresh."""
+    now = time.time()
+    return {
+        institution
+        for institution, info in get_catalog().freshness().items()
+        if info["stale"]
+        and not (info["attempted_at"] and now - info["attempted_at"] < CATALOG_RETRY_SECONDS)
+    }
+
+
+async def refresh_loop() -> None:
+    """Background task: periodically refresh stale institutions."""
+    while True:
+        try:
+            due = stale_institutions()
+            if due:
+                await asyncio.gather(*(schedule_refresh(inst) for inst in due))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Catalog refresher error: {e}")
+        await asyncio.sleep(CATALOG_REFRESH_CHECK_SECONDS)
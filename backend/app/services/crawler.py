@@ -0,0 +1,247 @@
+import asyncio
+import os
+import re
+import time
+from typing import Dict, List, Optional, Set, Tuple
+from urllib.parse import urldefrag, urljoin, urlparse
+
+from bs4 import BeautifulSoup
+
+from .extractors import get_extractor
+from .http_client import fetch_html
+from .scraper import parse_faculty_listing, throttle
+
+
+# Link hops followed from a listing page (1 = profile pages)
+CRAWL_MAX_DEPTH = int(os.getenv("CRAWL_MAX_DEPTH", "1"))
+# Concurrent fetches per institution; per-host token buckets still apply
+CRAWL_CONCURRENCY = int(os.getenv("CRAWL_CONCURRENCY", "8"))
+# Hard caps per institution crawl. Pages per crawl are also bounded by
+# SCRAPE_HOST_RATE * CRAWL_TIME_BUDGET_SECONDS: 450 with the defaults
+CRAWL_MAX_PAGES = int(os.getenv("CRAWL_MAX_PAGES", "5000"))
+CRAWL_MAX_LISTING_PAGES = int(os.getenv("CRAWL_MAX_LISTING_PAGES", "200"))
+CRAWL_TIME_BUDGET_SECONDS = float(os.getenv("CRAWL_TIME_BUDGET_SECONDS", "900"))
+
+# Used when an institution config has no "crawl" selectors of its own
+DEFAULT_CRAWL_SELECTORS = {
+    "next_page": (
+        'a[rel~="next"], li.next a, li.pager__item--next a, '
+        'a.next, .pagination a[aria-label*="Next"]'
+    ),
+    "profile_research": (
+        ".research-interests, .research-areas, .research, .interests, #research"
+    ),
+    "profile_lab_group": ".lab, .lab-group, .research-group, .group-name",
+}
+
+MISSING_RESEARCH = "Research interests not specified"
+MAX_FIELD_CHARS = 1000
+
+RESEARCH_HEADING_RE = re.compile(r"^\s*research\b|\binterests?\s*:?\s*$|^\s*areas? of", re.I)
+LAB_NAME_RE = re.compile(
+    r"\b((?:[A-Z][\w&'\-]*\s+){0,5}(?:Lab|Laboratory|Research Group|Group|Center))\b"
+)
+
+
+def normalize_url(url: str) -> str:
+    """Canonical form used for frontier dedup: no fragment, lowercase host."""
+    url, _ = urldefrag(url)
+    parsed = urlparse(url)
+    path = parsed.path.rstrip("/") or "/"
+    return parsed._replace(scheme=parsed.scheme.lower(), netloc=parsed.netloc.lower(), path=path).geturl()
+
+
+class URLFrontier:
+    """
+    Deduplicating FIFO of pages to fetch.
+
+    Each entry is (url, depth, kind) where kind is "listing" or "profile".
+    A URL is queued at most once per crawl, however many pages link to it.
+    """
+
+    def __init__(self, max_pages: int):
+        self.max_pages = max_pages
+        self.queue: "asyncio.Queue[Tuple[str, int, str]]" = asyncio.Queue()
+        self._seen: Set[str] = set()
+
+    def add(self, url: str, depth: int, kind: str) -> bool:
+        """Queue a URL unless it was seen before or the page cap is reached."""
+        if not url or urlparse(url).scheme not in ("http", "https"):
+            return False
+        key = normalize_url(url)
+        if key in self._seen or len(self._seen) >= self.max_pages:
+            return False
+        self._seen.add(key)
+        self.queue.put_nowait((url, depth, kind))
+        return True
+
+    @property
+    def seen(self) -> int:
+        return len(self._seen)
+
+
+def _text(elem, limit: int = MAX_FIELD_CHARS) -> str:
+    return " ".join(elem.get_text(" ", strip=True).split())[:limit]
+
+
+def next_page_links(soup: BeautifulSoup, url: str, selectors: Dict) -> List[str]:
+    """Pagination links on a parsed listing page, restricted to the listing's host."""
+    host = urlparse(url).netloc
+    links = []
+    for elem in soup.select(selectors["next_page"]):
+        href = elem.get("href")
+        if not href:
+            continue
+        absolute = urljoin(url, href)
+        if urlparse(absolute).netloc == host:
+            links.append(absolute)
+    return links
+
+
+def parse_listing_page(
+    html: str, url: str, config: Dict, selectors: Dict, follow_pages: bool
+) -> Tuple[List[Dict], List[str]]:
+    """
+    Professor cards and pagination links of one listing page.
+
+    Parses the page once for both. Without pagination to follow, only
+    the cards are needed and the extractor's strained parse is used.
+
+    Returns:
+        Tuple of (professor dicts, next-page links)
+    """
+    if not follow_pages:
+        return parse_faculty_listing(html, url, config, limit=None), []
+    soup = BeautifulSoup(html, "lxml")
+    return get_extractor(config).extract_soup(soup, url, limit=None), next_page_links(soup, url, selectors)
+
+
+def parse_profile_page(html: str, selectors: Dict) -> Dict[str, Optional[str]]:
+    """
+    Pull research focus and lab/group name from a professor's profile page.
+
+    Args:
+        html: Profile page body
+        selectors: Crawl selectors (profile_research, profile_lab_group)
+
+    Returns:
+        Dict with "research_focus" and "lab_group", None where not found
+    """
+    soup = BeautifulSoup(html, "lxml")
+
+    research = None
+    elem = soup.select_one(selectors["profile_research"])
+    if elem is not None:
+        research = _text(elem) or None
+    if research is None:
+        # Fallback: text following a "Research Interests" style heading
+        for heading in soup.find_all(["h1", "h2", "h3", "h4", "h5", "strong", "dt"]):
+            if RESEARCH_HEADING_RE.search(heading.get_text(" ", strip=True)):
+                sibling = heading.find_next_sibling()
+                if sibling is not None and _text(sibling):
+                    research = _text(sibling)
+                    break
+
+    lab_group = None
+    elem = soup.select_one(selectors["profile_lab_group"])
+    if elem is not None:
+        lab_group = _text(elem, 200) or None
+    if lab_group is None:
+        body = soup.body or soup
+        match = LAB_NAME_RE.search(body.get_text(" ", strip=True))
+        if match:
+            lab_group = match.group(1).strip()
+
+    return {"research_focus": research, "lab_group": lab_group}
+
+
+async def crawl_institution(base_url: str, config: Dict) -> List[Dict]:
+    """
+    Crawl an institution's faculty listing, its pagination and profile pages.
+
+    Workers share a deduplicating frontier: listing pages yield professor
+    cards plus next-page links, and each card's profile_url is fetched (up
+    to CRAWL_MAX_DEPTH hops) to fill in a missing research focus and the
+    lab group. Every fetch goes through the per-host token buckets. When
+    the time budget runs out the crawl stops and returns what it has.
+
+    Args:
+        base_url: First listing page
+        config: Institution config; an optional "crawl" dict overrides
+            DEFAULT_CRAWL_SELECTORS
+
+    Returns:
+        List of professor dicts, one per distinct profile (or name)
+    """
+    selectors = {**DEFAULT_CRAWL_SELECTORS, **config.get("crawl", {})}
+    frontier = URLFrontier(CRAWL_MAX_PAGES)
+    frontier.add(base_url, 0, "listing")
+
+    professors: Dict[str, Dict] = {}
+    by_profile: Dict[str, Dict] = {}
+    stats = {"listing": 0, "profile": 0, "errors": 0}
+    deadline = time.monotonic() + CRAWL_TIME_BUDGET_SECONDS
+
+    async def handle_listing(html: str, url: str, depth: int) -> None:
+        # Parsing runs on a worker thread; the shared state is only touched on the loop
+        cards, links = await asyncio.to_thread(
+            parse_listing_page, html, url, config, selectors,
+            stats["listing"] < CRAWL_MAX_LISTING_PAGES,
+        )
+        for prof in cards:
+            key = normalize_url(prof["profile_url"]) if prof["profile_url"] else prof["name"]
+            if key in professors:
+                continue
+            professors[key] = prof
+            if prof["profile_url"] and depth + 1 <= CRAWL_MAX_DEPTH:
+                by_profile[normalize_url(prof["profile_url"])] = prof
+                frontier.add(prof["profile_url"], depth + 1, "profile")
+        # Pagination stays at the same depth: it is more of the listing
+        for link in links:
+            frontier.add(link, depth, "listing")
+
+    async def handle_profile(html: str, url: str) -> None:
+        prof = by_profile.get(normalize_url(url))
+        if prof is None:
+            return
+        details = await asyncio.to_thread(parse_profile_page, html, selectors)
+        if details["research_focus"] and prof.get("research_focus") in (None, "", MISSING_RESEARCH):
+            prof["research_focus"] = details["research_focus"]
+        if details["lab_group"] and not prof.get("lab_group"):
+            prof["lab_group"] = details["lab_group"]
+
+    async def worker() -> None:
+        while True:
+            url, depth, kind = await frontier.queue.get()
+            try:
+                if time.monotonic() >= deadline:
+                    continue
+                await throttle(url)
+                html = await fetch_html(url)
+                stats[kind] += 1
+                if kind == "listing":
+                    await handle_listing(html, url, depth)
+                else:
+                    await handle_profile(html, url)
+            except Exception as e:
+                stats["errors"] += 1
+                print(f"Error crawling {url}: {e}")
+            finally:
+                frontier.queue.task_done()
+
+    workers = [asyncio.create_task(worker()) for _ in range(CRAWL_CONCURRENCY)]
+    try:
+        remaining = max(deadline - time.monotonic(), 0)
+        await asyncio.wait_for(frontier.queue.join(), timeout=remaining)
+    except asyncio.TimeoutError:
+        print(f"Crawl of {base_url} hit its {CRAWL_TIME_BUDGET_SECONDS:.0f}s budget, keeping partial results")
+    finally:
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+    print(
+        f"✓ Crawled {base_url}: {stats['listing']} listing pages, {stats['profile']} profiles, "
+        f"{len(professors)} professors, {stats['errors']} errors"
+    )
+    return list(professors.values())
@@ -0,0 +1,617 @@
+import fcntl
+import hashlib
+import json
+import math
+import os
+import shutil
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+
+DEFAULT_INDEX_DIR = Path(__file__).resolve().parents[2] / "data" / "professor_index"
+
+# Professor fields an embedding is computed from, in text order
+PROFILE_FIELDS = ("name", "department", "research_focus", "lab_group")
+
+# Saved versions kept on disk besides the current one, for readers mid-reload
+INDEX_KEEP_VERSIONS = int(os.getenv("PROFESSOR_INDEX_KEEP_VERSIONS", "2"))
+
+# Compact the token matrix once this share of its slots is tombstoned or superseded
+TOMBSTONE_COMPACT_RATIO = 0.25
+
+# Guards claiming the free tail of a shared append buffer
+_append_lock = threading.Lock()
+
+
+def profile_hash(record) -> str:
+    """
+    Normalized content hash of a professor record.
+
+    Covers PROFILE_FIELDS only, with case and whitespace folded, so a
+    re-scrape that changes nothing but markup or spacing hashes the same
+    and is never re-encoded.
+
+    Args:
+        record: Dict or pandas Series with the profile fields
+    """
+    parts = []
+    for field in PROFILE_FIELDS:
+        value = record.get(field)
+        if value is None or (isinstance(value, float) and value != value):
+            value = ""
+        parts.append(" ".join(str(value).lower().split()))
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+# Supported storage formats for the token embedding matrix
+STORAGE_DTYPES = ("float32", "float16", "int8")
+
+# Token rows dequantized per block when gathering int8/float16 embeddings
+DEQUANTIZE_BLOCK_ROWS = 65536
+
+# Token-pair similarities computed per block in greedy matching (float32, 64 MB)
+SIMILARITY_BLOCK_ELEMENTS = int(os.getenv("SIMILARITY_BLOCK_ELEMENTS", str(1 << 24)))
+
+
+def quantize_int8(rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Asymmetric per-row int8 quantization.
+
+    Each row's [min, max] range is mapped onto [-128, 127], so
+    x ~= scale * (q - zero_point).
+
+    Returns:
+        Tuple of (int8 rows, float32 scale per row, float32 zero point per row)
+    """
+    rows = np.asarray(rows, dtype=np.float32)
+    low = rows.min(axis=1, keepdims=True)
+    high = rows.max(axis=1, keepdims=True)
+    scale = np.maximum((high - low) / 255.0, 1e-12)
+    zero_point = np.round(-low / scale) - 128.0
+    quantized = np.clip(np.round(rows / scale + zero_point), -128, 127).astype(np.int8)
+    return quantized, scale[:, 0].astype(np.float32), zero_point[:, 0].astype(np.float32)
+
+
+def dequantize_int8(quantized: np.ndarray, scale: np.ndarray, zero_point: np.ndarray) -> np.ndarray:
+    """Inverse of quantize_int8."""
+    return (quantized.astype(np.float32) - zero_point[:, None]) * scale[:, None]
+
+
+class ProfessorEmbeddingIndex:
+    """
+    On-disk store of per-professor contextual token embeddings.
+
+    Embeddings for all professors live in one contiguous (tokens, dim)
+    matrix; professor i owns rows offsets[i]:offsets[i + 1]. Each entry is
+    keyed by professor id and the content hash of the text it was encoded
+    from, so a changed profile is re-encoded and an unchanged one never
+    is. The whole index is tied to a model key and discarded if the
+    scoring model changes. A pooled vector (mean of the content tokens)
+    per professor is kept for nearest-neighbour search.
+
+    The token matrix can be stored as float32, float16 (half the memory)
+    or int8 with a per-row scale and zero point (about a quarter).
+    gather() always hands back float32, dequantizing in blocks.
+
+    Updates cost O(changed professors), not O(index). New and re-encoded
+    professors are appended after the existing rows; a re-encoded
+    professor's old slot is freed (its id set to None). Removed professors
+    are tombstoned. Both kinds of dead slot stay in the matrix until they
+    pass TOMBSTONE_COMPACT_RATIO, and then a single compaction cuts them
+    out. Appends go into spare capacity at the end of each array, which
+    grows by doubling, so the existing rows are not copied on every update.
+
+    upsert and remove change the index they are called on. An index
+    other threads are reading is never changed: callers apply the update
+    to copy() and publish the copy instead.
+
+    Each save writes a complete new version directory (index_dir/v<N>)
+    and then atomically repoints index_dir/CURRENT at it, so other
+    processes never load a half-written index and can hot-reload by
+    watching current_version(). Loading memory-maps the arrays read-only,
+    so workers share their pages; the first update after a load copies
+    them into memory.
+
+    Files in each version directory:
+        meta.json        - model key, version, storage dtype, ids (None for a
+                           freed slot), hashes, tombstones
+        embeddings.npy   - L2-normalized token embeddings
+        offsets.npy      - int64 row offsets, len(ids) + 1
+        pooled.npy       - (len(ids), dim) L2-normalized pooled vectors
+        scales.npy       - int8 storage only: per-row scale
+        zero_points.npy  - int8 storage only: per-row zero point
+    """
+
+    def __init__(self, index_dir: Path, model_key: str, storage_dtype: str = "float32"):
+        if storage_dtype not in STORAGE_DTYPES:
+            raise ValueError(f"Unsupported storage dtype {storage_dtype!r}, expected one of {STORAGE_DTYPES}")
+        self.index_dir = Path(index_dir)
+        self.model_key = model_key
+        self.storage_dtype = storage_dtype
+        self.version = 0
+        self.ids: List[str] = []
+        self.hashes: List[str] = []
+        self.embeddings = np.zeros((0, 0), dtype=storage_dtype)
+        self.scales = np.zeros(0, dtype=np.float32)
+        self.zero_points = np.zeros(0, dtype=np.float32)
+        self.offsets = np.zeros(1, dtype=np.int64)
+        self.pooled = np.zeros((0, 0), dtype=np.float32)
+        self.tombstones: Set[str] = set()
+        self._positions: Dict[str, int] = {}
+        self._freed = 0
+        # Array name -> append buffer backing it, for arrays this index appended to
+        self._buffers: Dict[str, "_AppendBuffer"] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def current_version(index_dir: Path) -> Optional[int]:
+        """Version CURRENT points at, or None if nothing was saved yet."""
+        try:
+            name = (Path(index_dir) / "CURRENT").read_text().strip()
+        except OSError:
+            return None
+        return int(name[1:]) if name.startswith("v") and name[1:].isdigit() else None
+
+    @classmethod
+    def load(
+        cls, index_dir: Path, model_key: str, storage_dtype: str = "float32"
+    ) -> "ProfessorEmbeddingIndex":
+        """Open an index from disk, or start an empty one if missing or stale."""
+        index = cls(index_dir, model_key, storage_dtype)
+        version = cls.current_version(index.index_dir)
+        # Indexes saved before versioned directories keep their files at the top level
+        data_dir = index.index_dir / f"v{version}" if version is not None else index.index_dir
+        meta_path = data_dir / "meta.json"
+        if not meta_path.exists():
+            return index
+
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+            if meta.get("model_key") != model_key:
+                print(f"Professor index at {index.index_dir} built with another model, rebuilding")
+                return index
+            index.version = meta["version"]
+            index.ids = meta["ids"]
+            index.hashes = meta["hashes"]
+            index.tombstones = set(meta.get("tombstones", []))
+            index.storage_dtype = meta.get("storage_dtype", "float32")
+            index.embeddings = np.load(data_dir / "embeddings.npy", mmap_mode="r")
+            index.offsets = np.load(data_dir / "offsets.npy", mmap_mode="r")
+            index.pooled = np.load(data_dir / "pooled.npy", mmap_mode="r")
+            if index.storage_dtype == "int8":
+                index.scales = np.load(data_dir / "scales.npy", mmap_mode="r")
+                index.zero_points = np.load(data_dir / "zero_points.npy", mmap_mode="r")
+            index._positions = {pid: i for i, pid in enumerate(index.ids) if pid is not None}
+            index._freed = len(index.ids) - len(index._positions)
+        except Exception as e:
+            print(f"Failed to load professor index: {e}")
+            return cls(index_dir, model_key, storage_dtype)
+
+        if index.storage_dtype != storage_dtype:
+            print(f"Converting professor index from {index.storage_dtype} to {storage_dtype}")
+            index._convert_storage(storage_dtype)
+
+        print(f"✓ Loaded professor index ({len(index.ids)} professors, v{index.version}, {index.storage_dtype})")
+        return index
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def memory_bytes(self) -> int:
+        """Bytes held by the token matrix and its quantization parameters."""
+        return self.embeddings.nbytes + self.scales.nbytes + self.zero_points.nbytes
+
+    def copy(self) -> "ProfessorEmbeddingIndex":
+        """
+        Copy to apply an update to while readers keep using this index.
+
+        The arrays are shared rather than duplicated: upsert, remove and
+        _rebuild never write into rows this index can see. An upsert on
+        the copy may fill spare capacity past them, see _append.
+        """
+        clone = ProfessorEmbeddingIndex(self.index_dir, self.model_key, self.storage_dtype)
+        clone.version = self.version
+        clone.ids = list(self.ids)
+        clone.hashes = list(self.hashes)
+        clone.embeddings = self.embeddings
+        clone.scales = self.scales
+        clone.zero_points = self.zero_points
+        clone.offsets = self.offsets
+        clone.pooled = self.pooled
+        clone.tombstones = set(self.tombstones)
+        clone._positions = dict(self._positions)
+        clone._freed = self._freed
+        clone._buffers = dict(self._buffers)
+        return clone
+
+    def missing(self, ids: List[str], hashes: List[str]) -> List[int]:
+        """Positions in ids whose embeddings are absent or out of date."""
+        stale = []
+        for i, (pid, h) in enumerate(zip(ids, hashes)):
+            pos = self._positions.get(pid)
+            if pos is None or self.hashes[pos] != h or pid in self.tombstones:
+                stale.append(i)
+        return stale
+
+    def remove(self, ids: Iterable[str]) -> int:
+        """
+        Tombstone professors that are no longer in the catalog.
+
+        Returns:
+            Number of professors newly tombstoned
+        """
+        with self._lock:
+            removed = {pid for pid in ids if pid in self._positions} - self.tombstones
+            if not removed:
+                return 0
+            self.tombstones |= removed
+            self._compact_if_sparse()
+            self.version += 1
+        return len(removed)
+
+    def upsert(self, ids: List[str], hashes: List[str], token_embeddings: List[np.ndarray]) -> None:
+        """
+        Insert or replace professor embeddings.
+
+        The new embeddings are quantized and appended; unchanged
+        professors keep their stored rows where they are.
+
+        Args:
+            ids: Professor ids
+            hashes: Content hash for each professor's text
+            token_embeddings: One (tokens, dim) L2-normalized array per professor
+        """
+        if not ids:
+            return
+
+        # Last write wins if an id is passed twice
+        latest = {pid: (h, emb) for pid, h, emb in zip(ids, hashes, token_embeddings)}
+        ids = list(latest)
+        embeddings = [np.asarray(latest[pid][1], dtype=np.float32) for pid in ids]
+        stored = [self._encode_rows(emb) for emb in embeddings]
+        lengths = np.array([len(emb) for emb in embeddings], dtype=np.int64)
+
+        with self._lock:
+            for pid in ids:
+                old = self._positions.get(pid)
+                if old is not None:
+                    self.ids[old] = None
+                    self._freed += 1
+            self.tombstones -= set(ids)
+
+            start = len(self.ids)
+            self.ids.extend(ids)
+            self.hashes.extend(latest[pid][0] for pid in ids)
+            self._positions.update((pid, start + i) for i, pid in enumerate(ids))
+            self._append("embeddings", np.concatenate([rows for rows, _, _ in stored]))
+            if self.storage_dtype == "int8":
+                self._append("scales", np.concatenate([scales for _, scales, _ in stored]))
+                self._append("zero_points", np.concatenate([zero_points for _, _, zero_points in stored]))
+            self._append("offsets", self.offsets[-1] + np.cumsum(lengths))
+            self._append("pooled", np.stack([pooled_vector(emb) for emb in embeddings]))
+            self._compact_if_sparse()
+            self.version += 1
+
+    def _append(self, name: str, rows: np.ndarray) -> None:
+        """
+        Append rows to one of the index arrays without copying the existing ones.
+
+        The array is a view of the first rows of an _AppendBuffer. If this
+        index's view ends where the buffer's used rows end and there is
+        room, the rows are written into the spare capacity; an index copied
+        from the same base later finds the buffer already extended and
+        reallocates, so no published index ever sees its rows change.
+        Otherwise (first append, after a load or compaction, or out of room)
+        the array moves to a new buffer of twice the needed size.
+        """
+        current = getattr(self, name)
+        size = len(current)
+        if size == 0:
+            # Empty arrays don't know their row shape yet
+            current = np.zeros((0,) + rows.shape[1:], dtype=current.dtype)
+        with _append_lock:
+            buffer = self._buffers.get(name)
+            if buffer is None or buffer.used != size or size + len(rows) > len(buffer.array):
+                array = np.empty((2 * (size + len(rows)),) + current.shape[1:], dtype=current.dtype)
+                array[:size] = current
+                buffer = _AppendBuffer(array, size)
+                self._buffers[name] = buffer
+            buffer.array[size:size + len(rows)] = rows
+            buffer.used = size + len(rows)
+        setattr(self, name, buffer.array[:buffer.used])
+
+    def _compact_if_sparse(self) -> None:
+        """Cut freed and tombstoned slots out of the arrays once they pass the ratio."""
+        if self._freed + len(self.tombstones) > TOMBSTONE_COMPACT_RATIO * len(self.ids):
+            self._rebuild(self._entries())
+
+    def _entries(self) -> Dict[str, tuple]:
+        """pid -> (hash, stored rows, scales, zero points, pooled vector), tombstones dropped."""
+        return {
+            pid: (self.hashes[i], *self._stored_segment(i), self.pooled[i])
+            for i, pid in enumerate(self.ids)
+            if pid is not None and pid not in self.tombstones
+        }
+
+    def _rebuild(self, entries: Dict[str, tuple]) -> None:
+        """Lay the given entries out as fresh contiguous arrays."""
+        new_ids = list(entries.keys())
+        self.tombstones = set()
+        self._freed = 0
+        self._buffers = {}
+        if not new_ids:
+            dim = self.embeddings.shape[1] if self.embeddings.ndim == 2 else 0
+            self.ids, self.hashes = [], []
+            self.embeddings = np.zeros((0, dim), dtype=self.embeddings.dtype)
+            self.scales = np.zeros(0, dtype=np.float32)
+            self.zero_points = np.zeros(0, dtype=np.float32)
+            self.offsets = np.zeros(1, dtype=np.int64)
+            self.pooled = np.zeros((0, dim), dtype=np.float32)
+            self._positions = {}
+            return
+
+        lengths = np.array([len(entries[pid][1]) for pid in new_ids], dtype=np.int64)
+        self.ids = new_ids
+        self.hashes = [entries[pid][0] for pid in new_ids]
+        self.embeddings = np.concatenate([entries[pid][1] for pid in new_ids], axis=0)
+        if self.storage_dtype == "int8":
+            self.scales = np.concatenate([entries[pid][2] for pid in new_ids])
+            self.zero_points = np.concatenate([entries[pid][3] for pid in new_ids])
+        self.offsets = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+        self.pooled = np.stack([entries[pid][4] for pid in new_ids])
+        self._positions = {pid: i for i, pid in enumerate(new_ids)}
+
+    def positions_of(self, ids: List[str]) -> np.ndarray:
+        """Index positions of the given professor ids."""
+        return np.array([self._positions[pid] for pid in ids], dtype=np.int64)
+
+    def gather(self, ids: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Collect the token embeddings of the given professors as float32.
+
+        Returns:
+            Tuple of (embeddings, offsets) laid out in the order of ids
+        """
+        positions = self.positions_of(ids)
+        starts = self.offsets[positions]
+        lengths = self.offsets[positions + 1] - starts
+        offsets = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+
+        # Row indices of every token, segment by segment, without a Python loop
+        token_rows = np.arange(offsets[-1]) + np.repeat(starts - offsets[:-1], lengths)
+        return self._decode_rows(token_rows), offsets
+
+    def save(self) -> int:
+        """
+        Write the index as a new version directory and point CURRENT at it.
+
+        Holds an exclusive file lock so workers sharing index_dir never
+        publish the same version number for different contents. Doesn't
+        modify the index, so it can run while requests read it: if another
+        worker already published this version number, the copy is written
+        under the next free one and picked up by the usual hot reload.
+
+        Returns:
+            Version number written
+        """
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        with self._lock, open(self.index_dir / ".lock", "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            version = self.version
+            disk_version = self.current_version(self.index_dir)
+            if disk_version is not None and disk_version >= version:
+                version = disk_version + 1
+
+            version_dir = self.index_dir / f"v{version}"
+            tmp_dir = self.index_dir / f".v{version}.tmp"
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            tmp_dir.mkdir()
+
+            np.save(tmp_dir / "embeddings.npy", self.embeddings)
+            np.save(tmp_dir / "offsets.npy", self.offsets)
+            np.save(tmp_dir / "pooled.npy", self.pooled)
+            if self.storage_dtype == "int8":
+                np.save(tmp_dir / "scales.npy", self.scales)
+                np.save(tmp_dir / "zero_points.npy", self.zero_points)
+            meta = {
+                "model_key": self.model_key,
+                "version": version,
+                "storage_dtype": self.storage_dtype,
+                "ids": self.ids,
+                "hashes": self.hashes,
+                "tombstones": sorted(self.tombstones),
+            }
+            with open(tmp_dir / "meta.json", "w") as f:
+                json.dump(meta, f)
+
+            shutil.rmtree(version_dir, ignore_errors=True)
+            os.replace(tmp_dir, version_dir)
+            pointer_tmp = self.index_dir / "CURRENT.tmp"
+            pointer_tmp.write_text(f"v{version}")
+            os.replace(pointer_tmp, self.index_dir / "CURRENT")
+            self._prune_versions()
+        return version
+
+    def _prune_versions(self) -> None:
+        """Delete all but the newest INDEX_KEEP_VERSIONS old version directories."""
+        versions = sorted(
+            int(path.name[1:])
+            for path in self.index_dir.glob("v*")
+            if path.is_dir() and path.name[1:].isdigit()
+        )
+        for version in versions[:-(INDEX_KEEP_VERSIONS + 1)]:
+            shutil.rmtree(self.index_dir / f"v{version}", ignore_errors=True)
+
+    def _encode_rows(self, rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Convert float32 rows to the storage format."""
+        if self.storage_dtype == "int8":
+            return quantize_int8(rows)
+        empty = np.zeros(0, dtype=np.float32)
+        return rows.astype(self.storage_dtype), empty, empty
+
+    def _decode_rows(self, rows: np.ndarray) -> np.ndarray:
+        """Selected token rows as float32, dequantized block by block."""
+        decoded = np.empty((len(rows), self.embeddings.shape[1]), dtype=np.float32)
+        for start in range(0, len(rows), DEQUANTIZE_BLOCK_ROWS):
+            block = rows[start:start + DEQUANTIZE_BLOCK_ROWS]
+            if self.storage_dtype == "int8":
+                decoded[start:start + len(block)] = dequantize_int8(
+                    self.embeddings[block], self.scales[block], self.zero_points[block]
+                )
+            else:
+                decoded[start:start + len(block)] = self.embeddings[block]
+        return decoded
+
+    def _stored_segment(self, position: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        start, end = self.offsets[position], self.offsets[position + 1]
+        if self.storage_dtype == "int8":
+            return self.embeddings[start:end], self.scales[start:end], self.zero_points[start:end]
+        empty = np.zeros(0, dtype=np.float32)
+        return self.embeddings[start:end], empty, empty
+
+    def _convert_storage(self, storage_dtype: str) -> None:
+        self._buffers = {}
+        decoded = self._decode_rows(np.arange(len(self.embeddings)))
+        self.storage_dtype = storage_dtype
+        self.embeddings, scales, zero_points = self._encode_rows(decoded)
+        self.scales = scales if storage_dtype == "int8" else np.zeros(0, dtype=np.float32)
+        self.zero_points = zero_points if storage_dtype == "int8" else np.zeros(0, dtype=np.float32)
+
+
+class _AppendBuffer:
+    """Array with spare capacity; rows [0, used) are taken by some index."""
+
+    def __init__(self, array: np.ndarray, used: int):
+        self.array = array
+        self.used = used
+
+
+def pooled_vector(token_embedding: np.ndarray) -> np.ndarray:
+    """L2-normalized mean of a sequence's tokens, special tokens excluded."""
+    content = token_embedding[1:-1] if len(token_embedding) > 2 else token_embedding
+    vector = content.mean(axis=0)
+    return vector / max(float(np.linalg.norm(vector)), 1e-12)
+
+
+def greedy_match_f1(
+    ref_embedding: np.ndarray, cand_embeddings: np.ndarray, cand_offsets: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    BERTScore greedy matching of one reference against many candidates.
+
+    Returns:
+        Tuple of (precision, recall, f1) arrays, one value per candidate
+    """
+    ref_offsets = np.array([0, len(ref_embedding)], dtype=np.int64)
+    precision, recall, f1 = greedy_match_f1_matrix(
+        ref_embedding, ref_offsets, cand_embeddings, cand_offsets
+    )
+    return precision[0], recall[0], f1[0]
+
+
+def greedy_match_f1_matrix(
+    ref_embeddings: np.ndarray,
+    ref_offsets: np.ndarray,
+    cand_embeddings: np.ndarray,
+    cand_offsets: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    BERTScore greedy matching of many references against many candidates.
+
+    Mirrors bert_score's greedy_cos_idf without idf weighting: the first
+    and last token of every sequence ([CLS]/[SEP] or <s>/</s>) get zero
+    weight but still take part in the max over the other side.
+
+    The token similarity matrix is computed in tiles of whole references
+    by whole candidates, each at most about SIMILARITY_BLOCK_ELEMENTS
+    entries (a single sequence longer than that gets a tile of its own),
+    so memory stays bounded however many candidates are passed.
+
+    Args:
+        ref_embeddings: (ref_tokens, dim) L2-normalized reference tokens
+        ref_offsets: Row offsets of each reference, len(references) + 1
+        cand_embeddings: (cand_tokens, dim) L2-normalized candidate tokens
+        cand_offsets: Row offsets of each candidate, len(candidates) + 1
+
+    Returns:
+        Tuple of (precision, recall, f1) arrays of shape
+        (len(references), len(candidates))
+    """
+    ref_weights = _content_token_weights(ref_offsets, len(ref_embeddings))
+    cand_weights = _content_token_weights(cand_offsets, len(cand_embeddings))
+    precision = np.zeros((len(ref_offsets) - 1, len(cand_offsets) - 1), dtype=np.float32)
+    recall = np.zeros_like(precision)
+
+    # Wide reference tiles when all candidate tokens fit beside them, square-ish otherwise
+    ref_tile = max(math.isqrt(SIMILARITY_BLOCK_ELEMENTS), SIMILARITY_BLOCK_ELEMENTS // max(len(cand_embeddings), 1))
+    for r0, r1 in _sequence_blocks(ref_offsets, ref_tile):
+        ref_rows = slice(ref_offsets[r0], ref_offsets[r1])
+        cand_tile = max(1, SIMILARITY_BLOCK_ELEMENTS // (ref_offsets[r1] - ref_offsets[r0]))
+        for c0, c1 in _sequence_blocks(cand_offsets, cand_tile):
+            cand_rows = slice(cand_offsets[c0], cand_offsets[c1])
+            precision[r0:r1, c0:c1], recall[r0:r1, c0:c1] = _greedy_match_tile(
+                ref_embeddings[ref_rows], ref_offsets[r0:r1 + 1] - ref_offsets[r0], ref_weights[ref_rows],
+                cand_embeddings[cand_rows], cand_offsets[c0:c1 + 1] - cand_offsets[c0], cand_weights[cand_rows],
+            )
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        f1 = 2 * precision * recall / (precision + recall)
+    f1 = np.nan_to_num(f1)
+    return precision, recall, f1
+
+
+def _greedy_match_tile(
+    ref_embeddings: np.ndarray,
+    ref_offsets: np.ndarray,
+    ref_weights: np.ndarray,
+    cand_embeddings: np.ndarray,
+    cand_offsets: np.ndarray,
+    cand_weights: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Precision and recall of one tile of whole references by whole candidates."""
+    ref_starts = ref_offsets[:-1]
+    cand_starts = cand_offsets[:-1]
+
+    # All token pairs of the tile in a single matmul
+    sim = ref_embeddings @ cand_embeddings.T
+
+    # Precision: each candidate token against its best token in each reference
+    best_for_cand = np.maximum.reduceat(sim, ref_starts, axis=0) * cand_weights
+    cand_norm = np.maximum(np.add.reduceat(cand_weights, cand_starts), 1e-12)
+    precision = np.add.reduceat(best_for_cand, cand_starts, axis=1) / cand_norm
+
+    # Recall: each reference token against its best token in each candidate
+    best_for_ref = np.maximum.reduceat(sim, cand_starts, axis=1) * ref_weights[:, None]
+    ref_norm = np.maximum(np.add.reduceat(ref_weights, ref_starts), 1e-12)
+    recall = np.add.reduceat(best_for_ref, ref_starts, axis=0) / ref_norm[:, None]
+    return precision, recall
+
+
+def _sequence_blocks(offsets: np.ndarray, max_tokens: int) -> List[Tuple[int, int]]:
+    """
+    Split sequences into consecutive runs of at most max_tokens tokens.
+
+    Returns:
+        (first, end) sequence ranges; a run always holds at least one sequence
+    """
+    blocks = []
+    count = len(offsets) - 1
+    start = 0
+    while start < count:
+        end = int(np.searchsorted(offsets, offsets[start] + max_tokens, side="right")) - 1
+        end = min(max(end, start + 1), count)
+        blocks.append((start, end))
+        start = end
+    return blocks
+
+
+def _content_token_weights(offsets: np.ndarray, total_tokens: int) -> np.ndarray:
+    """Weight 1 for content tokens, 0 for each sequence's first and last token."""
+    weights = np.ones(total_tokens, dtype=np.float32)
+    weights[offsets[:-1]] = 0.0
+    weights[offsets[1:] - 1] = 0.0
+    return weights
@@ -0,0 +1,144 @@
+import re
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urljoin
+
+import soupsieve
+from bs4 import BeautifulSoup, SoupStrainer
+
+
+# Fallbacks when an institution's selectors find nothing
+CONTAINER_FALLBACK_RE = re.compile(r"faculty|professor|person", re.I)
+DEPARTMENT_FALLBACK_RE = re.compile(r"dept|department|school", re.I)
+RESEARCH_FALLBACK_RE = re.compile(r"research|interest|focus", re.I)
+HEADING_TAGS = ("h2", "h3", "h4")
+
+# "tag", "tag.class", ".class" or "tag.class1.class2" with nothing else
+SIMPLE_SELECTOR_RE = re.compile(r"^([a-zA-Z][\w-]*)?((?:\.[\w-]+)*)$")
+
+
+def _strainer_for(container_selector: str) -> Optional[SoupStrainer]:
+    """
+    Build a SoupStrainer that keeps only candidate container subtrees.
+
+    Only selector lists made of simple tag/class selectors can be turned
+    into a strainer; anything else (descendant combinators, ids,
+    attributes) returns None and the page is parsed in full. The strainer
+    may keep more than the selector matches, never less: the compiled
+    selector still runs on the strained tree.
+    """
+    tags = {"div"}  # the fallback container pattern looks at divs
+    classes = [CONTAINER_FALLBACK_RE.pattern]
+    for part in container_selector.split(","):
+        match = SIMPLE_SELECTOR_RE.match(part.strip())
+        if not match:
+            return None
+        tag, class_chain = match.groups()
+        if not class_chain:
+            # A bare tag selector matches regardless of class
+            return None
+        tags.add(tag.lower() if tag else None)
+        classes.extend(re.escape(cls) for cls in class_chain.split(".") if cls)
+
+    if None in tags:
+        tags = None
+    return SoupStrainer(
+        name=sorted(tags) if tags else None,
+        class_=re.compile("|".join(classes), re.I),
+    )
+
+
+class FacultyExtractor:
+    """
+    An institution config compiled once for listing-page extraction.
+
+    CSS selectors are compiled with soupsieve and the fallback regexes
+    are module constants, so the per-container loop does no parsing or
+    compiling. When the container selector allows it, the page is parsed
+    with a SoupStrainer and only container subtrees are ever built.
+    """
+
+    def __init__(self, config: Dict):
+        selectors = config["selectors"]
+        self.container = soupsieve.compile(selectors["professor_container"])
+        self.name = soupsieve.compile(selectors["name"])
+        self.department = soupsieve.compile(selectors["department"])
+        self.research = soupsieve.compile(selectors["research"])
+        self.profile_link = soupsieve.compile(selectors["profile_link"])
+        self.strainer = _strainer_for(selectors["professor_container"])
+
+    def parse(self, html: str) -> BeautifulSoup:
+        return BeautifulSoup(html, "lxml", parse_only=self.strainer)
+
+    def containers(self, soup: BeautifulSoup) -> List:
+        containers = self.container.select(soup)
+        if not containers:
+            containers = soup.find_all("div", class_=CONTAINER_FALLBACK_RE)
+        return containers
+
+    def extract(self, html: str, url: str, limit: Optional[int] = 20) -> List[Dict]:
+        """
+        Extract professor cards from one listing page.
+
+        Args:
+            html: Page body
+            url: Page URL, used to resolve relative profile links
+            limit: Max containers to read; None reads every container
+
+        Returns:
+            List of professor dicts (name, department, research_focus, profile_url)
+        """
+        return self.extract_soup(self.parse(html), url, limit)
+
+    def extract_soup(self, soup: BeautifulSoup, url: str, limit: Optional[int] = 20) -> List[Dict]:
+        """extract() on a page the caller already parsed, for callers that read more of it."""
+        professors = []
+        for container in self.containers(soup)[:limit]:
+            try:
+                professor = self._extract_one(container, url)
+            except Exception:
+                continue
+            if professor is not None:
+                professors.append(professor)
+        return professors
+
+    def _extract_one(self, container, url: str) -> Optional[Dict]:
+        name_elem = self.name.select_one(container)
+        if not name_elem:
+            name_elem = next(filter(None, (container.find(tag) for tag in HEADING_TAGS)), None)
+        name = name_elem.get_text(strip=True) if name_elem else ""
+        if not name or name == "Unknown":
+            return None
+
+        dept_elem = self.department.select_one(container)
+        if not dept_elem:
+            dept_elem = container.find(class_=DEPARTMENT_FALLBACK_RE)
+        department = dept_elem.get_text(strip=True) if dept_elem else "Unknown"
+
+        research_elem = self.research.select_one(container)
+        if not research_elem:
+            research_elem = container.find(class_=RESEARCH_FALLBACK_RE)
+        research = research_elem.get_text(strip=True) if research_elem else "Research interests not specified"
+
+        link_elem = self.profile_link.select_one(container)
+        profile_url = link_elem.get("href", "") if link_elem else ""
+        if profile_url and not profile_url.startswith("http"):
+            profile_url = urljoin(url, profile_url)
+
+        return {
+            "name": name,
+            "department": department,
+            "research_focus": research,
+            "profile_url": profile_url,
+        }
+
+
+# id(config) -> (config, extractor); the config is kept so its id stays unique
+_extractors: Dict[int, Tuple[Dict, FacultyExtractor]] = {}
+
+
+def get_extractor(config: Dict) -> FacultyExtractor:
+    """Return the compiled extractor for an institution config."""
+    entry = _extractors.get(id(config))
+    if entry is None or entry[0] is not config:
+        entry = _extractors[id(config)] = (config, FacultyExtractor(config))
+    return entry[1]
@@ -0,0 +1,105 @@
+import importlib.util
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import httpx
+
+from .replay import build_transport
+
+
+USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36"
+
+# Connection pool shared by every scrape on this worker
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "20"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "10"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "30"))
+# HTTP/2 needs the optional h2 package (pip install httpx[http2])
+HTTP2_ENABLED = os.getenv("HTTP2_ENABLED", "1") == "1" and importlib.util.find_spec("h2") is not None
+
+# Pages remembered for conditional GETs
+PAGE_CACHE_SIZE = int(os.getenv("HTTP_PAGE_CACHE_SIZE", "256"))
+
+_client: Optional[httpx.AsyncClient] = None
+
+# url -> (etag, last_modified, body)
+_page_cache: "OrderedDict[str, Tuple[Optional[str], Optional[str], str]]" = OrderedDict()
+_page_cache_lock = threading.Lock()
+
+fetch_stats: Dict[str, int] = {"requests": 0, "not_modified": 0}
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the application-wide AsyncClient, creating it on first use."""
+    global _client
+    if _client is None or _client.is_closed:
+        limits = httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+        )
+        _client = httpx.AsyncClient(
+            timeout=HTTP_TIMEOUT,
+            http2=HTTP2_ENABLED,
+            follow_redirects=True,
+            headers={"User-Agent": USER_AGENT},
+            limits=limits,
+            # Record/replay of recorded pages when HTTP_REPLAY_MODE is set
+            transport=build_transport(http2=HTTP2_ENABLED, limits=limits),
+        )
+    return _client
+
+
+async def close_http_client() -> None:
+    """Close the shared client; called on application shutdown."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+async def fetch_html(url: str) -> str:
+    """
+    GET a page through the shared client, revalidating when possible.
+
+    If an earlier response carried an ETag or Last-Modified header, the
+    request sends If-None-Match / If-Modified-Since, and a 304 answer is
+    served from the stored body instead of downloading the page again.
+    """
+    with _page_cache_lock:
+        cached = _page_cache.get(url)
+
+    headers = {}
+    if cached:
+        etag, last_modified, _ = cached
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+
+    response = await get_http_client().get(url, headers=headers)
+    fetch_stats["requests"] += 1
+
+    if response.status_code == 304 and cached:
+        fetch_stats["not_modified"] += 1
+        with _page_cache_lock:
+            if url in _page_cache:
+                _page_cache.move_to_end(url)
+        return cached[2]
+
+    response.raise_for_status()
+    html = response.text
+
+    etag = response.headers.get("ETag")
+    last_modified = response.headers.get("Last-Modified")
+    with _page_cache_lock:
+        if etag or last_modified:
+            _page_cache[url] = (etag, last_modified, html)
+            _page_cache.move_to_end(url)
+            while len(_page_cache) > PAGE_CACHE_SIZE:
+                _page_cache.popitem(last=False)
+        else:
+            _page_cache.pop(url, None)
+    return html
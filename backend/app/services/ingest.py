@@ -0,0 +1,339 @@
+"""
+Bulk resume ingestion: parse a directory or zip of PDFs to JSONL.
+
+Batches of PDFs are parsed across a pool of worker processes. Each
+worker loads spaCy once and classifies the section headers of a whole
+batch in one nlp.pipe pass. Records are appended to the output as
+batches finish, one JSON object per line:
+
+    {"source", "sha256", "parser_version", "resume": {...} | null, "error": null | "..."}
+
+Re-running with the same output file skips every source that already
+has a record, so an interrupted run picks up where it stopped and each
+source keeps a single record. --retry-failed drops the failure records
+and parses those sources again.
+
+A PDF that crashes its worker process (a broken pool) doesn't end the
+run: the pool is restarted, the sources of the lost batches are retried
+one per task, and a source that keeps crashing its worker gets an error
+record like any other failure.
+
+    cd backend
+    python -m app.services.ingest resumes/ --output parsed.jsonl --workers 4
+    python -m app.services.ingest fall-term.zip --output parsed.jsonl --batch-size 32
+    python -m app.services.ingest resumes/ --output parsed.jsonl --retry-failed
+"""
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import sys
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import asdict
+from pathlib import Path
+from typing import Callable, Deque, Dict, Iterator, List, Optional, Set, Tuple
+
+from .resume_parser import PARSER_VERSION, get_resume_parser
+
+
+# (id relative to the input, file or zip path, zip member or None)
+Source = Tuple[str, str, Optional[str]]
+
+# Times a source may crash a worker on its own before it is recorded as failed
+MAX_WORKER_CRASHES = 2
+
+
+def iter_sources(root: Path) -> Iterator[Source]:
+    """Every PDF under a directory, or every PDF member of a zip, in a stable order."""
+    if root.is_dir():
+        for path in sorted(root.rglob("*")):
+            if path.is_file() and path.suffix.lower() == ".pdf":
+                yield path.relative_to(root).as_posix(), str(path), None
+    elif zipfile.is_zipfile(root):
+        with zipfile.ZipFile(root) as archive:
+            for member in sorted(archive.namelist()):
+                if member.lower().endswith(".pdf") and not member.endswith("/"):
+                    yield member, str(root), member
+    else:
+        raise ValueError(f"{root} is neither a directory nor a zip archive")
+
+
+def completed_sources(output: Path, retry_failed: bool = False) -> Set[str]:
+    """
+    Sources that already have a record from an earlier run.
+
+    Failed sources count as done, so a PDF that crashes the parser isn't
+    retried (and recorded again) on every resume. With retry_failed the
+    failure records are dropped from the file, keeping one record per
+    source, and those sources are left to parse again.
+
+    A line cut short by an interrupted write is dropped from the file so
+    appending starts on a clean line.
+    """
+    done: Set[str] = set()
+    if not output.exists():
+        return done
+    with open(output, "rb+") as f:
+        data = f.read()
+        end = data.rfind(b"\n") + 1
+        if end < len(data):
+            f.truncate(end)
+
+    kept = []
+    for line in data[:end].splitlines():
+        record = json.loads(line)
+        if retry_failed and (record.get("error") is not None or record["source"] in done):
+            continue
+        done.add(record["source"])
+        kept.append(line)
+
+    if retry_failed and len(kept) < len(data[:end].splitlines()):
+        tmp_path = output.with_name(f".{output.name}.tmp")
+        with open(tmp_path, "wb") as f:
+            f.writelines(line + b"\n" for line in kept)
+        os.replace(tmp_path, output)
+    return done
+
+
+def _init_worker(quiet: bool) -> None:
+    if quiet:
+        # The parser logs every section of every resume
+        sys.stdout = open(os.devnull, "w")
+    get_resume_parser()
+
+
+def _new_executor(workers: int, quiet: bool) -> Executor:
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(quiet,),
+    )
+
+
+def new_record(source: Source, error: Optional[str] = None) -> Dict:
+    """Output record of one source; error is set when it produced no resume."""
+    return {"source": source[0], "sha256": None, "parser_version": PARSER_VERSION,
+            "resume": None, "error": error}
+
+
+def parse_batch(sources: List[Source]) -> List[Dict]:
+    """
+    Parse one batch of PDFs in the current process.
+
+    Extraction errors are recorded per source; the texts that were
+    extracted are parsed together with ResumeParser.parse_texts.
+    """
+    parser = get_resume_parser()
+    records = []
+    texts = []
+    archives: Dict[str, zipfile.ZipFile] = {}
+    try:
+        for source in sources:
+            _, path, member = source
+            record = new_record(source)
+            records.append(record)
+            try:
+                if member is None:
+                    data = Path(path).read_bytes()
+                else:
+                    if path not in archives:
+                        archives[path] = zipfile.ZipFile(path)
+                    data = archives[path].read(member)
+                record["sha256"] = hashlib.sha256(data).hexdigest()
+                full_text, _ = parser.extract_text_from_pdf(data)
+            except Exception as e:
+                record["error"] = f"Failed to extract text: {e}"
+                continue
+            texts.append((record, full_text))
+    finally:
+        for archive in archives.values():
+            archive.close()
+
+    try:
+        resumes = parser.parse_texts([full_text for _, full_text in texts])
+    except Exception as e:
+        for record, _ in texts:
+            record["error"] = f"Failed to parse resume: {e}"
+        return records
+    for (record, _), resume in zip(texts, resumes):
+        record["resume"] = asdict(resume)
+    return records
+
+
+def batched(sources: Iterator[Source], size: int) -> Iterator[List[Source]]:
+    batch: List[Source] = []
+    for source in sources:
+        batch.append(source)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def parse_in_pool(
+    batches: Iterator[List[Source]],
+    workers: int,
+    quiet: bool,
+    write: Callable[[List[Dict]], None],
+) -> None:
+    """
+    Parse batches across worker processes, surviving workers that crash.
+
+    A worker dying (a segfault in PDF extraction, the OOM killer) breaks
+    the whole pool and fails every batch in flight. The pool is then
+    replaced, and the sources of each lost batch are resubmitted one per
+    task to find the culprit. A source that breaks the pool
+    MAX_WORKER_CRASHES times on its own is written as a failure. Any other
+    error fails just its batch.
+    """
+    executor = _new_executor(workers, quiet)
+    retries: Deque[Tuple[List[Source], int]] = deque()
+    # future -> (batch, times it crashed a worker on its own)
+    in_flight: Dict[Future, Tuple[List[Source], int]] = {}
+
+    def submit(batch: List[Source], crashes: int) -> None:
+        nonlocal executor
+        try:
+            future = executor.submit(parse_batch, batch)
+        except BrokenProcessPool:
+            # Broke since the last check; its futures are handled as they complete
+            executor.shutdown(wait=True)
+            executor = _new_executor(workers, quiet)
+            future = executor.submit(parse_batch, batch)
+        in_flight[future] = (batch, crashes)
+
+    try:
+        while True:
+            # Keep a couple of batches queued per worker, not the whole corpus
+            while len(in_flight) < 2 * workers:
+                if retries:
+                    submit(*retries.popleft())
+                    continue
+                batch = next(batches, None)
+                if batch is None:
+                    break
+                submit(batch, 0)
+            if not in_flight:
+                break
+
+            finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in finished:
+                batch, crashes = in_flight.pop(future)
+                try:
+                    records = future.result()
+                except BrokenProcessPool:
+                    if len(batch) > 1:
+                        retries.extend(([source], 0) for source in batch)
+                    elif crashes + 1 < MAX_WORKER_CRASHES:
+                        retries.append((batch, crashes + 1))
+                    else:
+                        write([new_record(batch[0], "Parser worker crashed on this file")])
+                    continue
+                except Exception as e:
+                    records = [new_record(source, f"Failed to parse batch: {e}") for source in batch]
+                write(records)
+    finally:
+        executor.shutdown(cancel_futures=True)
+
+
+def ingest(
+    root: Path,
+    output: Path,
+    workers: int,
+    batch_size: int,
+    quiet: bool = True,
+    retry_failed: bool = False,
+) -> Dict[str, float]:
+    """
+    Parse every PDF under root into output, skipping ones already recorded.
+
+    Args:
+        root: Directory or zip archive of PDFs
+        output: JSONL file, appended to
+        workers: Parser processes; 0 parses in this process
+        batch_size: PDFs per nlp.pipe batch
+        quiet: Silence the parser's per-resume logging in the workers
+        retry_failed: Drop earlier failure records and parse those sources again
+
+    Returns:
+        Counters: parsed, failed, skipped, seconds, docs_per_second
+    """
+    done = completed_sources(output, retry_failed)
+    skipped = 0
+
+    def pending() -> Iterator[Source]:
+        nonlocal skipped
+        for source in iter_sources(root):
+            if source[0] in done:
+                skipped += 1
+            else:
+                yield source
+
+    if workers <= 0:
+        _init_worker(False)
+
+    parsed = failed = 0
+    start = time.perf_counter()
+    last_report = start
+
+    with open(output, "a", encoding="utf-8") as out:
+        def write(records: List[Dict]) -> None:
+            nonlocal parsed, failed, last_report
+            for record in records:
+                out.write(json.dumps(record, separators=(",", ":")) + "\n")
+                if record["error"] is None:
+                    parsed += 1
+                else:
+                    failed += 1
+            out.flush()
+            now = time.perf_counter()
+            if now - last_report >= 5:
+                last_report = now
+                rate = (parsed + failed) / (now - start)
+                print(f"  {parsed} parsed, {failed} failed, {skipped} skipped, {rate:.1f} docs/s", flush=True)
+
+        if workers <= 0:
+            for batch in batched(pending(), batch_size):
+                write(parse_batch(batch))
+        else:
+            parse_in_pool(batched(pending(), batch_size), workers, quiet, write)
+
+    seconds = time.perf_counter() - start
+    return {
+        "parsed": parsed,
+        "failed": failed,
+        "skipped": skipped,
+        "seconds": seconds,
+        "docs_per_second": (parsed + failed) / seconds if seconds else 0.0,
+    }
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Parse a directory or zip of resume PDFs to JSONL")
+    arg_parser.add_argument("input", type=Path, help="Directory or .zip of PDFs")
+    arg_parser.add_argument("--output", type=Path, required=True, help="JSONL file; existing results are kept and skipped")
+    arg_parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Parser processes, 0 for in-process")
+    arg_parser.add_argument("--batch-size", type=int, default=16, help="PDFs per worker batch")
+    arg_parser.add_argument("--verbose", action="store_true", help="Keep the parser's per-resume logging")
+    arg_parser.add_argument("--retry-failed", action="store_true", help="Parse sources with a failure record again")
+    args = arg_parser.parse_args()
+
+    stats = ingest(
+        args.input, args.output, args.workers, args.batch_size,
+        quiet=not args.verbose, retry_failed=args.retry_failed,
+    )
+    print(
+        f"✓ {stats['parsed']} parsed, {stats['failed']} failed, {stats['skipped']} already done "
+        f"in {stats['seconds']:.1f}s ({stats['docs_per_second']:.1f} docs/s) -> {args.output}"
+    )
+
+
+if __name__ == "__main__":
+    main()
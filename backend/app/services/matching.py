@@ -1,15 +1,627 @@
+import os
 import pandas as pd
-from bert_score import score
-from typing import Dict, List
+import numpy as np
+from bert_score import BERTScorer
+from bert_score.utils import get_bert_embedding
+from collections import OrderedDict, defaultdict
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+import threading
+import time
 import torch
-from resume_parser import ParsedResume
+from concurrent.futures import Future, ThreadPoolExecutor
+from .resume_parser import ParsedResume
+from .retrieval import BM25Index, professor_documents
+from .ann_index import IVFFlatIndex
+from .embedding_index import (
+    DEFAULT_INDEX_DIR,
+    PROFILE_FIELDS,
+    ProfessorEmbeddingIndex,
+    greedy_match_f1,
+    greedy_match_f1_matrix,
+    pooled_vector,
+    profile_hash,
+)
+
+
+# Process-wide scorer, loaded once at startup and shared by every request
+_scorer: Optional[BERTScorer] = None
+_scorer_lock = threading.Lock()
+
+# Precomputed professor embeddings, opened lazily against the loaded scorer.
+# The object behind _professor_index is never modified once published;
+# updates build a new index and swap it in under _index_lock.
+_professor_index: Optional[ProfessorEmbeddingIndex] = None
+_index_lock = threading.Lock()
+_index_checked_at = 0.0
+
+# How often a worker checks whether another process saved a newer index
+INDEX_RELOAD_SECONDS = float(os.getenv("PROFESSOR_INDEX_RELOAD_SECONDS", "5"))
+
+# Index saves run here, one at a time, so requests never wait on disk writes
+_index_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="professor-index")
+
+# ANN index over pooled professor vectors, built in the background per index version
+_ann_index: Optional[IVFFlatIndex] = None
+_ann_lock = threading.Lock()
+_ann_requested: Set[int] = set()
+
+# Row maps of catalog frames onto the index, per (catalog version, institutions)
+ANN_ROWS_CACHE_ENTRIES = int(os.getenv("ANN_ROWS_CACHE_ENTRIES", "16"))
+_ann_rows_cache: "OrderedDict[Tuple, tuple]" = OrderedDict()
+_ann_rows_lock = threading.Lock()
+# Frames whose missing professors are queued for a background sync
+_sync_requested: Set[Tuple] = set()
+
+# Columns of a professor record, as produced by scrape_institutions
+PROFESSOR_COLUMNS = [
+    "id", "name", "institution", "department",
+    "research_focus", "lab_group", "profile_url", "content_hash",
+]
+
+# Size of the candidate set passed to BERTScore reranking (0 disables)
+DEFAULT_PREFILTER_K = int(os.getenv("MATCH_PREFILTER_K", "300"))
+
+# First-stage retriever: "bm25" (lexical) or "ann" (pooled-vector IVF index)
+MATCH_RETRIEVER = os.getenv("MATCH_RETRIEVER", "bm25")
+ANN_NLIST = int(os.getenv("ANN_NLIST", "0")) or None
+ANN_NPROBE = int(os.getenv("ANN_NPROBE", "16"))
+# ANN hits fetched per wanted candidate, to survive filtering by institution
+ANN_OVERFETCH = int(os.getenv("ANN_OVERFETCH", "4"))
+
+# BM25 indexes kept, one per (catalog version, institutions) queried
+BM25_CACHE_ENTRIES = int(os.getenv("BM25_CACHE_ENTRIES", "16"))
+_bm25_cache: "OrderedDict[Tuple, BM25Index]" = OrderedDict()
+_bm25_lock = threading.Lock()
+
+# Bump when a change alters ranking output, so cached match results are dropped
+RANKING_VERSION = "2"
+
+# Professors gathered (dequantized to float32) at a time in batch matching
+BATCH_CANDIDATE_BLOCK = int(os.getenv("BATCH_CANDIDATE_BLOCK", "512"))
+
+
+class ScorerNotReady(RuntimeError):
+    """Raised when scoring is attempted before the startup load has finished."""
+
+
+def load_scorer() -> BERTScorer:
+    """
+    Load the shared BERTScorer and run a warm-up pass.
+
+    Safe to call from several threads; the model is only built once.
+    """
+    global _scorer
+    with _scorer_lock:
+        if _scorer is None:
+            # Use CPU if CUDA not available
+            device = "cuda" if torch.cuda.is_available() else "cpu"
+            model_type = os.getenv("BERTSCORE_MODEL_TYPE")
+            if model_type:
+                # Custom (e.g. small local) model: no published baseline to rescale with
+                scorer = BERTScorer(
+                    model_type=model_type,
+                    num_layers=int(os.getenv("BERTSCORE_NUM_LAYERS", "0")) or None,
+                    lang="en",
+                    rescale_with_baseline=False,
+                    device=device,
+                )
+            else:
+                scorer = BERTScorer(lang="en", rescale_with_baseline=True, device=device)
+            # Warm-up so the first request doesn't pay for lazy initialization
+            scorer.score(["warm up"], ["warm up"], verbose=False)
+            _scorer = scorer
+            print(f"✓ BERTScorer loaded on {device}")
+    return _scorer
+
+
+def get_scorer() -> BERTScorer:
+    """
+    Return the shared scorer.
+
+    Never loads the model: that takes minutes and would block the caller
+    (on a request, the whole event loop) behind _scorer_lock. Loading is
+    done once by load_scorer at startup.
+
+    Raises:
+        ScorerNotReady: If load_scorer hasn't finished (or failed)
+    """
+    if _scorer is None:
+        raise ScorerNotReady("BERTScorer is not loaded yet")
+    return _scorer
+
+
+def is_scorer_ready() -> bool:
+    """True once the shared scorer is loaded and warmed up."""
+    return _scorer is not None
+
+
+def get_professor_index() -> ProfessorEmbeddingIndex:
+    """
+    Return the shared professor embedding index for the loaded model.
+
+    At most every INDEX_RELOAD_SECONDS, checks whether another worker
+    published a newer version on disk and swaps it in. Updates never touch
+    a published index (see update_professor_index), so requests already
+    holding the old index finish on it.
+    """
+    global _professor_index, _index_checked_at
+    index = _professor_index
+    if index is not None and time.monotonic() - _index_checked_at < INDEX_RELOAD_SECONDS:
+        return index
+
+    scorer = get_scorer()
+    with _index_lock:
+        index_dir = os.getenv("PROFESSOR_INDEX_DIR", str(DEFAULT_INDEX_DIR))
+        model_key = f"{scorer.model_type}_L{scorer.num_layers}"
+        storage_dtype = os.getenv("PROFESSOR_INDEX_DTYPE", "float32")
+        if _professor_index is None:
+            _professor_index = ProfessorEmbeddingIndex.load(index_dir, model_key, storage_dtype)
+        elif time.monotonic() - _index_checked_at >= INDEX_RELOAD_SECONDS:
+            disk_version = ProfessorEmbeddingIndex.current_version(index_dir)
+            if disk_version is not None and disk_version > _professor_index.version:
+                fresh = ProfessorEmbeddingIndex.load(index_dir, model_key, storage_dtype)
+                # A failed or racing load comes back older; keep serving the current one
+                if fresh.version >= disk_version:
+                    _professor_index = fresh
+        _index_checked_at = time.monotonic()
+    return _professor_index
+
+
+def index_version() -> str:
+    """
+    Version of the professor embeddings results are computed from.
+
+    Changes whenever the embedding index is rebuilt for a new model or
+    any professor is added or re-encoded. Before the scorer is ready there
+    is no index yet; the API refuses to match until then, so "unindexed"
+    never ends up in a cached result.
+    """
+    if not is_scorer_ready():
+        return "unindexed"
+    index = get_professor_index()
+    return f"{index.model_key}:v{index.version}"
+
+
+def ann_index_dir(index: ProfessorEmbeddingIndex) -> Path:
+    """ANN index location: inside the embedding index's version directory."""
+    return index.index_dir / f"v{index.version}" / "ann"
+
+
+def get_ann_index(index: ProfessorEmbeddingIndex) -> Optional[IVFFlatIndex]:
+    """
+    Return the ANN index built from the given professor embeddings.
+
+    Memory-maps the copy saved in the index's version directory. Building
+    one runs k-means over every pooled vector, so it never happens here:
+    a missing index is queued on the background index writer and None is
+    returned until it has been saved.
+    """
+    global _ann_index
+    ann = _ann_index
+    if ann is not None and ann.version == index.version:
+        return ann
+
+    with _ann_lock:
+        if _ann_index is None or _ann_index.version != index.version:
+            ann = IVFFlatIndex.open(ann_index_dir(index))
+            if ann is None or ann.version != index.version or len(ann) != len(index):
+                if index.version not in _ann_requested:
+                    _ann_requested.add(index.version)
+                    _index_writer.submit(_build_ann_index, index)
+                return None
+            _ann_index = ann
+        return _ann_index
+
+
+def _build_ann_index(index: ProfessorEmbeddingIndex) -> None:
+    """Build and save the ANN index of a saved embedding index version."""
+    ann_dir = ann_index_dir(index)
+    # Only saved versions get one; an unsaved index is built after its save
+    if not ann_dir.parent.is_dir() or len(index) == 0:
+        return
+    existing = IVFFlatIndex.open(ann_dir)
+    if existing is not None and existing.version == index.version and len(existing) == len(index):
+        return
+    try:
+        IVFFlatIndex.build(index.pooled, nlist=ANN_NLIST, version=index.version).save(ann_dir)
+        print(f"✓ Built ANN index over {len(index)} professors (v{index.version})")
+    except Exception as e:
+        print(f"Failed to build ANN index: {e}")
+
+
+def encode_texts(texts: List[str]) -> List[np.ndarray]:
+    """
+    Encode texts into L2-normalized contextual token embeddings.
+
+    Uses the shared scorer's model and tokenizer, so the vectors are the
+    same ones BERTScore would compute internally.
+
+    Returns:
+        One (tokens, dim) float32 array per text, special tokens included
+    """
+    scorer = get_scorer()
+    idf_dict = defaultdict(lambda: 1.0)
+    batch_size = scorer.batch_size
+    encoded = []
+
+    for start in range(0, len(texts), batch_size):
+        batch = texts[start:start + batch_size]
+        embedding, mask, _ = get_bert_embedding(
+            batch,
+            scorer._model,
+            scorer._tokenizer,
+            idf_dict,
+            device=scorer.device,
+            all_layers=scorer.all_layers,
+        )
+        embedding = embedding / embedding.norm(dim=-1, keepdim=True)
+        embedding = embedding.cpu().numpy().astype(np.float32)
+        lengths = mask.sum(dim=1).tolist()
+        encoded.extend(embedding[i, :n] for i, n in enumerate(lengths))
+
+    return encoded
+
+
+@lru_cache(maxsize=32)
+def _encode_resume(resume_text: str) -> np.ndarray:
+    """Resume embedding, memoized so both retrieval stages share one encode."""
+    return encode_texts([resume_text])[0]
+
+
+def update_professor_index(
+    professor_ids: List[str],
+    candidate_texts: List[str],
+    hashes: List[str],
+    removed_ids: Iterable[str] = (),
+) -> Tuple[ProfessorEmbeddingIndex, int, int]:
+    """
+    Copy-on-write update of the shared professor index.
+
+    Stale profiles are encoded without holding any lock. The upsert and
+    tombstoning are then applied to a copy of the latest index, and the
+    copy replaces it in a single assignment, so concurrent readers see
+    either the old index or the new one, never one half-updated.
+
+    Args:
+        professor_ids: Professor ids to make current
+        candidate_texts: Text of each professor, encoded if stale
+        hashes: Content hash of each professor's text
+        removed_ids: Ids of professors to tombstone
+
+    Returns:
+        Tuple of (index to use, professors encoded, professors tombstoned)
+    """
+    global _professor_index
+    removed_ids = list(removed_ids)
+    stale = get_professor_index().missing(professor_ids, hashes)
+    if not stale and not removed_ids:
+        return get_professor_index(), 0, 0
+
+    encoded = []
+    if stale:
+        print(f"Encoding {len(stale)} new or changed professor profiles")
+        encoded = encode_texts([candidate_texts[i] for i in stale])
+
+    current = get_professor_index()
+    with _index_lock:
+        # Whatever was published meanwhile (another update, a reload) is the base
+        current = _professor_index or current
+        fresh = current.copy()
+        # Number the update past anything on disk so its save keeps the same number
+        disk_version = ProfessorEmbeddingIndex.current_version(fresh.index_dir)
+        fresh.version = max(fresh.version, disk_version or 0)
+        fresh.upsert([professor_ids[i] for i in stale], [hashes[i] for i in stale], encoded)
+        removed = fresh.remove(removed_ids)
+        if not stale and not removed:
+            return current, 0, 0
+        _professor_index = fresh
+    return fresh, len(stale), removed
+
+
+def persist_professor_index(index: ProfessorEmbeddingIndex) -> Future:
+    """
+    Save a published index in the background.
+
+    Saves are queued on a single writer thread. By the time one runs, a
+    newer update may have replaced the index; that update queued its own
+    save, which includes these changes, so the stale one is skipped.
+    """
+    return _index_writer.submit(_save_professor_index, index)
+
+
+def _save_professor_index(index: ProfessorEmbeddingIndex) -> None:
+    if index is not _professor_index:
+        return
+    try:
+        version = index.save()
+        print(f"✓ Saved professor index v{version} ({len(index)} professors)")
+    except Exception as e:
+        print(f"Failed to save professor index: {e}")
+        return
+    # Saved under another number, v<version>/ann would describe a different index
+    if MATCH_RETRIEVER == "ann" and version == index.version:
+        _build_ann_index(index)
+
+
+def close_index_writer() -> None:
+    """Finish queued index saves; called on shutdown."""
+    _index_writer.shutdown(wait=True)
+
+
+def sync_professor_index(
+    professor_ids: List[str], candidate_texts: List[str], hashes: List[str]
+) -> ProfessorEmbeddingIndex:
+    """
+    Encode any new or changed professors into the index.
+
+    The updated index is used right away from memory; writing it to disk
+    is left to the background writer.
+    """
+    index, encoded, _ = update_professor_index(professor_ids, candidate_texts, hashes)
+    if encoded:
+        persist_professor_index(index)
+    return index
+
+
+def ann_row_map(
+    professors_df: pd.DataFrame,
+) -> Optional[Tuple[ProfessorEmbeddingIndex, np.ndarray, np.ndarray]]:
+    """
+    Map the frame's rows onto the current professor index.
+
+    Cached per (catalog version, institutions) and published index, so
+    queries after the first do no per-professor work. Nothing is encoded
+    here: if the index is missing any of the professors, their sync is
+    queued on the background index writer and None is returned, and the
+    caller falls back to BM25 until it has been published.
+
+    Returns:
+        Tuple of (index, index position of each row, row of each index
+        position or -1), or None while the index is being synced
+    """
+    index = get_professor_index()
+    key = (professors_df.attrs.get("catalog_version"), professors_df.attrs.get("institutions"))
+    with _ann_rows_lock:
+        cached = _ann_rows_cache.get(key)
+        if cached is not None and cached[0] is index:
+            _ann_rows_cache.move_to_end(key)
+            if cached[1] is not None:
+                return cached
+            # Still syncing; a sync that failed is retried below
+            if key in _sync_requested:
+                return None
+
+    columns = professor_columns(professors_df)
+    professor_ids = [str(pid) for pid in columns["id"]]
+    hashes = professor_hashes(columns)
+    if index.missing(professor_ids, hashes):
+        entry = (index, None, None)
+        with _ann_rows_lock:
+            if key not in _sync_requested:
+                _sync_requested.add(key)
+                _index_writer.submit(
+                    _sync_in_background, key, professor_ids, create_professor_texts(columns), hashes
+                )
+    else:
+        positions = index.positions_of(professor_ids)
+        row_of_position = np.full(len(index.pooled), -1, dtype=np.int64)
+        row_of_position[positions] = np.arange(len(positions))
+        entry = (index, positions, row_of_position)
+
+    # Frames not read from the catalog have no version to key on
+    if None not in key:
+        with _ann_rows_lock:
+            _ann_rows_cache[key] = entry
+            _ann_rows_cache.move_to_end(key)
+            while len(_ann_rows_cache) > ANN_ROWS_CACHE_ENTRIES:
+                _ann_rows_cache.popitem(last=False)
+    return entry if entry[1] is not None else None
+
+
+def _sync_in_background(
+    key: Tuple, professor_ids: List[str], candidate_texts: List[str], hashes: List[str]
+) -> None:
+    """Index writer job: encode the professors a query found missing, then save."""
+    try:
+        index, encoded, _ = update_professor_index(professor_ids, candidate_texts, hashes)
+    except Exception as e:
+        print(f"Background professor index sync failed: {e}")
+        return
+    finally:
+        with _ann_rows_lock:
+            _sync_requested.discard(key)
+    if encoded:
+        _save_professor_index(index)
+
+
+def ann_prefilter(
+    resume_text: str,
+    index: ProfessorEmbeddingIndex,
+    positions: np.ndarray,
+    row_of_position: np.ndarray,
+    top_n: int,
+) -> np.ndarray:
+    """
+    First retrieval stage: approximate nearest neighbours of the resume.
+
+    Searches the IVF index over pooled professor vectors, keeps hits that
+    map to a row (see ann_row_map), and tops up with an exact pooled-vector
+    scan of the remaining rows if filtering left fewer than top_n. Until
+    the IVF index for the current embeddings is built, the exact scan
+    covers every row.
+
+    Returns:
+        Row positions of the top_n candidates for reranking
+    """
+    query = pooled_vector(_encode_resume(resume_text))
+    ann = get_ann_index(index)
+    rows = np.empty(0, dtype=np.int64)
+    if ann is not None:
+        hits, _ = ann.search(query, top_n * ANN_OVERFETCH, nprobe=ANN_NPROBE)
+        hits = np.asarray(hits, dtype=np.int64)
+        hits = hits[hits < len(row_of_position)]
+        rows = row_of_position[hits]
+        rows = rows[rows >= 0][:top_n]
+
+    if len(rows) < top_n:
+        remaining = np.setdiff1d(np.arange(len(positions)), rows)
+        scores = index.pooled[positions[remaining]] @ query
+        extra = remaining[np.argsort(-scores)[:top_n - len(rows)]]
+        rows = np.concatenate([rows, extra])
+
+    return np.sort(rows.astype(np.int64))
+
+
+def score_against_index(
+    resume_text: str, professor_ids: List[str], candidate_texts: List[str], hashes: List[str]
+) -> np.ndarray:
+    """
+    BERTScore F1 of the resume against precomputed professor embeddings.
+
+    Only professors that are new or whose content hash changed are
+    encoded (and written back to the index); the resume is the only
+    other encode.
+
+    Returns:
+        Rescaled F1 score per professor, in input order
+    """
+    index = sync_professor_index(professor_ids, candidate_texts, hashes)
+
+    resume_embedding = _encode_resume(resume_text)
+    embeddings, offsets = index.gather(professor_ids)
+    _, _, f1 = greedy_match_f1(resume_embedding, embeddings, offsets)
+    return _rescale_f1(f1)
+
+
+def score_matrix_against_index(
+    resume_texts: List[str], professor_ids: List[str], candidate_texts: List[str], hashes: List[str]
+) -> np.ndarray:
+    """
+    BERTScore F1 of many resumes against the same professors.
+
+    Resumes are encoded in model batches. Professors are gathered
+    BATCH_CANDIDATE_BLOCK at a time, and greedy_match_f1_matrix tiles the
+    token similarities of all resumes against each group, so neither the
+    decoded embeddings nor the similarity matrix grow with the whole
+    candidate set.
+
+    Returns:
+        (len(resume_texts), len(professor_ids)) rescaled F1 matrix
+    """
+    index = sync_professor_index(professor_ids, candidate_texts, hashes)
+    resume_embeddings = encode_texts(resume_texts)
+    lengths = [len(emb) for emb in resume_embeddings]
+    ref_offsets = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+    ref_embeddings = np.concatenate(resume_embeddings)
+
+    scores = np.empty((len(resume_texts), len(professor_ids)), dtype=np.float32)
+    for start in range(0, len(professor_ids), BATCH_CANDIDATE_BLOCK):
+        block = professor_ids[start:start + BATCH_CANDIDATE_BLOCK]
+        embeddings, offsets = index.gather(block)
+        _, _, f1 = greedy_match_f1_matrix(ref_embeddings, ref_offsets, embeddings, offsets)
+        scores[:, start:start + len(block)] = f1
+    return _rescale_f1(scores)
+
+
+def _rescale_f1(f1: np.ndarray) -> np.ndarray:
+    """Same baseline rescaling BERTScorer applies to F1."""
+    scorer = get_scorer()
+    if scorer.rescale_with_baseline:
+        baseline = float(scorer.baseline_vals[2])
+        f1 = (f1 - baseline) / (1 - baseline)
+    return f1
+
+
+def keyword_scores(resume_text: str, candidate_texts: List[str]) -> List[float]:
+    """Fallback similarity: share of candidate words found in the resume."""
+    resume_lower = resume_text.lower()
+    similarity_scores = [
+        sum(1 for word in cand.lower().split() if word in resume_lower)
+        for cand in candidate_texts
+    ]
+    return [float(s) / max(len(c.split()), 1) for s, c in zip(similarity_scores, candidate_texts)]
+
+
+def prefilter_rows(
+    resume_texts: List[str], professors_df: pd.DataFrame, prefilter_k: int
+) -> List[np.ndarray]:
+    """
+    First retrieval stage for one or more resumes.
+
+    Uses the ANN index when MATCH_RETRIEVER=ann, falling back to BM25 if
+    it fails or the embedding index is still being synced; either index
+    is shared by all resumes.
+
+    Returns:
+        Candidate row positions for each resume
+    """
+    if MATCH_RETRIEVER == "ann":
+        try:
+            row_map = ann_row_map(professors_df)
+            if row_map is not None:
+                return [ann_prefilter(text, *row_map, prefilter_k) for text in resume_texts]
+        except Exception as e:
+            print(f"ANN retrieval failed, using BM25: {e}")
+
+    bm25 = get_bm25_index(professors_df)
+    return [bm25.search(text, prefilter_k) for text in resume_texts]
+
+
+def get_bm25_index(professors_df: pd.DataFrame) -> BM25Index:
+    """
+    BM25 index over the professors, cached per catalog version and institutions.
+
+    Frames read from the catalog carry both in their attrs; any other frame
+    gets a fresh index. After a refresh the background refresher rebuilds
+    the cached sets (warm_bm25_indexes), so requests rarely build one.
+    """
+    key = (professors_df.attrs.get("catalog_version"), professors_df.attrs.get("institutions"))
+    if None in key:
+        return BM25Index(professor_documents(professors_df))
+
+    with _bm25_lock:
+        bm25 = _bm25_cache.get(key)
+        if bm25 is not None:
+            _bm25_cache.move_to_end(key)
+            return bm25
+
+    bm25 = BM25Index(professor_documents(professors_df))
+    with _bm25_lock:
+        _bm25_cache[key] = bm25
+        _bm25_cache.move_to_end(key)
+        while len(_bm25_cache) > BM25_CACHE_ENTRIES:
+            _bm25_cache.popitem(last=False)
+    return bm25
+
+
+def warm_bm25_indexes(get_professors: Callable[[List[str]], pd.DataFrame]) -> None:
+    """
+    Rebuild the cached BM25 indexes against the current catalog.
+
+    Called by the catalog refresher after a change, with its get_professors,
+    so the institution sets requests use are indexed before they ask again.
+    """
+    with _bm25_lock:
+        institution_sets = list(dict.fromkeys(institutions for _, institutions in _bm25_cache))
+    versions = set()
+    for institutions in institution_sets:
+        professors_df = get_professors(list(institutions))
+        get_bm25_index(professors_df)
+        versions.add(professors_df.attrs.get("catalog_version"))
+    # Indexes of superseded catalog versions won't be asked for again
+    with _bm25_lock:
+        for key in [key for key in _bm25_cache if key[0] not in versions]:
+            del _bm25_cache[key]
 
 
 def create_resume_text(resume: ParsedResume) -> str:
     """Create a concatenated text representation of the resume."""
-    skills = " ".join(resume.skills_section)
+    # The extracted entries; skills_section / experience_section are only header names
+    skills = " ".join(resume.skills_raw_text)
     
-    experiences = " ".join(resume.experience_section)
+    experiences = " ".join(resume.experience_raw_text)
     
     return f"skills: {skills}  experiences: {experiences}".strip()
 
@@ -24,85 +636,231 @@ def create_professor_text(professor_row: pd.Series) -> str:
     return f"{name} {department} {research} {lab_group}".strip()
 
 
+def professor_columns(professors_df: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """Pull each professor column out once as an object array."""
+    n = len(professors_df)
+    return {
+        col: professors_df[col].to_numpy(dtype=object)
+        if col in professors_df.columns
+        else np.full(n, None, dtype=object)
+        for col in PROFESSOR_COLUMNS
+    }
+
+
+def create_professor_texts(
+    columns: Dict[str, np.ndarray], rows: Optional[np.ndarray] = None
+) -> List[str]:
+    """
+    Columnar create_professor_text for many professors at once.
+
+    Missing values become empty strings instead of "nan".
+    """
+    parts = []
+    for col in ("name", "department", "research_focus", "lab_group"):
+        values = columns[col] if rows is None else columns[col][rows]
+        values = np.where(pd.isna(values), "", values)
+        parts.append(values.tolist())
+    return [f"{n} {d} {r} {l}".strip() for n, d, r, l in zip(*parts)]
+
+
+def professor_hashes(columns: Dict[str, np.ndarray], rows: Optional[np.ndarray] = None) -> List[str]:
+    """Content hash per professor: the stored one, computed if the record lacks it."""
+    if rows is None:
+        rows = np.arange(len(columns["id"]))
+    hashes = []
+    for row in rows:
+        stored = columns["content_hash"][row]
+        if isinstance(stored, str) and stored:
+            hashes.append(stored)
+        else:
+            hashes.append(profile_hash({field: columns[field][row] for field in PROFILE_FIELDS}))
+    return hashes
+
+
+def reindex_professors(changed: List[Dict], removed_ids: List[str]) -> None:
+    """
+    Apply one catalog refresh to the embedding index.
+
+    Encodes only the changed or new records (skipping any a request has
+    already synced), tombstones removed professors, and publishes the
+    result as a new index version for every worker to pick up. A no-op
+    until the scorer is loaded; requests then sync lazily instead.
+
+    Args:
+        changed: New or changed professor records with content_hash set
+        removed_ids: Ids of professors no longer listed
+    """
+    if not is_scorer_ready():
+        return
+
+    ids = [str(prof["id"]) for prof in changed]
+    hashes = [prof.get("content_hash") or profile_hash(prof) for prof in changed]
+    columns = {
+        field: np.array([prof.get(field) for prof in changed], dtype=object)
+        for field in PROFILE_FIELDS
+    }
+    index, encoded, removed = update_professor_index(
+        ids, create_professor_texts(columns), hashes, removed_ids
+    )
+    if encoded or removed:
+        persist_professor_index(index)
+        print(f"✓ Re-indexed {encoded} professors, tombstoned {removed} (index v{index.version})")
+
+
+def top_k_rows(scores: np.ndarray, top_k: int) -> np.ndarray:
+    """Positions of the top_k scores, best first, without a full sort."""
+    top_k = min(top_k, len(scores))
+    if top_k <= 0:
+        return np.zeros(0, dtype=np.int64)
+    top = np.argpartition(-scores, top_k - 1)[:top_k]
+    return top[np.argsort(-scores[top], kind="stable")]
+
+
+def professor_records(columns: Dict[str, np.ndarray], rows: np.ndarray) -> List[Dict]:
+    """Build response dictionaries for the given rows only."""
+    def optional(col: str, row: int) -> Optional[str]:
+        value = columns[col][row]
+        return None if pd.isna(value) else str(value)
+
+    return [
+        {
+            "id": str(columns["id"][row]),
+            "name": str(columns["name"][row]),
+            "institution": str(columns["institution"][row]),
+            "department": str(columns["department"][row]),
+            "research_focus": str(columns["research_focus"][row]),
+            "lab_group": optional("lab_group", row),
+            "profile_url": optional("profile_url", row),
+        }
+        for row in rows
+    ]
+
+
 def rank_professors(
-    resume_profile: ParsedResume, professors_df: pd.DataFrame, top_k: int = 3
+    resume_profile: ParsedResume,
+    professors_df: pd.DataFrame,
+    top_k: int = 3,
+    prefilter_k: Optional[int] = None,
 ) -> List[Dict]:
     """
     Rank professors by semantic similarity to resume using BERTScore.
+
+    Large faculty sets go through two stages: a first-stage retriever
+    (BM25 over research focus, department and lab group, or the ANN index
+    over pooled embeddings when MATCH_RETRIEVER=ann) picks prefilter_k
+    candidates, and only those are reranked with BERTScore.
     
     Args:
         resume_profile: Parsed resume dictionary
         professors_df: DataFrame with professor information
         top_k: Number of top matches to return
+        prefilter_k: First-stage candidate set size; defaults to
+            MATCH_PREFILTER_K, 0 scores every professor
     
     Returns:
         List of top_k professor dictionaries
+
+    Raises:
+        ScorerNotReady: If the model hasn't loaded yet. Only failures
+            while scoring fall back to keyword matching.
     """
+    get_scorer()
     if professors_df.empty:
         return []
     
     # Create reference text from resume
     resume_text= create_resume_text(resume_profile)
+
+    # Work on column arrays and row positions instead of DataFrame rows
+    columns = professor_columns(professors_df)
+    candidate_rows = np.arange(len(professors_df))
     
-  
+    # Stage 1: prefilter down to the candidates worth reranking
+    if prefilter_k is None:
+        prefilter_k = DEFAULT_PREFILTER_K
+    if prefilter_k and len(professors_df) > prefilter_k:
+        candidate_rows = prefilter_rows([resume_text], professors_df, prefilter_k)[0]
     
     # Create candidate texts from professors
-    candidate_texts = [
-        create_professor_text(row) for _, row in professors_df.iterrows()
-    ]
+    candidate_texts = create_professor_texts(columns, candidate_rows)
     
     if not candidate_texts or not any(c.strip() for c in candidate_texts):
         return []
     
     try:
-        # Compute BERTScore
-        # Use CPU if CUDA not available
-        device = "cuda" if torch.cuda.is_available() else "cpu"
-        
-        P, R, F1 = score(
-            cands=candidate_texts,
-            refs=[resume_text] * len(candidate_texts),
-            lang="en",
-            verbose=False,
-            device=device,
-            rescale_with_baseline=True,
+        # Use BERTScore F1 against the precomputed professor embeddings
+        professor_ids = [str(pid) for pid in columns["id"][candidate_rows]]
+        similarity_scores = score_against_index(
+            resume_text, professor_ids, candidate_texts, professor_hashes(columns, candidate_rows)
         )
         
-        # Use F1 score for ranking
-        similarity_scores = F1.cpu().numpy()
-        
     except Exception as e:
         print(f"BERTScore computation failed: {e}")
         # Fallback: simple keyword matching
-        resume_lower = resume_text.lower()
-        similarity_scores = [
-            sum(1 for word in cand.lower().split() if word in resume_lower)
-            for cand in candidate_texts
-        ]
-        similarity_scores = [float(s) / max(len(c.split()), 1) for s, c in zip(similarity_scores, candidate_texts)]
-    
-    # Add similarity scores to dataframe
-    professors_df = professors_df.copy()
-    professors_df["similarity"] = similarity_scores
+        similarity_scores = keyword_scores(resume_text, candidate_texts)
     
-    # Sort by similarity (descending)
-    professors_df = professors_df.sort_values("similarity", ascending=False)
-    
-    # Get top k
-    top_professors = professors_df.head(top_k)
-    
-    # Convert to list of dictionaries
-    result = []
-    for _, row in top_professors.iterrows():
-        result.append({
-            "id": str(row.get("id", "")),
-            "name": str(row.get("name", "")),
-            "institution": str(row.get("institution", "")),
-            "department": str(row.get("department", "")),
-            "research_focus": str(row.get("research_focus", "")),
-            "lab_group": str(row.get("lab_group", "")) if pd.notna(row.get("lab_group")) else None,
-            "profile_url": str(row.get("profile_url", "")) if pd.notna(row.get("profile_url")) else None,
-        })
-    
-    return result
+    # Partial selection of the winners, then materialize only those
+    top_rows = top_k_rows(np.asarray(similarity_scores, dtype=np.float32), top_k)
+    return professor_records(columns, candidate_rows[top_rows])
+
+
+def rank_professors_batch(
+    resume_profiles: List[ParsedResume],
+    professors_df: pd.DataFrame,
+    top_k: int = 3,
+    prefilter_k: Optional[int] = None,
+) -> List[List[Dict]]:
+    """
+    Rank the same professors for many resumes in one pass.
+
+    The candidate set is the union of each resume's first-stage hits, and
+    every resume is scored against it in a single resumes x professors
+    BERTScore matrix.
+
+    Args:
+        resume_profiles: Parsed resumes
+        professors_df: DataFrame with professor information
+        top_k: Number of top matches to return per resume
+        prefilter_k: First-stage candidate set size per resume
+
+    Returns:
+        One list of top_k professor dictionaries per resume, in input order
+
+    Raises:
+        ScorerNotReady: If the model hasn't loaded yet
+    """
+    get_scorer()
+    if professors_df.empty or not resume_profiles:
+        return [[] for _ in resume_profiles]
+
+    resume_texts = [create_resume_text(resume) for resume in resume_profiles]
+    columns = professor_columns(professors_df)
+    candidate_rows = np.arange(len(professors_df))
+
+    if prefilter_k is None:
+        prefilter_k = DEFAULT_PREFILTER_K
+    if prefilter_k and len(professors_df) > prefilter_k:
+        candidate_rows = np.unique(np.concatenate(
+            prefilter_rows(resume_texts, professors_df, prefilter_k)
+        ))
+
+    candidate_texts = create_professor_texts(columns, candidate_rows)
+    if not candidate_texts or not any(c.strip() for c in candidate_texts):
+        return [[] for _ in resume_profiles]
+
+    try:
+        professor_ids = [str(pid) for pid in columns["id"][candidate_rows]]
+        score_matrix = score_matrix_against_index(
+            resume_texts, professor_ids, candidate_texts, professor_hashes(columns, candidate_rows)
+        )
+    except Exception as e:
+        print(f"BERTScore computation failed: {e}")
+        score_matrix = np.array(
+            [keyword_scores(text, candidate_texts) for text in resume_texts], dtype=np.float32
+        )
+
+    return [
+        professor_records(columns, candidate_rows[top_k_rows(row_scores, top_k)])
+        for row_scores in score_matrix
+    ]
 
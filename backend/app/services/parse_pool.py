@@ -0,0 +1,272 @@
+import asyncio
+import itertools
+import multiprocessing
+import os
+import signal
+import threading
+import weakref
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import asdict
+from typing import Dict, Optional, Tuple
+
+from .cache import parsed_resume_cache, parsed_resume_cache_key
+from .resume_parser import PARSER_VERSION, ParsedResume, parse_resume, preload_resume_parser
+
+
+# Parser processes per API worker; 0 parses on a thread in this process
+RESUME_PARSE_WORKERS = int(os.getenv("RESUME_PARSE_WORKERS", str(min(os.cpu_count() or 1, 4))))
+# Uploads allowed to wait for a free parser before new ones are turned away
+RESUME_PARSE_QUEUE = int(os.getenv("RESUME_PARSE_QUEUE", str(2 * max(RESUME_PARSE_WORKERS, 1))))
+# Seconds one upload may spend queued plus parsing
+RESUME_PARSE_TIMEOUT = float(os.getenv("RESUME_PARSE_TIMEOUT", "30"))
+# "spawn" keeps torch/uvicorn threads out of the children; "forkserver" also works
+RESUME_PARSE_START_METHOD = os.getenv("RESUME_PARSE_START_METHOD", "spawn")
+# Pools an upload may be submitted to; a job lost with a broken pool is retried on the next
+RESUME_PARSE_ATTEMPTS = 2
+
+
+class ParserBusy(RuntimeError):
+    """Raised when every parser slot and queue slot is taken."""
+
+
+class ParseTimeout(RuntimeError):
+    """Raised when an upload isn't parsed within RESUME_PARSE_TIMEOUT."""
+
+
+# Child side: this child's (pid, running job id) pair in the pool's shared table
+_running = None
+_slot = -1
+
+
+def _init_worker(running=None, next_slot=None) -> None:
+    global _running, _slot
+    if running is not None:
+        with next_slot.get_lock():
+            _slot = next_slot.value
+            next_slot.value += 1
+        _running = running
+        _running[2 * _slot] = os.getpid()
+        _running[2 * _slot + 1] = -1
+    # Load spaCy once per child, before its first job
+    preload_resume_parser(freeze=False)
+
+
+def _parse_job(job_id: int, pdf_bytes: bytes) -> Tuple[ParsedResume, str]:
+    """Child side of one upload: mark which job this process runs, then parse."""
+    _running[2 * _slot + 1] = job_id
+    try:
+        return parse_resume(pdf_bytes)
+    finally:
+        _running[2 * _slot + 1] = -1
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+class ResumeParsePool:
+    """
+    Bounded pool of resume parser processes.
+
+    PyMuPDF extraction and spaCy run in child processes that load the
+    model once at start, so a large PDF never blocks the event loop and
+    concurrent uploads use every core. At most workers + queue_size
+    uploads are admitted at a time; beyond that parse() raises ParserBusy
+    right away instead of letting work pile up. A slot is only freed
+    when its job really finishes. A job that runs past the timeout gets
+    the one process running it killed, so a hung PDF can't hold a slot
+    for good. A dead child breaks a ProcessPoolExecutor as a whole, so
+    the pool is then replaced (built on a worker thread) and the other
+    jobs it took down are resubmitted; only the hung or crashing upload
+    fails. Uploads already in the parsed-resume cache skip the pool
+    entirely.
+
+    With workers=0 the same admission rules apply but parsing runs on a
+    single thread of this process, since PyMuPDF is not thread-safe. A
+    thread can't be interrupted, so there a timed-out parse keeps its
+    slot until it finishes.
+
+    Must be used from a single event loop.
+    """
+
+    def __init__(self, workers: int, queue_size: int, timeout: float):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self.capacity = max(workers, 1) + queue_size
+        self._executor: Optional[Executor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._in_flight = 0
+        self._start_lock = threading.Lock()
+        self._job_ids = itertools.count()
+        # Current pool's shared table of (pid, running job id or -1) per child
+        self._running = None
+        # Pools this one broke on purpose by killing a hung child
+        self._killed: "weakref.WeakSet[Executor]" = weakref.WeakSet()
+        self.stats: Dict[str, int] = {"parsed": 0, "rejected": 0, "timeouts": 0, "crashes": 0}
+
+    def start(self) -> None:
+        """Start the child processes and have each load the spaCy model."""
+        with self._start_lock:
+            if self._executor is not None:
+                return
+            if self.workers <= 0:
+                preload_resume_parser(freeze=False)
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="resume-parser")
+                return
+            context = multiprocessing.get_context(RESUME_PARSE_START_METHOD)
+            running = context.Array("q", [0, -1] * self.workers)
+            executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=context,
+                initializer=_init_worker,
+                initargs=(running, context.Value("i", 0)),
+            )
+            # Spawn every worker now so the first uploads don't pay for model loading
+            for _ in range(self.workers):
+                executor.submit(_ping)
+            self._running = running
+            self._executor = executor
+            print(f"✓ Started {self.workers} resume parser processes")
+
+    def saturated(self) -> bool:
+        return self._in_flight >= self.capacity
+
+    async def parse(self, pdf_bytes: bytes, wait: bool = False) -> Tuple[ParsedResume, str]:
+        """
+        Parse one resume off the event loop.
+
+        Args:
+            pdf_bytes: Uploaded PDF
+            wait: Queue for a slot instead of raising ParserBusy
+
+        Returns:
+            Tuple of (ParsedResume, full extracted text)
+        """
+        # A repeat upload costs a hash, not a parser slot
+        cache_key = parsed_resume_cache_key(pdf_bytes, PARSER_VERSION)
+        cached = parsed_resume_cache.get(cache_key)
+        if cached is not None:
+            return ParsedResume(**cached["resume"]), cached["text"]
+
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.capacity)
+        if not wait and self._slots.locked():
+            self.stats["rejected"] += 1
+            raise ParserBusy("Resume parser is at capacity")
+
+        await self._slots.acquire()
+        self._in_flight += 1
+        loop = asyncio.get_running_loop()
+        # The job most recently submitted for this upload
+        attempt: Dict = {"job": None}
+
+        def release() -> None:
+            self._in_flight -= 1
+            self._slots.release()
+
+        try:
+            result = await asyncio.wait_for(self._run(pdf_bytes, attempt), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            self.stats["timeouts"] += 1
+            # The child is still busy with the PDF; only killing it frees the slot
+            job, executor = attempt["job"], attempt.get("executor")
+            if isinstance(executor, ProcessPoolExecutor) and not job.done() and not job.cancel():
+                await self._kill_job(executor, attempt["job_id"])
+            raise ParseTimeout(f"Resume parsing took longer than {self.timeout:.0f}s")
+        finally:
+            # Freed by the job itself, so a timed-out caller keeps its slot taken
+            job = attempt["job"]
+            if job is None or job.done():
+                release()
+            else:
+                job.add_done_callback(lambda _: loop.call_soon_threadsafe(release))
+        self.stats["parsed"] += 1
+        resume, full_text = result
+        parsed_resume_cache.set(cache_key, {"resume": asdict(resume), "text": full_text})
+        return result
+
+    async def _run(self, pdf_bytes: bytes, attempt: Dict) -> Tuple[ParsedResume, str]:
+        """Submit the upload, resubmitting it if a broken pool takes it down."""
+        for tries in range(1, RESUME_PARSE_ATTEMPTS + 1):
+            executor = self._executor
+            if executor is None:
+                await asyncio.to_thread(self.start)
+                executor = self._executor
+            job_id = next(self._job_ids)
+            try:
+                if isinstance(executor, ProcessPoolExecutor):
+                    job = executor.submit(_parse_job, job_id, pdf_bytes)
+                else:
+                    job = executor.submit(parse_resume, pdf_bytes)
+                attempt.update(job=job, job_id=job_id, executor=executor)
+                return await asyncio.wrap_future(job)
+            except BrokenProcessPool:
+                # Counted once per pool, by the first job to notice
+                if executor not in self._killed and executor is self._executor:
+                    # A child died (e.g. crashed inside the PDF library)
+                    self.stats["crashes"] += 1
+                await self._restart(executor)
+                if tries == RESUME_PARSE_ATTEMPTS:
+                    raise RuntimeError("Resume parser process crashed")
+
+    async def _kill_job(self, executor: ProcessPoolExecutor, job_id: int) -> None:
+        """
+        Kill the child running a job; the pool breaks and is replaced.
+
+        A job no child has reported starting is still queued behind others
+        and is left to run; its slot stays taken until it does.
+        """
+        if self._executor is not executor:
+            # Already broken and replaced; its children were terminated with it
+            return
+        pid = self._pid_of(job_id)
+        if pid is None:
+            return
+        self._killed.add(executor)
+        try:
+            os.kill(pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        await self._restart(executor)
+
+    def _pid_of(self, job_id: int) -> Optional[int]:
+        """Pid of the child currently running a job of this pool, if any."""
+        table = self._running[:]
+        for i in range(0, len(table), 2):
+            if table[i + 1] == job_id:
+                return table[i]
+        return None
+
+    async def _restart(self, executor: Executor) -> None:
+        """Replace a broken pool, unless another caller already did."""
+        if self._executor is not executor:
+            return
+        self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+        # Spawning children and loading spaCy in them must not block the loop
+        await asyncio.to_thread(self.start)
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+_parse_pool: Optional[ResumeParsePool] = None
+
+
+def get_parse_pool() -> ResumeParsePool:
+    """Return this API worker's parser pool, creating it on first use."""
+    global _parse_pool
+    if _parse_pool is None:
+        _parse_pool = ResumeParsePool(RESUME_PARSE_WORKERS, RESUME_PARSE_QUEUE, RESUME_PARSE_TIMEOUT)
+    return _parse_pool
+
+
+def close_parse_pool() -> None:
+    global _parse_pool
+    if _parse_pool is not None:
+        _parse_pool.close()
+        _parse_pool = None
@@ -0,0 +1,273 @@
+"""
+Record and replay HTTP responses for offline, repeatable scraping.
+
+HTTP_REPLAY_MODE selects how the shared httpx client reaches the network:
+
+    record  - fetch live and store every 200 and redirect response in
+              HTTP_REPLAY_ARCHIVE
+    replay  - answer from the archive only; unknown URLs get a 404
+    server  - send every request to a local archive server
+              (HTTP_REPLAY_SERVER), so sockets and HTTP parsing are real
+
+Start the local server with:
+
+    cd backend
+    python -m app.services.replay serve --archive data/replay --port 8765
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import httpx
+
+
+DEFAULT_ARCHIVE_DIR = Path(__file__).resolve().parents[2] / "data" / "replay"
+
+HTTP_REPLAY_MODE = os.getenv("HTTP_REPLAY_MODE", "")
+HTTP_REPLAY_ARCHIVE = os.getenv("HTTP_REPLAY_ARCHIVE", str(DEFAULT_ARCHIVE_DIR))
+HTTP_REPLAY_SERVER = os.getenv("HTTP_REPLAY_SERVER", "http://127.0.0.1:8765")
+
+# Header carrying the original URL to the local archive server
+REPLAY_URL_HEADER = "X-Replay-URL"
+
+# Response headers worth keeping; hop-by-hop and encoding headers are
+# dropped because bodies are stored decoded. Location lets a replayed
+# redirect be followed like the live one.
+KEPT_HEADERS = ("content-type", "etag", "last-modified", "cache-control", "location")
+
+
+class PageArchive:
+    """
+    On-disk archive of fetched pages.
+
+    index.jsonl is an append-only log of "METHOD url" -> status, headers
+    and body file name; the last line for a key wins. Bodies are stored
+    once per content hash under bodies/, so pages that repeat (error
+    pages, identical listings) cost nothing extra.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict] = {}
+        index_path = self.path / "index.jsonl"
+        if index_path.exists():
+            with open(index_path) as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self._entries[entry["key"]] = entry
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def key(method: str, url: str) -> str:
+        return f"{method.upper()} {url}"
+
+    def get(self, method: str, url: str) -> Optional[Tuple[int, Dict[str, str], bytes]]:
+        """Stored (status, headers, body) for a request, or None."""
+        entry = self._entries.get(self.key(method, url))
+        if entry is None:
+            return None
+        body = (self.path / "bodies" / entry["body"]).read_bytes()
+        return entry["status"], entry["headers"], body
+
+    def add(self, method: str, url: str, status: int, headers: Dict[str, str], body: bytes) -> None:
+        """Store one response; body must already be content-decoded."""
+        body_name = hashlib.sha256(body).hexdigest()
+        bodies_dir = self.path / "bodies"
+        entry = {
+            "key": self.key(method, url),
+            "status": status,
+            "headers": {k: v for k, v in headers.items() if k.lower() in KEPT_HEADERS},
+            "body": body_name,
+            "recorded_at": time.time(),
+        }
+        with self._lock:
+            bodies_dir.mkdir(parents=True, exist_ok=True)
+            body_path = bodies_dir / body_name
+            if not body_path.exists():
+                body_path.write_bytes(body)
+            with open(self.path / "index.jsonl", "a") as f:
+                f.write(json.dumps(entry) + "\n")
+            self._entries[entry["key"]] = entry
+
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """
+    Pass requests through to the network and archive the responses.
+
+    Full pages and redirects are archived. The client follows redirects
+    itself, so each hop comes through here as its own request and a replay
+    walks the same chain. Archive writes run on a worker thread.
+    """
+
+    def __init__(self, archive: PageArchive, inner: Optional[httpx.AsyncBaseTransport] = None):
+        self.archive = archive
+        self.inner = inner or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        response = await self.inner.handle_async_request(request)
+        # Raw bytes go back to the client untouched; the archive keeps them decoded
+        raw = b"".join([chunk async for chunk in response.aiter_raw()])
+        await response.aclose()
+        # Full pages and redirect hops are useful to replay; a 304 has no body to store
+        if response.status_code == 200 or response.is_redirect:
+            await asyncio.to_thread(
+                self._archive, request, response.status_code, response.headers, raw
+            )
+        return httpx.Response(
+            response.status_code,
+            headers=response.headers,
+            content=raw,
+            extensions=response.extensions,
+        )
+
+    def _archive(self, request: httpx.Request, status: int, headers: httpx.Headers, raw: bytes) -> None:
+        decoded = httpx.Response(status, headers=headers, content=raw).read()
+        self.archive.add(request.method, str(request.url), status, dict(headers), decoded)
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
+
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    """Answer every request from the archive, without touching the network."""
+
+    def __init__(self, archive: PageArchive):
+        self.archive = archive
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        stored = await asyncio.to_thread(self.archive.get, request.method, str(request.url))
+        if stored is None:
+            return httpx.Response(404, headers={"X-Replay-Miss": "1"}, request=request)
+        status, headers, body = stored
+        return httpx.Response(status, headers=headers, content=body, request=request)
+
+
+class LocalServerTransport(httpx.AsyncBaseTransport):
+    """Route every request to the local archive server, keeping the original URL in a header."""
+
+    def __init__(self, server_url: str, inner: Optional[httpx.AsyncBaseTransport] = None):
+        self.server_url = httpx.URL(server_url)
+        self.inner = inner or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        headers = dict(request.headers)
+        headers[REPLAY_URL_HEADER] = str(request.url)
+        headers.pop("host", None)
+        routed = httpx.Request(
+            request.method,
+            self.server_url.copy_with(path="/replay"),
+            headers=headers,
+            content=request.content,
+        )
+        return await self.inner.handle_async_request(routed)
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
+
+
+def build_transport(**transport_options) -> Optional[httpx.AsyncBaseTransport]:
+    """
+    Transport for the shared client according to HTTP_REPLAY_MODE.
+
+    Args:
+        transport_options: Passed to the underlying AsyncHTTPTransport
+            (limits, http2) in record and server mode
+
+    Returns:
+        A transport, or None to let httpx use its default
+    """
+    if HTTP_REPLAY_MODE == "record":
+        print(f"✓ Recording HTTP responses to {HTTP_REPLAY_ARCHIVE}")
+        return RecordingTransport(PageArchive(HTTP_REPLAY_ARCHIVE), httpx.AsyncHTTPTransport(**transport_options))
+    if HTTP_REPLAY_MODE == "replay":
+        archive = PageArchive(HTTP_REPLAY_ARCHIVE)
+        print(f"✓ Replaying {len(archive)} recorded responses from {HTTP_REPLAY_ARCHIVE}")
+        return ReplayTransport(archive)
+    if HTTP_REPLAY_MODE == "server":
+        print(f"✓ Sending HTTP requests to replay server {HTTP_REPLAY_SERVER}")
+        return LocalServerTransport(HTTP_REPLAY_SERVER, httpx.AsyncHTTPTransport(**transport_options))
+    return None
+
+
+def serve_archive(archive: PageArchive, host: str = "127.0.0.1", port: int = 8765, latency_ms: float = 0) -> ThreadingHTTPServer:
+    """
+    Serve an archive over HTTP/1.1 keep-alive on a background thread.
+
+    Requests name the page in the X-Replay-URL header. Stored ETags are
+    honoured, so conditional GETs get 304s just like the real site.
+
+    Args:
+        archive: Archive to serve
+        host: Interface to bind
+        port: Port to bind, 0 for any free port
+        latency_ms: Delay added to every response, to mimic a remote site
+    """
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            if latency_ms:
+                time.sleep(latency_ms / 1000)
+            stored = archive.get("GET", self.headers.get(REPLAY_URL_HEADER, ""))
+            if stored is None:
+                self.send_response(404)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+
+            status, headers, body = stored
+            etag = next((v for k, v in headers.items() if k.lower() == "etag"), None)
+            if etag and self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Serve a recorded page archive over HTTP")
+    subcommands = arg_parser.add_subparsers(dest="command", required=True)
+    serve = subcommands.add_parser("serve")
+    serve.add_argument("--archive", default=HTTP_REPLAY_ARCHIVE)
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8765)
+    serve.add_argument("--latency-ms", type=float, default=0)
+    args = arg_parser.parse_args()
+
+    archive = PageArchive(args.archive)
+    server = serve_archive(archive, args.host, args.port, args.latency_ms)
+    print(f"✓ Serving {len(archive)} recorded responses on http://{args.host}:{server.server_address[1]}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
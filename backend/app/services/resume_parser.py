@@ -1,14 +1,79 @@
+import gc
+import os
 import re
+import threading
 import fitz  # PyMuPDF
 import spacy
 from pathlib import Path
-from typing import Dict, List, Tuple, Optional
-from collections import defaultdict
+from typing import Dict, Iterable, List, Tuple, Optional
+from collections import OrderedDict, defaultdict
 import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
 from dataclasses import dataclass
 
 
+SPACY_MODEL = os.getenv("SPACY_MODEL", "en_core_web_sm")
+# Section typing only needs token vectors; these components never run
+SPACY_DISABLED = ["parser", "ner", "lemmatizer"]
+
+# Minimum header/keyword-set cosine similarity for a semantic match
+SEMANTIC_MATCH_THRESHOLD = 0.3
+# Distinct headers whose semantic match is remembered across resumes
+HEADER_MEMO_SIZE = int(os.getenv("RESUME_HEADER_MEMO_SIZE", "4096"))
+# Pages of a PDF that are extracted; the rest of a long upload is never rendered
+RESUME_MAX_PAGES = int(os.getenv("RESUME_MAX_PAGES", "5"))
+
+# Content heuristics of _content_based_matching, compiled once
+YEAR_RE = re.compile(r'\d{4}')
+ACTION_VERB_RE = re.compile(r'\b(?:developed|managed|led|designed|implemented)\b', re.IGNORECASE)
+
+# Bump when a parsing change alters ParsedResume output, so cached parses are dropped
+PARSER_VERSION = f"1:{SPACY_MODEL}:{SEMANTIC_MATCH_THRESHOLD}:{RESUME_MAX_PAGES}"
+
+
+def _trie_pattern(words: Iterable[str]) -> str:
+    """Regex alternation of words factored by common prefix, so each position is tried once per branch."""
+    trie: Dict = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def emit(node: Dict) -> str:
+        branches = [re.escape(char) + emit(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+        # A word ends here too: the rest is optional, and greedy so the longest keyword wins
+        return f"(?:{body})?" if "" in node else body
+
+    return emit(trie)
+
+
+def keyword_group_matcher(groups: Dict[str, Iterable[str]]) -> Tuple["re.Pattern", Dict[str, str]]:
+    """
+    One compiled regex over the keywords of every group.
+
+    Args:
+        groups: Group name -> keywords, highest priority first
+
+    Returns:
+        Tuple of (pattern, keyword -> group). A keyword containing a
+        keyword of a higher-priority group maps to that group, so
+        consuming the longer match never hides the better group.
+    """
+    keyword_groups = {}
+    for group, keywords in reversed(list(groups.items())):
+        for keyword in keywords:
+            keyword_groups[keyword] = group
+    for keyword in keyword_groups:
+        for group, keywords in groups.items():
+            if any(other in keyword for other in keywords):
+                keyword_groups[keyword] = group
+                break
+    return re.compile(_trie_pattern(keyword_groups)), keyword_groups
+
+
 @dataclass
 class ParsedResume:
     """Data class for parsed resume content"""
@@ -27,13 +92,15 @@ class ResumeParser:
         """Initialize parser with spaCy model for NLP processing"""
         # Load English model for NLP
         try:
-            self.nlp = spacy.load("en_core_web_sm")
+            self.nlp = spacy.load(SPACY_MODEL, disable=SPACY_DISABLED)
         except OSError:
             print("⚠️  spaCy model not found. Installing...")
             import subprocess
-            subprocess.run(["python", "-m", "spacy", "download", "en_core_web_sm"], 
+            subprocess.run(["python", "-m", "spacy", "download", SPACY_MODEL], 
                          capture_output=True)
-            self.nlp = spacy.load("en_core_web_sm")
+            self.nlp = spacy.load(SPACY_MODEL, disable=SPACY_DISABLED)
+        # One parser is shared by every request; spaCy calls go one at a time
+        self.nlp_lock = threading.Lock()
         
         # Keywords for section identification
         self.skills_keywords = {
@@ -54,45 +121,71 @@ class ResumeParser:
             'university', 'college', 'school', 'credentials'
         }
         
-        # TF-IDF vectorizer for semantic similarity
-        self.tfidf_vectorizer = TfidfVectorizer(
-            lowercase=True,
-            stop_words='english',
-            ngram_range=(1, 2)
-        )
+        # All header keywords in one pattern; earlier groups win when several occur
+        self.section_groups = ["SKILLS", "EXPERIENCE", "EDUCATION"]
+        self.section_keyword_re, self.section_keyword_groups = keyword_group_matcher({
+            "SKILLS": self.skills_keywords,
+            "EXPERIENCE": self.experience_keywords,
+            "EDUCATION": self.education_keywords,
+        })
+        
+        # Unit vectors of the skills and experience keyword sets, computed once
+        self.keyword_set_types = ["SKILLS", "EXPERIENCE"]
+        self.keyword_set_vectors = self._unit_vectors([
+            " ".join(sorted(self.skills_keywords)),
+            " ".join(sorted(self.experience_keywords)),
+        ])
+        
+        # Lowercased header -> semantic match (None: ambiguous, decide by content)
+        self.header_memo: "OrderedDict[str, Optional[str]]" = OrderedDict()
+        self.memo_lock = threading.Lock()
     
     def extract_text_from_pdf(self, file) -> Tuple[str, Dict]:
         """
-        Extract text from PDF file-like object with structure preservation.
+        Extract text from PDF with structure preservation, in one pass.
+        
+        Only the first RESUME_MAX_PAGES pages are extracted; MuPDF loads
+        pages on demand, so the pages after that are never parsed.
         
         Args:
-            file: a file-like object containing the PDF (e.g., from Flask's request.files["file"])
+            file: PDF bytes, a path to the PDF, or a file-like object
+                containing it
             
         Returns:
             Tuple of (full_text, block_info with positions)
         """
-        # Read from file object (buffer), fitz can read from bytes
-        file.seek(0)
-        pdf_document = fitz.open(stream=file.read(), filetype="pdf")
-        full_text = ""
+        texts = []
         block_info = defaultdict(list)
         
-        # Extract text block by block to preserve structure
-        for page_num, page in enumerate(pdf_document):
-            # Get text blocks with bounding boxes
-            blocks = page.get_text("blocks")
-            
-            for block in blocks:
-                if block[4]:  # Text block (not image)
-                    text = block[4].strip()
-                    if text:
-                        # Store text with vertical position (Y-coordinate)
-                        # Y-coordinate helps identify section hierarchy
-                        y_position = block[1]
-                        block_info[y_position].append(text)
-                        full_text += text + "\n"
-        
-        pdf_document.close()
+        # fitz reads bytes in place and a path lazily; only a file-like object is read first
+        if isinstance(file, (str, Path)):
+            pdf_document = fitz.open(file, filetype="pdf")
+        else:
+            if isinstance(file, (bytes, bytearray)):
+                data = file
+            else:
+                file.seek(0)
+                data = file.read()
+            pdf_document = fitz.open(stream=data, filetype="pdf")
+        
+        with pdf_document:
+            if pdf_document.page_count > RESUME_MAX_PAGES:
+                print(f"⚠️  Extracting the first {RESUME_MAX_PAGES} of {pdf_document.page_count} pages")
+            # Extract text block by block to preserve structure
+            for page_number in range(min(pdf_document.page_count, RESUME_MAX_PAGES)):
+                page = pdf_document.load_page(page_number)
+                # Get text blocks with bounding boxes
+                for block in page.get_text("blocks"):
+                    if block[4]:  # Text block (not image)
+                        text = block[4].strip()
+                        if text:
+                            # Store text with vertical position (Y-coordinate)
+                            # Y-coordinate helps identify section hierarchy
+                            block_info[block[1]].append(text)
+                            texts.append(text)
+        
+        # One join instead of growing a string block by block
+        full_text = "\n".join(texts) + "\n" if texts else ""
         return full_text, block_info
 
     def split_into_sections(self, text: str) -> Dict[str, str]:
@@ -166,55 +259,128 @@ class ResumeParser:
         
         return True
     
-    def identify_section_type(self, section_name: str, section_content: str) -> str:
-      
-        section_name_lower = section_name.lower()
-        
-        # Direct keyword matching (highest confidence)
-        for keyword in self.skills_keywords:
-            if keyword in section_name_lower:
-                return "SKILLS"
-        
-        for keyword in self.experience_keywords:
-            if keyword in section_name_lower:
-                return "EXPERIENCE"
+    def classify_sections(self, sections: Dict[str, str]) -> Dict[str, str]:
+        """
+        Identify the type of every section of one resume.
         
-        for keyword in self.education_keywords:
-            if keyword in section_name_lower:
-                return "EDUCATION"
+        Headers that keyword matching can't place are resolved together:
+        one nlp.pipe pass over the headers not seen before, then cosine
+        similarity against the precomputed keyword-set vectors in NumPy.
         
-        # Semantic similarity fallback
-        section_type = self._semantic_section_matching(section_name, section_content)
-        return section_type
+        Args:
+            sections: Section name -> section content
+            
+        Returns:
+            Section name -> SKILLS, EXPERIENCE, EDUCATION or OTHER
+        """
+        return self.classify_sections_batch([sections])[0]
+    
+    def classify_sections_batch(self, sections_list: List[Dict[str, str]]) -> List[Dict[str, str]]:
+        """Like classify_sections, with one nlp.pipe pass for the headers of many resumes."""
+        results = []
+        ambiguous = []
+        for sections in sections_list:
+            section_types = {}
+            for section_name in sections:
+                section_type = self._keyword_section_type(section_name)
+                if section_type:
+                    section_types[section_name] = section_type
+                else:
+                    ambiguous.append(section_name.lower())
+            results.append(section_types)
+        
+        semantic = self._semantic_header_types(ambiguous)
+        for sections, section_types in zip(sections_list, results):
+            for section_name, section_content in sections.items():
+                if section_name in section_types:
+                    continue
+                section_type = semantic[section_name.lower()]
+                if section_type is None:
+                    # Analyze content if header is ambiguous
+                    section_type = self._content_based_matching(section_name, section_content)
+                section_types[section_name] = section_type
+        return results
+    
+    def _keyword_section_type(self, section_name: str) -> Optional[str]:
+        """Direct keyword match on the header, or None."""
+        return self.match_keyword_group(section_name.lower())
     
-    def _semantic_section_matching(self, section_name: str, section_content: str) -> str:
+    def match_keyword_group(self, text: str) -> Optional[str]:
         """
-        Use NLP-based semantic similarity to match section type.
+        Keyword group hit by lowercased text, in one scan.
         
-        Compares section header to known keyword sets using spaCy word vectors.
-        Falls back to content analysis if header is unclear.
+        Returns:
+            SKILLS, EXPERIENCE or EDUCATION (the first in that order with a
+            keyword in text), or None
         """
-        # Use spaCy to process section name
-        doc_name = self.nlp(section_name.lower())
-        
-        if not doc_name.has_vector:
-            # If no vector, use simple keyword matching fallback
-            return self._content_based_matching(section_name, section_content)
-        
-        # Calculate similarity to keyword sets
-        skills_doc = self.nlp(" ".join(self.skills_keywords))
-        experience_doc = self.nlp(" ".join(self.experience_keywords))
-        
-        skills_sim = doc_name.similarity(skills_doc)
-        experience_sim = doc_name.similarity(experience_doc)
+        best = None
+        match = self.section_keyword_re.search(text)
+        while match is not None:
+            group = self.section_keyword_groups[match.group()]
+            if best is None or self.section_groups.index(group) < self.section_groups.index(best):
+                best = group
+                if best == self.section_groups[0]:
+                    break
+            # Resume inside the match: another keyword may overlap its tail
+            match = self.section_keyword_re.search(text, match.start() + 1)
+        return best
+    
+    def _semantic_header_types(self, headers: List[str]) -> Dict[str, Optional[str]]:
+        """
+        Semantic match of lowercased headers, memoized across resumes.
         
-        if skills_sim > experience_sim and skills_sim > 0.3:
-            return "SKILLS"
-        elif experience_sim > 0.3:
-            return "EXPERIENCE"
+        Returns:
+            Header -> SKILLS or EXPERIENCE, or None when no keyword set is
+            similar enough (or the header has no vector)
+        """
+        results = {}
+        with self.memo_lock:
+            for header in headers:
+                if header in self.header_memo:
+                    self.header_memo.move_to_end(header)
+                    results[header] = self.header_memo[header]
+        
+        unseen = list(dict.fromkeys(h for h in headers if h not in results))
+        if not unseen:
+            return results
+        
+        vectors = self._unit_vectors(unseen)
+        # (headers, keyword sets); rows of headers without a vector are all zero
+        if vectors.shape[1] == self.keyword_set_vectors.shape[1]:
+            similarity = vectors @ self.keyword_set_vectors.T
         else:
-            # Analyze content if header is ambiguous
-            return self._content_based_matching(section_name, section_content)
+            similarity = np.zeros((len(unseen), len(self.keyword_set_types)), dtype=np.float32)
+        
+        computed = {}
+        for i, header in enumerate(unseen):
+            skills_sim, experience_sim = similarity[i]
+            if skills_sim > experience_sim and skills_sim > SEMANTIC_MATCH_THRESHOLD:
+                computed[header] = "SKILLS"
+            elif experience_sim > SEMANTIC_MATCH_THRESHOLD:
+                computed[header] = "EXPERIENCE"
+            else:
+                computed[header] = None
+        
+        with self.memo_lock:
+            for header, section_type in computed.items():
+                self.header_memo[header] = section_type
+            while len(self.header_memo) > HEADER_MEMO_SIZE:
+                self.header_memo.popitem(last=False)
+        results.update(computed)
+        return results
+    
+    def _unit_vectors(self, texts: List[str]) -> np.ndarray:
+        """L2-normalized doc vectors of texts from one nlp.pipe pass; zero rows if no vector."""
+        with self.nlp_lock:
+            docs = list(self.nlp.pipe(texts))
+        rows = [doc.vector if doc.has_vector else None for doc in docs]
+        dim = next((len(row) for row in rows if row is not None), 0)
+        matrix = np.zeros((len(docs), dim), dtype=np.float32)
+        for i, row in enumerate(rows):
+            if row is not None:
+                matrix[i] = row
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
     
     def _content_based_matching(self, section_name: str, section_content: str) -> str:
         """
@@ -232,14 +398,16 @@ class ResumeParser:
         experience_indicators = 0
         
         for line in lines:
+            has_year = YEAR_RE.search(line) is not None
+            
             # Skills patterns: comma-separated, slash-separated, short
-            if ',' in line or '/' in line or (len(line) < 60 and not re.search(r'\d{4}', line)):
+            if ',' in line or '/' in line or (len(line) < 60 and not has_year):
                 skill_indicators += 1
             
             # Experience patterns: dates, action verbs, company names
-            if re.search(r'\d{4}', line):  # Years
+            if has_year:  # Years
                 experience_indicators += 1
-            if re.search(r'\b(developed|managed|led|designed|implemented)\b', line.lower()):
+            if ACTION_VERB_RE.search(line):
                 experience_indicators += 1
         
         if skill_indicators > experience_indicators:
@@ -308,23 +476,72 @@ class ResumeParser:
         Main parsing pipeline.
 
         Args:
-            pdf_file: File-like object representing the uploaded resume PDF
+            pdf_file: PDF bytes or file-like object of the uploaded resume
 
         Returns:
             ParsedResume object with extracted information
         """
-        print(f"📄 Parsing resume: {getattr(pdf_file, 'filename', str(pdf_file))}")
+        return self.parse_document(pdf_file)[0]
+
+    def parse_document(self, pdf_file) -> Tuple[ParsedResume, str, Dict]:
+        """
+        Extract the PDF once and parse it.
+
+        Args:
+            pdf_file: PDF bytes or file-like object of the uploaded resume
+
+        Returns:
+            Tuple of (ParsedResume, full_text, block_info)
+        """
+        if isinstance(pdf_file, (bytes, bytearray)):
+            label = f"<{len(pdf_file)} bytes>"
+        else:
+            label = getattr(pdf_file, "filename", None) or str(pdf_file)
+        print(f"📄 Parsing resume: {label}")
 
         # Step 1: Extract text from PDF
-        # Assumes self.extract_text_from_pdf can handle file-like objects
         full_text, block_info = self.extract_text_from_pdf(pdf_file)
         print(f"✓ Extracted text ({len(full_text)} characters)")
         
+        return self.parse_text(full_text), full_text, block_info
+
+    def parse_text(self, full_text: str) -> ParsedResume:
+        """
+        Parse already extracted resume text (steps 2-4 of the pipeline).
+
+        Args:
+            full_text: Text as returned by extract_text_from_pdf
+
+        Returns:
+            ParsedResume object with extracted information
+        """
+        return self.parse_texts([full_text])[0]
+
+    def parse_texts(self, full_texts: List[str]) -> List[ParsedResume]:
+        """
+        Parse many extracted resume texts, classifying all their section
+        headers in one nlp.pipe batch.
+
+        Args:
+            full_texts: Texts as returned by extract_text_from_pdf
+
+        Returns:
+            One ParsedResume per text, in order
+        """
         # Step 2: Split into sections
-        sections = self.split_into_sections(full_text)
-        print(f"✓ Identified {len(sections)} sections")
+        sections_list = [self.split_into_sections(full_text) for full_text in full_texts]
+        for sections in sections_list:
+            print(f"✓ Identified {len(sections)} sections")
         
         # Step 3: Identify section types
+        types_list = self.classify_sections_batch(sections_list)
+        return [
+            self._build_resume(sections, section_types)
+            for sections, section_types in zip(sections_list, types_list)
+        ]
+
+    def _build_resume(self, sections: Dict[str, str], section_types: Dict[str, str]) -> ParsedResume:
+        """Pick the skills and experience sections and extract their entries (step 4)."""
         section_mapping = {}
         skills_section_name = None
         experience_section_name = None
@@ -332,7 +549,7 @@ class ResumeParser:
         experience_text = ""
         
         for section_name, section_content in sections.items():
-            section_type = self.identify_section_type(section_name, section_content)
+            section_type = section_types[section_name]
             section_mapping[section_name] = section_type
             
             print(f"  → {section_name}: {section_type}")
@@ -392,22 +609,61 @@ def print_results(result: ParsedResume) -> None:
         print(f"  • {section_name} → {section_type}")
 
 
+# Process-wide parser, loaded once and shared by every request
+_parser: Optional[ResumeParser] = None
+_parser_lock = threading.Lock()
+
+
+def get_resume_parser() -> ResumeParser:
+    """Return the shared ResumeParser, loading the spaCy model on first use."""
+    global _parser
+    if _parser is None:
+        with _parser_lock:
+            if _parser is None:
+                _parser = ResumeParser()
+                print(f"✓ Loaded resume parser ({SPACY_MODEL}, pipes: {', '.join(_parser.nlp.pipe_names)})")
+    return _parser
+
 
-def parse_resume(pdf_bytes: bytes) -> Dict:
+def preload_resume_parser(freeze: bool = True) -> ResumeParser:
+    """
+    Load the shared parser now instead of on the first upload.
+
+    Called from a preforking server's master (e.g. gunicorn --preload),
+    it lets every worker inherit the loaded model. With freeze, the
+    loaded objects are moved out of the garbage collector's generations
+    so collections in the workers don't touch (and copy) their pages.
+    """
+    parser = get_resume_parser()
+    if freeze:
+        gc.collect()
+        gc.freeze()
+    return parser
+
+
+def _reset_locks_after_fork() -> None:
+    # A lock held by another thread at fork time would never be released in the child
+    global _parser_lock
+    _parser_lock = threading.Lock()
+    if _parser is not None:
+        _parser.nlp_lock = threading.Lock()
+        _parser.memo_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_locks_after_fork)
+
+
+def parse_resume(pdf_bytes: bytes) -> Tuple[ParsedResume, str]:
     """
     Parse resume PDF and extract structured information.
     
     Returns:
-        {
-            "raw_text": str,
-            "skills": List[str],
-            "interests": List[str],
-            "experiences": List[str]
-        }
+        Tuple of (ParsedResume, full extracted text)
     """
-    parser = ResumeParser()
-    full_text, block_info = parser.extract_text_from_pdf(pdf_bytes)
-    resume= parser.parse(pdf_bytes)
+    parser = get_resume_parser()
+    # The upload's bytes go straight to fitz: one open, one extraction
+    resume, full_text, _ = parser.parse_document(pdf_bytes)
     print_results(resume)
     return resume, full_text
     # Extract raw text
@@ -0,0 +1,95 @@
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+# Professor columns the lexical stage indexes
+RETRIEVAL_FIELDS = ["research_focus", "department", "lab_group"]
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#]*")
+
+STOP_WORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in",
+    "into", "is", "it", "of", "on", "or", "our", "the", "to", "with",
+    "skills", "experiences", "research", "interests", "not", "specified",
+}
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens with stop words removed."""
+    return [t for t in TOKEN_PATTERN.findall(text.lower()) if t not in STOP_WORDS]
+
+
+class BM25Index:
+    """
+    Okapi BM25 over an inverted index of term -> (doc ids, term freqs).
+
+    Scoring touches only the postings of the query terms, so a query
+    costs roughly the number of matching documents rather than the corpus.
+    """
+
+    def __init__(self, documents: Sequence[str], k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.num_docs = len(documents)
+
+        postings: Dict[str, Tuple[List[int], List[int]]] = defaultdict(lambda: ([], []))
+        doc_lengths = np.zeros(self.num_docs, dtype=np.float32)
+        for doc_id, text in enumerate(documents):
+            terms = Counter(tokenize(text))
+            doc_lengths[doc_id] = sum(terms.values())
+            for term, tf in terms.items():
+                postings[term][0].append(doc_id)
+                postings[term][1].append(tf)
+
+        avg_length = float(doc_lengths.mean()) if self.num_docs else 0.0
+        # Per-document length normalization, folded once at build time
+        self._length_norm = k1 * (1 - b + b * doc_lengths / max(avg_length, 1e-9))
+
+        self.postings = {
+            term: (np.array(ids, dtype=np.int64), np.array(tfs, dtype=np.float32))
+            for term, (ids, tfs) in postings.items()
+        }
+        self.idf = {
+            term: math.log(1 + (self.num_docs - len(ids) + 0.5) / (len(ids) + 0.5))
+            for term, (ids, _) in self.postings.items()
+        }
+
+    def scores(self, query: str) -> np.ndarray:
+        """BM25 score of every document for the query."""
+        scores = np.zeros(self.num_docs, dtype=np.float32)
+        for term in set(tokenize(query)):
+            if term not in self.postings:
+                continue
+            doc_ids, tfs = self.postings[term]
+            scores[doc_ids] += self.idf[term] * tfs * (self.k1 + 1) / (tfs + self._length_norm[doc_ids])
+        return scores
+
+    def search(self, query: str, top_n: int) -> np.ndarray:
+        """Positions of the top_n documents for the query, in corpus order."""
+        if top_n >= self.num_docs:
+            return np.arange(self.num_docs)
+        scores = self.scores(query)
+        top = np.argpartition(-scores, top_n - 1)[:top_n]
+        return np.sort(top)
+
+
+def professor_documents(professors_df: pd.DataFrame) -> List[str]:
+    """Text of the retrieval fields for each professor row."""
+    columns = [professors_df[c].fillna("").astype(str) for c in RETRIEVAL_FIELDS if c in professors_df.columns]
+    if not columns:
+        return [""] * len(professors_df)
+    # Column-wise concatenation; a row-wise join calls back into Python per row
+    return columns[0].str.cat(columns[1:], sep=" ").tolist()
+
+
+def recall_at_k(exhaustive_ids: List[str], funnel_ids: List[str], k: int) -> float:
+    """Fraction of the exhaustive top-k that the funnel also returned."""
+    expected = set(exhaustive_ids[:k])
+    if not expected:
+        return 1.0
+    return len(expected & set(funnel_ids[:k])) / len(expected)
@@ -1,10 +1,8 @@
+import asyncio
 import pandas as pd
-import httpx
-from bs4 import BeautifulSoup
-from typing import List, Dict
+from typing import List, Dict, Optional
 import time
-import re
-from urllib.parse import urljoin
+from urllib.parse import urlparse
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
@@ -12,6 +10,10 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, WebDriverException
 import os
+from .embedding_index import profile_hash
+from .extractors import get_extractor
+from .http_client import fetch_html
+from .selenium_pool import SeleniumPool, SeleniumUnavailable
 
 
 # Institution-specific scraping configurations
@@ -85,6 +87,58 @@ INSTITUTION_CONFIGS = {
 }
 
 
+# "page" reads the first listing page only; "crawl" follows pagination and
+# profile links (see crawler.py)
+SCRAPE_MODE = os.getenv("SCRAPE_MODE", "page")
+
+# Max institutions scraped at once across all requests on this worker
+SCRAPE_CONCURRENCY = int(os.getenv("SCRAPE_CONCURRENCY", "4"))
+
+# Per-host politeness: sustained requests per second and burst size
+HOST_RATE_PER_SECOND = float(os.getenv("SCRAPE_HOST_RATE", "0.5"))
+HOST_BURST = int(os.getenv("SCRAPE_HOST_BURST", "1"))
+
+
+class AsyncTokenBucket:
+    """
+    Token bucket rate limiter that waits with asyncio.sleep.
+
+    Callers queue on the bucket instead of sleeping the whole process,
+    so other coroutines keep running while a host cools down.
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+_host_buckets: Dict[str, AsyncTokenBucket] = {}
+_scrape_semaphore = asyncio.Semaphore(SCRAPE_CONCURRENCY)
+
+
+async def throttle(url: str) -> None:
+    """Wait for this URL's host to allow another request."""
+    host = urlparse(url).netloc
+    bucket = _host_buckets.get(host)
+    if bucket is None:
+        bucket = _host_buckets[host] = AsyncTokenBucket(HOST_RATE_PER_SECOND, HOST_BURST)
+    await bucket.acquire()
+
+
 def get_selenium_driver():
     """Initialize Selenium WebDriver with headless Chrome."""
     options = Options()
@@ -109,19 +163,39 @@ def get_selenium_driver():
             return None
 
 
-def scrape_with_selenium(url: str, config: Dict) -> List[Dict]:
-    """Scrape using Selenium for JavaScript-rendered content."""
-    driver = get_selenium_driver()
-    if not driver:
-        return []
-    
+# Long-lived WebDriver pool for JavaScript-rendered institutions
+SELENIUM_POOL_SIZE = int(os.getenv("SELENIUM_POOL_SIZE", "2"))
+SELENIUM_MAX_PAGES = int(os.getenv("SELENIUM_MAX_PAGES", "50"))
+SELENIUM_WAIT_SECONDS = float(os.getenv("SELENIUM_WAIT_SECONDS", "10"))
+
+_selenium_pool: Optional[SeleniumPool] = None
+
+
+def get_selenium_pool() -> SeleniumPool:
+    """Return the worker's WebDriver pool, creating it on first use."""
+    global _selenium_pool
+    if _selenium_pool is None:
+        _selenium_pool = SeleniumPool(
+            get_selenium_driver, size=SELENIUM_POOL_SIZE, max_pages=SELENIUM_MAX_PAGES
+        )
+    return _selenium_pool
+
+
+def close_selenium_pool() -> None:
+    global _selenium_pool
+    if _selenium_pool is not None:
+        _selenium_pool.close()
+        _selenium_pool = None
+
+
+def extract_with_driver(driver, url: str, config: Dict) -> List[Dict]:
+    """Load a page in an existing driver and extract professor cards."""
     professors = []
     try:
         driver.get(url)
-        time.sleep(3)  # Wait for page load
-        
-        # Wait for professor containers
-        wait = WebDriverWait(driver, 10)
+        wait = WebDriverWait(driver, SELENIUM_WAIT_SECONDS)
+        # Explicit waits instead of a fixed sleep: document loaded, then containers present
+        wait.until(lambda d: d.execute_script("return document.readyState") == "complete")
         containers = wait.until(
             EC.presence_of_all_elements_located(
                 (By.CSS_SELECTOR, config["selectors"]["professor_container"])
@@ -161,80 +235,48 @@ def scrape_with_selenium(url: str, config: Dict) -> List[Dict]:
                 
     except TimeoutException:
         pass
-    finally:
-        driver.quit()
     
     return professors
 
 
+def scrape_with_selenium(url: str, config: Dict) -> List[Dict]:
+    """Scrape using a one-off Selenium driver for JavaScript-rendered content."""
+    driver = get_selenium_driver()
+    if not driver:
+        return []
+    
+    try:
+        return extract_with_driver(driver, url, config)
+    finally:
+        driver.quit()
+
+
 async def scrape_with_beautifulsoup(url: str, config: Dict) -> List[Dict]:
     """Scrape using BeautifulSoup for static HTML content."""
-    professors = []
-    
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(
-                url,
-                headers={
-                    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36"
-                },
-            )
-            response.raise_for_status()
-            html = response.text
+        await throttle(url)
+        html = await fetch_html(url)
     except Exception as e:
         print(f"Error fetching {url}: {e}")
-        return professors
-    
-    soup = BeautifulSoup(html, "lxml")
-    
-    # Try to find professor containers
-    containers = soup.select(config["selectors"]["professor_container"])
-    
-    if not containers:
-        # Fallback: try common patterns
-        containers = soup.find_all("div", class_=re.compile(r"faculty|professor|person", re.I))
-    
-    for container in containers[:20]:  # Limit to 20
-        try:
-            # Extract name
-            name_elem = container.select_one(config["selectors"]["name"])
-            if not name_elem:
-                name_elem = container.find("h2") or container.find("h3") or container.find("h4")
-            name = name_elem.get_text(strip=True) if name_elem else "Unknown"
-            
-            # Extract department
-            dept_elem = container.select_one(config["selectors"]["department"])
-            if not dept_elem:
-                dept_elem = container.find(class_=re.compile(r"dept|department|school", re.I))
-            department = dept_elem.get_text(strip=True) if dept_elem else "Unknown"
-            
-            # Extract research focus
-            research_elem = container.select_one(config["selectors"]["research"])
-            if not research_elem:
-                research_elem = container.find(class_=re.compile(r"research|interest|focus", re.I))
-            research = research_elem.get_text(strip=True) if research_elem else "Research interests not specified"
-            
-            # Extract profile link
-            link_elem = container.select_one(config["selectors"]["profile_link"])
-            if link_elem:
-                profile_url = link_elem.get("href", "")
-                if profile_url and not profile_url.startswith("http"):
-                    # Make absolute URL
-                    profile_url = urljoin(url, profile_url)
-            else:
-                profile_url = ""
-            
-            if name and name != "Unknown":
-                professors.append({
-                    "name": name,
-                    "department": department,
-                    "research_focus": research,
-                    "profile_url": profile_url,
-                })
-        except Exception:
-            continue
+        return []
     
-    return professors
+    return parse_faculty_listing(html, url, config)
+
+
+def parse_faculty_listing(html: str, url: str, config: Dict, limit: Optional[int] = 20) -> List[Dict]:
+    """
+    Extract professor cards from one listing page.
+
+    Args:
+        html: Page body
+        url: Page URL, used to resolve relative profile links
+        config: Institution config with CSS selectors
+        limit: Max containers to read; None reads every container
+
+    Returns:
+        List of professor dicts (name, department, research_focus, profile_url)
+    """
+    return get_extractor(config).extract(html, url, limit)
 
 
 async def scrape_single_institution(institution: str) -> List[Dict]:
@@ -246,8 +288,17 @@ async def scrape_single_institution(institution: str) -> List[Dict]:
     url = config["base_url"]
     method = config.get("method", "beautifulsoup")
     
-    if method == "selenium":
-        professors = scrape_with_selenium(url, config)
+    if SCRAPE_MODE == "crawl" and method == "beautifulsoup":
+        # Imported here: the crawler builds on this module's helpers
+        from .crawler import crawl_institution
+        professors = await crawl_institution(url, config)
+    elif method == "selenium":
+        # Pooled drivers run on their own threads, off the event loop
+        await throttle(url)
+        try:
+            professors = await get_selenium_pool().run(extract_with_driver, url, config)
+        except SeleniumUnavailable:
+            professors = []
     else:
         professors = await scrape_with_beautifulsoup(url, config)
     
@@ -255,23 +306,42 @@ async def scrape_single_institution(institution: str) -> List[Dict]:
     for prof in professors:
         prof["institution"] = institution
         prof["id"] = f"{institution}_{prof['name']}".replace(" ", "_").lower()
-        prof["lab_group"] = None  # Can be enhanced later
+        prof.setdefault("lab_group", None)
+        prof["content_hash"] = profile_hash(prof)
     
     return professors
 
 
+async def scrape_institution_limited(institution: str) -> List[Dict]:
+    """
+    scrape_single_institution, at most SCRAPE_CONCURRENCY at a time per worker.
+
+    Every production scrape goes through here; politeness within each
+    host comes from the per-host token buckets.
+    """
+    async with _scrape_semaphore:
+        print(f"Scraping {institution}...")
+        return await scrape_single_institution(institution)
+
+
 async def scrape_institutions(institutions: List[str]) -> pd.DataFrame:
     """
     Scrape multiple institutions and return a pandas DataFrame.
-    Limits to 20 professors total across all institutions.
+    Limits to 20 professors total across all institutions in page mode.
+
+    Institutions are fetched concurrently through scrape_institution_limited.
     """
+    results = await asyncio.gather(
+        *(scrape_institution_limited(institution) for institution in institutions),
+        return_exceptions=True,
+    )
+
     all_professors = []
-    
-    for institution in institutions:
-        print(f"Scraping {institution}...")
-        professors = await scrape_single_institution(institution)
-        all_professors.extend(professors)
-        time.sleep(2)  # Be respectful with rate limiting
+    for institution, result in zip(institutions, results):
+        if isinstance(result, Exception):
+            print(f"Error scraping {institution}: {result}")
+            continue
+        all_professors.extend(result)
     
     # Convert to DataFrame
     if not all_professors:
@@ -283,8 +353,8 @@ async def scrape_institutions(institutions: List[str]) -> pd.DataFrame:
     
     df = pd.DataFrame(all_professors)
     
-    # Limit to 20 professors total
-    if len(df) > 20:
+    # Limit to 20 professors total, unless crawling for the full faculty
+    if SCRAPE_MODE != "crawl" and len(df) > 20:
         df = df.head(20)
     
     # Ensure all required columns exist
@@ -0,0 +1,118 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Set
+
+from selenium.common.exceptions import WebDriverException
+
+
+class SeleniumUnavailable(RuntimeError):
+    """Raised when no WebDriver can be started (e.g. Chrome not installed)."""
+
+
+class SeleniumPool:
+    """
+    Bounded pool of long-lived WebDriver instances.
+
+    Work runs on a dedicated thread pool of `size` threads and each thread
+    owns at most one driver, so there are never more than `size` browsers
+    and callers on the event loop only await a future. A driver is
+    health-checked before each use and replaced after max_pages pages or
+    any WebDriver error.
+
+    If the driver factory can't start a browser, the pool remembers that
+    for retry_after seconds and fails fast with SeleniumUnavailable.
+    """
+
+    def __init__(
+        self,
+        driver_factory: Callable[[], Any],
+        size: int = 2,
+        max_pages: int = 50,
+        retry_after: float = 300,
+    ):
+        self.driver_factory = driver_factory
+        self.size = size
+        self.max_pages = max_pages
+        self.retry_after = retry_after
+        self.pages_served = 0
+        self.drivers_started = 0
+
+        self._executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix="selenium")
+        self._local = threading.local()
+        self._drivers: Set[Any] = set()
+        self._lock = threading.Lock()
+        self._unavailable_until = 0.0
+
+    async def run(self, fn: Callable, *args) -> Any:
+        """Call fn(driver, *args) on a pooled driver without blocking the loop."""
+        if time.monotonic() < self._unavailable_until:
+            raise SeleniumUnavailable("WebDriver could not be started")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._run, fn, args)
+
+    def close(self) -> None:
+        """Quit every driver and stop the worker threads."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        with self._lock:
+            drivers = list(self._drivers)
+            self._drivers.clear()
+        for driver in drivers:
+            self._quit(driver)
+
+    def _run(self, fn: Callable, args: tuple) -> Any:
+        driver = self._checkout()
+        try:
+            result = fn(driver, *args)
+        except WebDriverException:
+            self._retire()
+            raise
+        self._local.pages += 1
+        self.pages_served += 1
+        if self._local.pages >= self.max_pages:
+            self._retire()
+        return result
+
+    def _checkout(self) -> Any:
+        """This thread's driver, replaced if missing or unhealthy."""
+        driver = getattr(self._local, "driver", None)
+        if driver is not None and not self._healthy(driver):
+            self._retire()
+            driver = None
+
+        if driver is None:
+            driver = self.driver_factory()
+            if driver is None:
+                self._unavailable_until = time.monotonic() + self.retry_after
+                print("Selenium unavailable: could not start a WebDriver")
+                raise SeleniumUnavailable("WebDriver could not be started")
+            self._local.driver = driver
+            self._local.pages = 0
+            self.drivers_started += 1
+            with self._lock:
+                self._drivers.add(driver)
+        return driver
+
+    def _retire(self) -> None:
+        driver = getattr(self._local, "driver", None)
+        self._local.driver = None
+        if driver is not None:
+            with self._lock:
+                self._drivers.discard(driver)
+            self._quit(driver)
+
+    @staticmethod
+    def _healthy(driver: Any) -> bool:
+        try:
+            driver.execute_script("return 1")
+            return True
+        except WebDriverException:
+            return False
+
+    @staticmethod
+    def _quit(driver: Any) -> None:
+        try:
+            driver.quit()
+        except Exception:
+            pass
@@ -0,0 +1,115 @@
+"""
+Parse time and peak memory of faculty listing extraction, old vs compiled.
+
+"before" is the previous scrape_with_beautifulsoup loop: full BeautifulSoup
+tree, select_one per field and re.compile fallbacks inside the loop.
+"after" is the institution's compiled FacultyExtractor, which parses only
+container subtrees. Runs on a synthetic page padded with navigation and
+script noise, or on saved pages with --pages-dir.
+
+    cd backend
+    python -m benchmarks.bench_extractors --professors 2000
+    python -m benchmarks.bench_extractors --pages-dir saved/ --institution Rutgers
+"""
+import argparse
+import re
+import statistics
+import time
+import tracemalloc
+from pathlib import Path
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup
+
+from app.services.extractors import FacultyExtractor
+from app.services.scraper import INSTITUTION_CONFIGS
+from .bench_http_client import faculty_page
+
+
+def noisy_page(professors: int) -> str:
+    """A faculty page with the menus, scripts and footers real sites carry."""
+    nav = "".join(f'<li><a href="/section/{i}">Section {i}</a></li>' for i in range(300))
+    script = "<script>" + "var x = 1;" * 5000 + "</script>"
+    footer = "".join(f"<p>News item {i}: lorem ipsum dolor sit amet</p>" for i in range(500))
+    cards = faculty_page(professors).decode("utf-8")[len("<html><body>"):-len("</body></html>")]
+    return f"<html><head>{script}</head><body><nav><ul>{nav}</ul></nav>{cards}<footer>{footer}</footer></body></html>"
+
+
+def legacy_extract(html: str, url: str, config: dict):
+    professors = []
+    soup = BeautifulSoup(html, "lxml")
+    containers = soup.select(config["selectors"]["professor_container"])
+    if not containers:
+        containers = soup.find_all("div", class_=re.compile(r"faculty|professor|person", re.I))
+    for container in containers:
+        name_elem = container.select_one(config["selectors"]["name"])
+        if not name_elem:
+            name_elem = container.find("h2") or container.find("h3") or container.find("h4")
+        name = name_elem.get_text(strip=True) if name_elem else "Unknown"
+        dept_elem = container.select_one(config["selectors"]["department"])
+        if not dept_elem:
+            dept_elem = container.find(class_=re.compile(r"dept|department|school", re.I))
+        department = dept_elem.get_text(strip=True) if dept_elem else "Unknown"
+        research_elem = container.select_one(config["selectors"]["research"])
+        if not research_elem:
+            research_elem = container.find(class_=re.compile(r"research|interest|focus", re.I))
+        research = research_elem.get_text(strip=True) if research_elem else "Research interests not specified"
+        link_elem = container.select_one(config["selectors"]["profile_link"])
+        profile_url = link_elem.get("href", "") if link_elem else ""
+        if profile_url and not profile_url.startswith("http"):
+            profile_url = urljoin(url, profile_url)
+        if name and name != "Unknown":
+            professors.append({
+                "name": name,
+                "department": department,
+                "research_focus": research,
+                "profile_url": profile_url,
+            })
+    return professors
+
+
+def measure(fn, html: str, repeats: int):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn(html)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    tracemalloc.start()
+    fn(html)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, statistics.median(timings), peak / 1024 / 1024
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    arg_parser.add_argument("--professors", type=int, default=2000)
+    arg_parser.add_argument("--institution", default="Rutgers", choices=sorted(INSTITUTION_CONFIGS))
+    arg_parser.add_argument("--pages-dir", type=Path, help="Directory of saved .html faculty pages")
+    arg_parser.add_argument("--repeats", type=int, default=5)
+    args = arg_parser.parse_args()
+
+    config = INSTITUTION_CONFIGS[args.institution]
+    url = config["base_url"]
+    if args.pages_dir:
+        pages = {path.name: path.read_text(encoding="utf-8", errors="replace")
+                 for path in sorted(args.pages_dir.glob("*.html"))}
+    else:
+        pages = {f"synthetic ({args.professors} professors)": noisy_page(args.professors)}
+
+    extractor = FacultyExtractor(config)
+    print(f"strainer: {'yes' if extractor.strainer is not None else 'no (full parse)'}")
+    for name, html in pages.items():
+        before, before_ms, before_mb = measure(lambda h: legacy_extract(h, url, config), html, args.repeats)
+        after, after_ms, after_mb = measure(lambda h: extractor.extract(h, url, limit=None), html, args.repeats)
+        assert before == after, f"{name}: extractor output differs from the old loop"
+
+        print(f"\n{name}  ({len(html) / 1024:.0f} KB, {len(after)} professors)")
+        print(f"  before: {before_ms:8.1f} ms  peak {before_mb:7.1f} MB")
+        print(f"  after:  {after_ms:8.1f} ms  peak {after_mb:7.1f} MB")
+        print(f"  speedup {before_ms / after_ms:.2f}x, memory {before_mb / max(after_mb, 1e-9):.2f}x less")
+
+
+if __name__ == "__main__":
+    main()
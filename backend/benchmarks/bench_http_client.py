@@ -0,0 +1,99 @@
+"""
+Check connection reuse and conditional GETs against a local HTTP server.
+
+Serves a large synthetic faculty page with an ETag, fetches it repeatedly
+through fetch_html, and reports how many TCP connections the server saw,
+how many responses were 304s, and cold vs revalidated fetch times.
+
+    cd backend
+    python -m benchmarks.bench_http_client --fetches 50
+"""
+import argparse
+import asyncio
+import hashlib
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from app.services.http_client import close_http_client, fetch_html, fetch_stats
+
+
+def faculty_page(professors: int) -> bytes:
+    cards = "".join(
+        f'<div class="faculty-member"><h3>Professor {i}</h3>'
+        f'<span class="department">Computer Science</span>'
+        f'<p class="research">Machine learning and systems {i}</p>'
+        f'<a href="/people/{i}">Profile</a></div>'
+        for i in range(professors)
+    )
+    return f"<html><body>{cards}</body></html>".encode("utf-8")
+
+
+def make_handler(body: bytes, counters: dict):
+    etag = '"' + hashlib.sha256(body).hexdigest()[:16] + '"'
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def setup(self):
+            counters["connections"] += 1
+            super().setup()
+
+        def do_GET(self):
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Type", "text/html")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+async def run(url: str, fetches: int):
+    timings = []
+    for _ in range(fetches):
+        start = time.perf_counter()
+        html = await fetch_html(url)
+        timings.append((time.perf_counter() - start) * 1000)
+    await close_http_client()
+    return html, timings
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    arg_parser.add_argument("--fetches", type=int, default=50)
+    arg_parser.add_argument("--professors", type=int, default=2000)
+    args = arg_parser.parse_args()
+
+    body = faculty_page(args.professors)
+    counters = {"connections": 0}
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(body, counters))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/faculty"
+
+    try:
+        html, timings = asyncio.run(run(url, args.fetches))
+    finally:
+        server.shutdown()
+
+    assert html.encode("utf-8") == body, "revalidated body differs from original"
+    print(f"page size:           {len(body) / 1024:.1f} KB")
+    print(f"fetches:             {args.fetches}")
+    print(f"server connections:  {counters['connections']}")
+    print(f"304 responses:       {fetch_stats['not_modified']}")
+    print(f"first fetch:         {timings[0]:.2f} ms")
+    print(f"revalidated (mean):  {sum(timings[1:]) / max(len(timings) - 1, 1):.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
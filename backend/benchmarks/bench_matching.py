@@ -0,0 +1,187 @@
+"""
+Stage-by-stage matching benchmark on synthetic faculty corpora.
+
+Times each ranking stage separately and writes JSON so runs can be
+diffed. Runs fully offline on CPU: the Hugging Face hub is put in
+offline mode, so the model must already be cached or be a local path.
+
+Stages:
+    text_building  create_resume_text + create_professor_texts
+    prefilter      BM25 first stage (only when professors > prefilter_k)
+    encoding       encode_texts for professors and resumes
+    scoring        BERTScore greedy matching against gathered embeddings
+    top_k          argpartition selection per resume
+
+Each size also reports recall@k of the BM25 funnel: the share of the
+exhaustive BERTScore top-k that reranking only the prefilter_k BM25
+candidates still returns (mean and min over resumes). With
+--synthetic-embeddings the scores don't follow the text, so recall only
+reflects prefilter_k / professors.
+
+    cd backend
+    python -m benchmarks.bench_matching --sizes 100,1000 --resumes 5 --output bench.json
+
+    # Small local model for quick runs
+    python -m benchmarks.bench_matching --model-type /models/bert-tiny --num-layers 2
+
+    # No model at all: synthetic token embeddings replace encoding
+    python -m benchmarks.bench_matching --synthetic-embeddings
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+
+def time_stage(fn, repeats: int) -> dict:
+    """Run fn repeats times and summarize wall-clock timings in ms."""
+    timings = []
+    result = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return {
+        "mean_ms": statistics.mean(timings),
+        "min_ms": min(timings),
+        "max_ms": max(timings),
+    }, result
+
+
+def parse_args():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    arg_parser.add_argument("--sizes", default="100,1000", help="Comma-separated professor counts")
+    arg_parser.add_argument("--resumes", type=int, default=5)
+    arg_parser.add_argument("--top-k", type=int, default=3)
+    arg_parser.add_argument("--prefilter-k", type=int, default=300)
+    arg_parser.add_argument("--repeats", type=int, default=3)
+    arg_parser.add_argument("--model-type", help="BERTScore model name or local path")
+    arg_parser.add_argument("--num-layers", type=int, help="Layer to use with --model-type")
+    arg_parser.add_argument(
+        "--synthetic-embeddings", action="store_true",
+        help="Skip the model and use synthetic token embeddings",
+    )
+    arg_parser.add_argument("--dim", type=int, default=1024, help="Synthetic embedding size")
+    arg_parser.add_argument("--output", help="Write JSON results to this file")
+    arg_parser.add_argument("--seed", type=int, default=0)
+    return arg_parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    # Configure before importing matching, which reads these at import/load time
+    os.environ.setdefault("HF_HUB_OFFLINE", "1")
+    os.environ.setdefault("TRANSFORMERS_OFFLINE", "1")
+    os.environ["PROFESSOR_INDEX_DIR"] = tempfile.mkdtemp(prefix="labmate-bench-")
+    if args.model_type:
+        os.environ["BERTSCORE_MODEL_TYPE"] = args.model_type
+        if args.num_layers:
+            os.environ["BERTSCORE_NUM_LAYERS"] = str(args.num_layers)
+
+    from app.services.embedding_index import ProfessorEmbeddingIndex, greedy_match_f1
+    from app.services.matching import (
+        create_professor_texts,
+        create_resume_text,
+        encode_texts,
+        load_scorer,
+        professor_columns,
+        top_k_rows,
+    )
+    from app.services.retrieval import BM25Index, professor_documents, recall_at_k
+    from .synthetic import make_professors, make_resumes, make_token_embeddings, sample_sizes
+
+    if not args.synthetic_embeddings:
+        load_scorer()
+
+    resumes = make_resumes(args.resumes, seed=args.seed)
+    results = []
+
+    for n in sample_sizes(args.sizes):
+        print(f"Benchmarking {n} professors x {len(resumes)} resumes")
+        professors_df = make_professors(n, seed=args.seed)
+        stages = {}
+
+        def build_texts():
+            resume_texts = [create_resume_text(resume) for resume in resumes]
+            return resume_texts, create_professor_texts(professor_columns(professors_df))
+
+        stages["text_building"], (resume_texts, professor_texts) = time_stage(build_texts, args.repeats)
+
+        candidates = None
+        if n > args.prefilter_k:
+            def prefilter():
+                bm25 = BM25Index(professor_documents(professors_df))
+                return [bm25.search(text, args.prefilter_k) for text in resume_texts]
+
+            stages["prefilter"], candidates = time_stage(prefilter, args.repeats)
+
+        if args.synthetic_embeddings:
+            professor_embeddings = make_token_embeddings(n, dim=args.dim, seed=args.seed)
+            resume_embeddings = make_token_embeddings(
+                len(resumes), dim=args.dim, min_tokens=80, max_tokens=300, seed=args.seed + 1
+            )
+        else:
+            def encode():
+                return encode_texts(professor_texts), encode_texts(resume_texts)
+
+            # Encoding dominates; one pass is enough and keeps runs short
+            stages["encoding"], (professor_embeddings, resume_embeddings) = time_stage(encode, 1)
+
+        ids = [str(pid) for pid in professors_df["id"]]
+        index = ProfessorEmbeddingIndex(tempfile.mkdtemp(prefix="labmate-bench-"), "benchmark")
+        index.upsert(ids, ids, professor_embeddings)
+
+        def score():
+            embeddings, offsets = index.gather(ids)
+            return [greedy_match_f1(emb, embeddings, offsets)[2] for emb in resume_embeddings]
+
+        stages["scoring"], scores = time_stage(score, args.repeats)
+        stages["top_k"], _ = time_stage(
+            lambda: [top_k_rows(row, args.top_k) for row in scores], args.repeats
+        )
+
+        # Funnel top-k: the best of the BM25 candidates, against the exhaustive top-k
+        recalls = []
+        for i, row_scores in enumerate(scores):
+            exhaustive = top_k_rows(row_scores, args.top_k)
+            if candidates is None:
+                funnel = exhaustive
+            else:
+                funnel = candidates[i][top_k_rows(row_scores[candidates[i]], args.top_k)]
+            recalls.append(recall_at_k(exhaustive.tolist(), funnel.tolist(), args.top_k))
+        recall = {"mean": statistics.mean(recalls), "min": min(recalls)}
+
+        results.append({
+            "professors": n, "resumes": len(resumes), "stages": stages,
+            f"recall_at_{args.top_k}": recall,
+        })
+        for name, timing in stages.items():
+            print(f"  {name:<14} {timing['mean_ms']:>10.2f} ms")
+        print(f"  recall@{args.top_k:<7} {recall['mean']:>10.3f} (min {recall['min']:.3f}, prefilter_k={args.prefilter_k})")
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "model": "synthetic" if args.synthetic_embeddings else (args.model_type or "default"),
+            "args": vars(args),
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"✓ Wrote {args.output}")
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
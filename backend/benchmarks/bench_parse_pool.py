@@ -0,0 +1,84 @@
+"""
+Concurrent-upload throughput of the resume parser pool.
+
+"inline" is the previous behaviour: parse_resume called directly on the
+event loop. Each pool size then parses the same burst of synthetic PDFs
+through ResumeParsePool. A ticker task measures the longest event-loop
+stall, which is what every other in-flight request would have waited.
+The parsed-resume cache is emptied (and its disk tier ignored) before
+every burst, so each row measures parsing rather than cache lookups.
+Needs the spaCy model installed.
+
+    cd backend
+    python -m benchmarks.bench_parse_pool --workers 0,1,2,4 --uploads 64
+"""
+import argparse
+import asyncio
+import time
+
+from app.services.cache import parsed_resume_cache
+from app.services.parse_pool import ResumeParsePool
+from app.services.resume_parser import parse_resume
+from .synthetic import make_resume_pdf, sample_sizes
+
+
+async def loop_stall(stop: asyncio.Event, interval: float = 0.005) -> float:
+    """Longest gap between ticks that should be interval apart, in ms."""
+    worst = 0.0
+    last = time.perf_counter()
+    while not stop.is_set():
+        await asyncio.sleep(interval)
+        now = time.perf_counter()
+        worst = max(worst, now - last - interval)
+        last = now
+    return worst * 1000
+
+
+async def run_burst(parse, uploads) -> tuple:
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(loop_stall(stop))
+    await asyncio.sleep(0)
+    start = time.perf_counter()
+    await asyncio.gather(*(parse(pdf_bytes) for pdf_bytes in uploads))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    return elapsed, await ticker
+
+
+async def inline(pdf_bytes: bytes):
+    return parse_resume(pdf_bytes)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    arg_parser.add_argument("--workers", default="0,1,2,4", help="Comma-separated pool sizes")
+    arg_parser.add_argument("--uploads", type=int, default=64, help="Concurrent uploads per run")
+    arg_parser.add_argument("--pages", type=int, default=2)
+    args = arg_parser.parse_args()
+
+    # The pool consults the cache first; a hit would skip parsing entirely
+    parsed_resume_cache.disk_dir = None
+    uploads = [make_resume_pdf(args.pages, seed=i) for i in range(args.uploads)]
+    parse_resume(uploads[0])  # load spaCy before timing the inline run
+
+    print(f"{'mode':>8}  {'total s':>8}  {'docs/s':>7}  {'max loop stall ms':>17}")
+    elapsed, stall = asyncio.run(run_burst(inline, uploads))
+    print(f"{'inline':>8}  {elapsed:>8.2f}  {len(uploads) / elapsed:>7.1f}  {stall:>17.1f}")
+
+    for workers in sample_sizes(args.workers):
+        pool = ResumeParsePool(workers, queue_size=args.uploads, timeout=600)
+        pool.start()
+
+        async def warm_then_burst():
+            # Wait until every child has its model loaded
+            await asyncio.gather(*(pool.parse(uploads[0], wait=True) for _ in range(max(workers, 1))))
+            parsed_resume_cache.clear()
+            return await run_burst(lambda data: pool.parse(data, wait=True), uploads)
+
+        elapsed, stall = asyncio.run(warm_then_burst())
+        pool.close()
+        print(f"{f'pool={workers}':>8}  {elapsed:>8.2f}  {len(uploads) / elapsed:>7.1f}  {stall:>17.1f}")
+
+
+if __name__ == "__main__":
+    main()
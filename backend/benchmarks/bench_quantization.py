@@ -0,0 +1,80 @@
+"""
+Memory and ranking drift of quantized professor embedding storage.
+
+Stores the same token embeddings as float32, float16 and int8, then
+ranks a set of query "resumes" against each copy and compares the
+top-k lists with the float32 ones.
+
+    cd backend
+    python -m benchmarks.bench_quantization --professors 2000 --queries 50
+"""
+import argparse
+import tempfile
+
+import numpy as np
+
+from app.services.embedding_index import (
+    STORAGE_DTYPES,
+    ProfessorEmbeddingIndex,
+    greedy_match_f1,
+)
+from app.services.matching import top_k_rows
+from .synthetic import make_token_embeddings
+
+
+def build_index(storage_dtype, ids, embeddings, index_dir):
+    index = ProfessorEmbeddingIndex(index_dir, "benchmark", storage_dtype)
+    index.upsert(ids, ids, embeddings)
+    return index
+
+
+def rankings(index, ids, queries, top_k):
+    embeddings, offsets = index.gather(ids)
+    results = []
+    for query in queries:
+        _, _, f1 = greedy_match_f1(query, embeddings, offsets)
+        results.append((f1, top_k_rows(f1, top_k)))
+    return results
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    arg_parser.add_argument("--professors", type=int, default=2000)
+    arg_parser.add_argument("--queries", type=int, default=50)
+    arg_parser.add_argument("--dim", type=int, default=1024)
+    arg_parser.add_argument("--top-k", type=int, default=3)
+    args = arg_parser.parse_args()
+
+    ids = [f"prof_{i}" for i in range(args.professors)]
+    embeddings = make_token_embeddings(args.professors, dim=args.dim, seed=0)
+    queries = make_token_embeddings(args.queries, dim=args.dim, min_tokens=80, max_tokens=300, seed=1)
+
+    with tempfile.TemporaryDirectory() as index_dir:
+        reference_index = build_index("float32", ids, embeddings, index_dir)
+        reference = rankings(reference_index, ids, queries, args.top_k)
+        reference_bytes = reference_index.memory_bytes()
+
+        print(f"{'dtype':>8}  {'memory':>10}  {'saving':>7}  {'top-k overlap':>13}  {'exact top-k':>11}  {'max |dF1|':>9}")
+        for storage_dtype in STORAGE_DTYPES:
+            index = build_index(storage_dtype, ids, embeddings, index_dir)
+            results = rankings(index, ids, queries, args.top_k)
+
+            overlap = np.mean([
+                len(set(ref_top) & set(top)) / len(ref_top)
+                for (_, ref_top), (_, top) in zip(reference, results)
+            ])
+            exact = np.mean([
+                list(ref_top) == list(top) for (_, ref_top), (_, top) in zip(reference, results)
+            ])
+            drift = max(
+                float(np.abs(ref_f1 - f1).max()) for (ref_f1, _), (f1, _) in zip(reference, results)
+            )
+            memory = index.memory_bytes()
+            print(
+                f"{storage_dtype:>8}  {memory / 2**20:>8.1f}MB  {reference_bytes / memory:>6.2f}x"
+                f"  {overlap:>13.3f}  {exact:>11.3f}  {drift:>9.5f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Microbenchmark of the ranking bookkeeping around the model.
+
+Compares the original DataFrame path (iterrows, copy, full sort_values)
+with the columnar path (column arrays, argpartition, k records) on the
+same precomputed scores, so model cost is excluded.
+
+    cd backend
+    python -m benchmarks.bench_ranking --sizes 1000,10000,100000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from app.services.matching import (
+    create_professor_text,
+    create_professor_texts,
+    professor_columns,
+    professor_records,
+    top_k_rows,
+)
+from .synthetic import make_professors, sample_sizes
+
+
+def rank_dataframe(professors_df: pd.DataFrame, scores: np.ndarray, top_k: int):
+    """The pre-columnar rank_professors bookkeeping."""
+    texts = [create_professor_text(row) for _, row in professors_df.iterrows()]
+    professors_df = professors_df.copy()
+    professors_df["similarity"] = scores
+    professors_df = professors_df.sort_values("similarity", ascending=False)
+    result = []
+    for _, row in professors_df.head(top_k).iterrows():
+        result.append({
+            "id": str(row.get("id", "")),
+            "name": str(row.get("name", "")),
+            "institution": str(row.get("institution", "")),
+            "department": str(row.get("department", "")),
+            "research_focus": str(row.get("research_focus", "")),
+            "lab_group": str(row.get("lab_group", "")) if pd.notna(row.get("lab_group")) else None,
+            "profile_url": str(row.get("profile_url", "")) if pd.notna(row.get("profile_url")) else None,
+        })
+    return texts, result
+
+
+def rank_columnar(professors_df: pd.DataFrame, scores: np.ndarray, top_k: int):
+    """The columnar rank_professors bookkeeping."""
+    columns = professor_columns(professors_df)
+    texts = create_professor_texts(columns)
+    return texts, professor_records(columns, top_k_rows(scores, top_k))
+
+
+def best_of(fn, repeats: int) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    arg_parser.add_argument("--sizes", default="1000,10000,100000")
+    arg_parser.add_argument("--top-k", type=int, default=3)
+    arg_parser.add_argument("--repeats", type=int, default=3)
+    args = arg_parser.parse_args()
+
+    print(f"{'rows':>8}  {'dataframe':>12}  {'columnar':>12}  {'speedup':>8}")
+    for n in sample_sizes(args.sizes):
+        professors_df = make_professors(n)
+        scores = np.random.default_rng(0).random(n).astype(np.float32)
+
+        _, expected = rank_dataframe(professors_df, scores, args.top_k)
+        _, actual = rank_columnar(professors_df, scores, args.top_k)
+        assert [p["id"] for p in expected] == [p["id"] for p in actual]
+
+        old = best_of(lambda: rank_dataframe(professors_df, scores, args.top_k), args.repeats)
+        new = best_of(lambda: rank_columnar(professors_df, scores, args.top_k), args.repeats)
+        print(f"{n:>8}  {old * 1000:>10.2f}ms  {new * 1000:>10.2f}ms  {old / new:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+PDF extraction latency and allocation, double extraction vs single pass.
+
+"before" reproduces the previous parse_resume flow: the upload wrapped in
+a BytesIO, extract_text_from_pdf run twice, each time growing the text
+with +=. "after" is the current single extraction from the bytes, which
+stops at RESUME_MAX_PAGES. Peak allocation is measured with tracemalloc
+on synthetic multi-page resumes.
+
+    cd backend
+    python -m benchmarks.bench_resume_parsing --pages 1,2,5,20
+"""
+import argparse
+import io
+import statistics
+import time
+import tracemalloc
+from collections import defaultdict
+
+import fitz
+
+from app.services.resume_parser import ResumeParser
+from .synthetic import make_resume_pdf, sample_sizes
+
+
+def legacy_extract(file):
+    file.seek(0)
+    pdf_document = fitz.open(stream=file.read(), filetype="pdf")
+    full_text = ""
+    block_info = defaultdict(list)
+    for page in pdf_document:
+        for block in page.get_text("blocks"):
+            if block[4]:
+                text = block[4].strip()
+                if text:
+                    block_info[block[1]].append(text)
+                    full_text += text + "\n"
+    pdf_document.close()
+    return full_text, block_info
+
+
+def legacy_flow(pdf_bytes: bytes):
+    pdf_file = io.BytesIO(pdf_bytes)
+    full_text, _ = legacy_extract(pdf_file)
+    legacy_extract(pdf_file)  # parser.parse() extracted the same file again
+    return full_text
+
+
+def measure(fn, data: bytes, repeats: int):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn(data)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    tracemalloc.start()
+    fn(data)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, statistics.median(timings), peak / 1024
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    arg_parser.add_argument("--pages", default="1,2,5,20", help="Comma-separated page counts")
+    arg_parser.add_argument("--repeats", type=int, default=10)
+    args = arg_parser.parse_args()
+
+    # extract_text_from_pdf doesn't touch spaCy, so skip loading it
+    parser = ResumeParser.__new__(ResumeParser)
+    single_pass = lambda data: parser.extract_text_from_pdf(data)[0]
+
+    print(f"{'pages':>5}  {'PDF KB':>7}  {'before ms':>9}  {'after ms':>8}  {'before peak KB':>14}  {'after peak KB':>13}")
+    for pages in sample_sizes(args.pages):
+        pdf_bytes = make_resume_pdf(pages)
+        before, before_ms, before_kb = measure(legacy_flow, pdf_bytes, args.repeats)
+        after, after_ms, after_kb = measure(single_pass, pdf_bytes, args.repeats)
+        assert before.startswith(after), "single-pass text differs from the old extraction"
+        print(
+            f"{pages:>5}  {len(pdf_bytes) / 1024:>7.1f}  {before_ms:>9.2f}  {after_ms:>8.2f}  "
+            f"{before_kb:>14.0f}  {after_kb:>13.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
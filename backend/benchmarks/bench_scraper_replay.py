@@ -0,0 +1,142 @@
+"""
+Offline scraper throughput against a recorded page archive.
+
+Builds a synthetic archive for every configured institution (paginated
+listings plus one profile page per professor), or uses a real one
+recorded with HTTP_REPLAY_MODE=record, then runs the page-mode scraper
+and the crawler through the same httpx client code path. With --server
+the pages come from the local archive server over real sockets.
+
+    cd backend
+    python -m benchmarks.bench_scraper_replay --professors 50 --pages 20
+    python -m benchmarks.bench_scraper_replay --archive data/replay --server
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from pathlib import Path
+from urllib.parse import urljoin
+
+
+def listing_page(config: dict, page_url: str, start: int, count: int, has_next: bool) -> bytes:
+    tag, _, cls = config["selectors"]["professor_container"].split(",")[0].strip().partition(".")
+    cards = "".join(
+        f'<{tag} class="{cls}"><h3>Professor {i}</h3>'
+        f'<span class="department">Computer Science</span>'
+        f'<p class="research">Research interests not specified</p>'
+        f'<a href="{urljoin(page_url, f"/people/prof-{i}")}">Profile</a></{tag}>'
+        for i in range(start, start + count)
+    )
+    pager = f'<a rel="next" href="?page={start // count + 1}">Next</a>' if has_next else ""
+    return f"<html><body>{cards}{pager}</body></html>".encode("utf-8")
+
+
+def profile_page(i: int) -> bytes:
+    return (
+        f"<html><body><h1>Professor {i}</h1>"
+        f"<h2>Research Interests</h2><p>Distributed systems and learning theory, topic {i % 37}</p>"
+        f"<p>Director of the Adaptive Systems Lab.</p></body></html>"
+    ).encode("utf-8")
+
+
+def build_archive(archive, configs: dict, professors: int, pages: int) -> int:
+    """Write listing and profile pages for every institution; returns page count."""
+    headers = {"content-type": "text/html; charset=utf-8"}
+    written = 0
+    for config in configs.values():
+        base_url = config["base_url"]
+        for page in range(pages):
+            url = base_url if page == 0 else urljoin(base_url, f"?page={page}")
+            body = listing_page(config, url, page * professors, professors, page + 1 < pages)
+            archive.add("GET", url, 200, headers, body)
+            written += 1
+        for i in range(professors * pages):
+            archive.add("GET", urljoin(base_url, f"/people/prof-{i}"), 200, headers, profile_page(i))
+            written += 1
+    return written
+
+
+async def run(configs: dict):
+    from app.services.crawler import crawl_institution
+    from app.services.http_client import close_http_client, fetch_stats
+    from app.services.scraper import scrape_institutions
+
+    start = time.perf_counter()
+    df = await scrape_institutions(list(configs))
+    page_mode = time.perf_counter() - start
+    page_requests = fetch_stats["requests"]
+
+    start = time.perf_counter()
+    crawled = await asyncio.gather(
+        *(crawl_institution(config["base_url"], config) for config in configs.values())
+    )
+    crawl_mode = time.perf_counter() - start
+    crawl_requests = fetch_stats["requests"] - page_requests
+    await close_http_client()
+
+    enriched = sum(
+        1 for result in crawled for prof in result
+        if prof["research_focus"] != "Research interests not specified"
+    )
+    return len(df), page_mode, page_requests, sum(map(len, crawled)), enriched, crawl_mode, crawl_requests
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    arg_parser.add_argument("--archive", type=Path, help="Existing archive; default builds a synthetic one")
+    arg_parser.add_argument("--professors", type=int, default=50, help="Professors per listing page")
+    arg_parser.add_argument("--pages", type=int, default=20, help="Listing pages per institution")
+    arg_parser.add_argument("--server", action="store_true", help="Serve the archive over a local HTTP server")
+    arg_parser.add_argument("--latency-ms", type=float, default=0, help="Server-side delay per response")
+    arg_parser.add_argument("--concurrency", type=int, default=16, help="Crawler workers per institution")
+    args = arg_parser.parse_args()
+
+    tmp = None
+    archive_dir = args.archive
+    if archive_dir is None:
+        tmp = tempfile.TemporaryDirectory()
+        archive_dir = Path(tmp.name)
+
+    # Settings are read at import time, so they go in before app modules load
+    os.environ["HTTP_REPLAY_ARCHIVE"] = str(archive_dir)
+    os.environ.setdefault("SCRAPE_HOST_RATE", "100000")
+    os.environ.setdefault("SCRAPE_HOST_BURST", "1000")
+    os.environ["CRAWL_CONCURRENCY"] = str(args.concurrency)
+    from app.services import replay
+    from app.services.scraper import INSTITUTION_CONFIGS
+
+    configs = {name: config for name, config in INSTITUTION_CONFIGS.items()
+               if config.get("method", "beautifulsoup") == "beautifulsoup"}
+    archive = replay.PageArchive(archive_dir)
+    if args.archive is None:
+        print(f"synthetic archive:  {build_archive(archive, configs, args.professors, args.pages)} pages")
+
+    # The shared client is built lazily, so switching the mode here still applies
+    server = None
+    if args.server:
+        server = replay.serve_archive(archive, port=0, latency_ms=args.latency_ms)
+        replay.HTTP_REPLAY_MODE = "server"
+        replay.HTTP_REPLAY_SERVER = f"http://127.0.0.1:{server.server_address[1]}"
+    else:
+        replay.HTTP_REPLAY_MODE = "replay"
+
+    try:
+        (page_rows, page_s, page_requests,
+         crawl_rows, enriched, crawl_s, crawl_requests) = asyncio.run(run(configs))
+    finally:
+        if server is not None:
+            server.shutdown()
+        if tmp is not None:
+            tmp.cleanup()
+
+    print(f"transport:          {'local server' if args.server else 'in-process replay'}")
+    print(f"page mode:          {page_rows} professors, {page_requests} requests, "
+          f"{page_s * 1000:.1f} ms")
+    print(f"crawl mode:         {crawl_rows} professors ({enriched} enriched), "
+          f"{crawl_requests} requests, {crawl_s:.2f} s, {crawl_requests / crawl_s:.0f} pages/s")
+
+
+if __name__ == "__main__":
+    main()
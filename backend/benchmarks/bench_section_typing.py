@@ -0,0 +1,99 @@
+"""
+Section typing microbenchmark, keyword loops vs compiled matchers.
+
+"before" is the previous code: a substring check per keyword of every
+group for each header, and uncompiled regexes (plus a lower() copy) per
+line in _content_based_matching. "after" is the parser's compiled
+keyword matcher and content patterns. Both run over the headers and
+section lines of synthetic resume texts, or of .txt files with --texts-dir.
+Needs the spaCy model installed.
+
+    cd backend
+    python -m benchmarks.bench_section_typing --resumes 500
+    python -m benchmarks.bench_section_typing --texts-dir extracted/
+"""
+import argparse
+import re
+import time
+from pathlib import Path
+
+from app.services.resume_parser import ResumeParser
+from .synthetic import make_resume_text
+
+
+def legacy_keyword_type(parser: ResumeParser, section_name: str):
+    section_name_lower = section_name.lower()
+    for keyword in parser.skills_keywords:
+        if keyword in section_name_lower:
+            return "SKILLS"
+    for keyword in parser.experience_keywords:
+        if keyword in section_name_lower:
+            return "EXPERIENCE"
+    for keyword in parser.education_keywords:
+        if keyword in section_name_lower:
+            return "EDUCATION"
+    return None
+
+
+def legacy_content_type(section_content: str) -> str:
+    lines = [l.strip() for l in section_content.split('\n') if l.strip()]
+    skill_indicators = 0
+    experience_indicators = 0
+    for line in lines:
+        if ',' in line or '/' in line or (len(line) < 60 and not re.search(r'\d{4}', line)):
+            skill_indicators += 1
+        if re.search(r'\d{4}', line):
+            experience_indicators += 1
+        if re.search(r'\b(developed|managed|led|designed|implemented)\b', line.lower()):
+            experience_indicators += 1
+    if skill_indicators > experience_indicators:
+        return "SKILLS"
+    elif experience_indicators > 0:
+        return "EXPERIENCE"
+    return "OTHER"
+
+
+def best_of(fn, repeats: int) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    arg_parser.add_argument("--resumes", type=int, default=500, help="Synthetic resume texts")
+    arg_parser.add_argument("--texts-dir", type=Path, help="Directory of extracted resume .txt files instead")
+    arg_parser.add_argument("--repeats", type=int, default=5)
+    args = arg_parser.parse_args()
+
+    parser = ResumeParser()
+    if args.texts_dir:
+        texts = [path.read_text() for path in sorted(args.texts_dir.glob("*.txt"))]
+    else:
+        texts = [make_resume_text(seed, entries=6) for seed in range(args.resumes)]
+    sections = [section for text in texts for section in parser.split_into_sections(text).items()]
+    headers = [name for name, _ in sections]
+    contents = [content for _, content in sections]
+
+    assert [legacy_keyword_type(parser, h) for h in headers] == [parser._keyword_section_type(h) for h in headers]
+    assert [legacy_content_type(c) for c in contents] == [parser._content_based_matching("", c) for c in contents]
+
+    rows = [
+        ("header keywords", len(headers),
+         best_of(lambda: [legacy_keyword_type(parser, h) for h in headers], args.repeats),
+         best_of(lambda: [parser._keyword_section_type(h) for h in headers], args.repeats)),
+        ("section content", len(contents),
+         best_of(lambda: [legacy_content_type(c) for c in contents], args.repeats),
+         best_of(lambda: [parser._content_based_matching("", c) for c in contents], args.repeats)),
+    ]
+    print(f"{len(texts)} resumes, {len(sections)} sections")
+    print(f"{'':>16}  {'items':>6}  {'before ms':>9}  {'after ms':>8}  {'speedup':>7}")
+    for label, items, before_ms, after_ms in rows:
+        print(f"{label:>16}  {items:>6}  {before_ms:>9.2f}  {after_ms:>8.2f}  {before_ms / after_ms:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Throughput of pooled vs one-off Selenium drivers on a local fixture page.
+
+Serves a static faculty page from a local HTTP server and loads it
+--pages times, first with a fresh Chrome per page (scrape_with_selenium),
+then through the WebDriver pool. Exits cleanly if Chrome isn't available.
+
+    cd backend
+    python -m benchmarks.bench_selenium_pool --pages 20 --pool-size 2
+"""
+import argparse
+import asyncio
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .bench_http_client import faculty_page
+
+
+CONFIG = {
+    "selectors": {
+        "professor_container": "div.faculty-member",
+        "name": "h3",
+        "department": ".department",
+        "research": ".research",
+        "profile_link": "a",
+    },
+}
+
+
+def serve(body: bytes) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+async def run_pool(pool, extract, url: str, pages: int):
+    return await asyncio.gather(*(pool.run(extract, url, CONFIG) for _ in range(pages)))
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    arg_parser.add_argument("--pages", type=int, default=20)
+    arg_parser.add_argument("--pool-size", type=int, default=2)
+    arg_parser.add_argument("--max-pages", type=int, default=50)
+    args = arg_parser.parse_args()
+
+    os.environ["SELENIUM_POOL_SIZE"] = str(args.pool_size)
+    os.environ["SELENIUM_MAX_PAGES"] = str(args.max_pages)
+    from app.services.scraper import (
+        extract_with_driver,
+        get_selenium_driver,
+        get_selenium_pool,
+        scrape_with_selenium,
+    )
+
+    probe = get_selenium_driver()
+    if probe is None:
+        print("Chrome/WebDriver not available, skipping Selenium pool benchmark")
+        sys.exit(0)
+    probe.quit()
+
+    server = serve(faculty_page(20))
+    url = f"http://127.0.0.1:{server.server_address[1]}/faculty"
+    try:
+        start = time.perf_counter()
+        for _ in range(args.pages):
+            scrape_with_selenium(url, CONFIG)
+        one_off = time.perf_counter() - start
+
+        pool = get_selenium_pool()
+        start = time.perf_counter()
+        results = asyncio.run(run_pool(pool, extract_with_driver, url, args.pages))
+        pooled = time.perf_counter() - start
+        pool.close()
+    finally:
+        server.shutdown()
+
+    assert all(len(professors) == 20 for professors in results)
+    print(f"pages:             {args.pages}")
+    print(f"one-off drivers:   {args.pages / one_off:.2f} pages/s")
+    print(f"pool (size {args.pool_size}):     {args.pages / pooled:.2f} pages/s")
+    print(f"drivers started:   {pool.drivers_started}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""Synthetic faculty data for offline benchmarks."""
+import random
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+from app.services.resume_parser import ParsedResume
+
+
+DEPARTMENTS = [
+    "Computer Science", "Electrical Engineering", "Mathematics", "Physics",
+    "Chemistry", "Biology", "Mechanical Engineering", "Psychology",
+]
+
+RESEARCH_TOPICS = [
+    "machine learning", "computer vision", "natural language processing",
+    "distributed systems", "databases", "computer security", "robotics",
+    "quantum computing", "computational biology", "human-computer interaction",
+    "signal processing", "control theory", "graph algorithms", "compilers",
+    "reinforcement learning", "materials science", "neuroscience", "cryptography",
+]
+
+INSTITUTIONS = [
+    "Rutgers", "NJIT", "Princeton", "Stevens Institute of Technology",
+    "TCNJ", "Seton Hall",
+]
+
+
+def make_professors(n: int, seed: int = 0) -> pd.DataFrame:
+    """DataFrame of n professors with the columns scrape_institutions returns."""
+    rng = random.Random(seed)
+    rows = []
+    for i in range(n):
+        institution = rng.choice(INSTITUTIONS)
+        name = f"Professor {i}"
+        topics = rng.sample(RESEARCH_TOPICS, rng.randint(1, 4))
+        rows.append({
+            "id": f"{institution}_{name}".replace(" ", "_").lower(),
+            "name": name,
+            "institution": institution,
+            "department": rng.choice(DEPARTMENTS),
+            "research_focus": ", ".join(topics),
+            "lab_group": f"{topics[0].title()} Lab" if rng.random() < 0.4 else None,
+            "profile_url": f"https://example.edu/faculty/{i}",
+        })
+    return pd.DataFrame(rows)
+
+
+SKILLS = [
+    "Python", "C++", "Java", "PyTorch", "TensorFlow", "SQL", "Linux", "Git",
+    "MATLAB", "R", "Docker", "Kubernetes", "React", "CUDA", "scikit-learn",
+    "Pandas", "Rust", "Go", "Verilog", "LaTeX",
+]
+
+ROLES = [
+    "Research Assistant", "Software Engineering Intern", "Teaching Assistant",
+    "Data Science Intern", "Undergraduate Researcher", "Lab Technician",
+]
+
+
+def make_resumes(n: int, seed: int = 0) -> List[ParsedResume]:
+    """n ParsedResume objects shaped like ResumeParser.parse output."""
+    rng = random.Random(seed)
+    resumes = []
+    for _ in range(n):
+        skills = rng.sample(SKILLS, rng.randint(5, 12))
+        experiences = []
+        for _ in range(rng.randint(1, 4)):
+            topic = rng.choice(RESEARCH_TOPICS)
+            experiences.append(
+                f"{rng.choice(ROLES)} | {rng.choice(INSTITUTIONS)} | 2023 - 2024\n"
+                f"• Developed {topic} pipelines using {rng.choice(skills)}\n"
+                f"• Designed experiments on {rng.choice(RESEARCH_TOPICS)} and reported results"
+            )
+        resumes.append(ParsedResume(
+            skills_section="SKILLS",
+            experience_section="EXPERIENCE",
+            skills_raw_text=skills,
+            experience_raw_text=experiences,
+            all_sections={"SKILLS": ", ".join(skills), "EXPERIENCE": "\n".join(experiences)},
+            section_mapping={"SKILLS": "SKILLS", "EXPERIENCE": "EXPERIENCE"},
+        ))
+    return resumes
+
+
+def make_token_embeddings(
+    n: int, dim: int = 1024, min_tokens: int = 12, max_tokens: int = 60, seed: int = 0
+) -> List[np.ndarray]:
+    """
+    Stand-in for BERT token embeddings without loading a model.
+
+    Every sequence draws its content tokens around a few shared topic
+    directions, so sequences about the same topics score higher against
+    each other and rankings are meaningful. The first and last rows play
+    the special tokens. Rows are L2-normalized like encode_texts output.
+    """
+    rng = np.random.default_rng(seed)
+    topics = rng.standard_normal((len(RESEARCH_TOPICS), dim)).astype(np.float32)
+    sequences = []
+    for _ in range(n):
+        length = int(rng.integers(min_tokens, max_tokens + 1))
+        chosen = rng.choice(len(topics), size=rng.integers(1, 4), replace=False)
+        centers = topics[rng.choice(chosen, size=length)]
+        tokens = centers + 0.8 * rng.standard_normal((length, dim)).astype(np.float32)
+        tokens[[0, -1]] = rng.standard_normal((2, dim))
+        tokens /= np.linalg.norm(tokens, axis=1, keepdims=True)
+        sequences.append(tokens.astype(np.float32))
+    return sequences
+
+
+def sample_sizes(spec: str) -> List[int]:
+    """Parse a comma-separated size list such as "1000,10000"."""
+    return [int(part) for part in spec.split(",") if part.strip()]
+
+
+SECTION_HEADERS = [
+    "PROJECTS", "LEADERSHIP", "AWARDS", "PUBLICATIONS", "ACTIVITIES",
+    "RELEVANT COURSEWORK", "VOLUNTEER WORK", "CERTIFICATIONS",
+]
+
+
+def make_resume_text(seed: int = 0, entries: int = 4) -> str:
+    """Plain resume text with the section layout students typically use."""
+    rng = random.Random(seed)
+    skills = rng.sample(SKILLS, rng.randint(5, 12))
+    lines = [f"Student {seed}", f"student{seed}@university.edu | (555) 010-{seed % 10000:04d}"]
+    lines += ["EDUCATION", f"B.S. Computer Science, {rng.choice(INSTITUTIONS)} | 2021 - 2025"]
+    lines += ["TECHNICAL SKILLS", ", ".join(skills)]
+    lines.append("EXPERIENCE")
+    for _ in range(entries):
+        topic = rng.choice(RESEARCH_TOPICS)
+        lines += [
+            f"{rng.choice(ROLES)} | {rng.choice(INSTITUTIONS)} | 2023 - 2024",
+            f"• Developed {topic} pipelines using {rng.choice(skills)} and {rng.choice(skills)}",
+            f"• Designed experiments on {rng.choice(RESEARCH_TOPICS)} and reported results weekly",
+        ]
+    for header in rng.sample(SECTION_HEADERS, 3):
+        lines.append(header)
+        lines += [f"{header.title()} item {i}: {rng.choice(RESEARCH_TOPICS)} work in 2024" for i in range(3)]
+    return "\n".join(lines)
+
+
+def make_resume_pdf(pages: int = 2, seed: int = 0) -> bytes:
+    """A resume PDF of the given page count, one text block per line."""
+    import fitz
+
+    document = fitz.open()
+    for page_number in range(pages):
+        page = document.new_page()
+        y = 60
+        for line in make_resume_text(seed * 1000 + page_number, entries=6).split("\n"):
+            page.insert_text((50, y), line, fontsize=9)
+            y += 14
+            if y > 780:
+                break
+    data = document.tobytes()
+    document.close()
+    return data
@@ -0,0 +1,78 @@
+import numpy as np
+
+from app.services.ann_index import IVFFlatIndex
+
+
+def unit_vectors(count, dim=16, seed=0):
+    rng = np.random.default_rng(seed)
+    vectors = rng.normal(size=(count, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def test_build_places_every_vector_in_one_list():
+    vectors = unit_vectors(200)
+
+    index = IVFFlatIndex.build(vectors, nlist=8, version=3)
+
+    assert index.nlist == 8
+    assert len(index) == 200
+    assert index.list_offsets[0] == 0 and index.list_offsets[-1] == 200
+    assert sorted(index.positions.tolist()) == list(range(200))
+    np.testing.assert_array_equal(index.vectors, vectors[index.positions])
+
+
+def test_search_probing_every_list_is_exact():
+    vectors = unit_vectors(200)
+    index = IVFFlatIndex.build(vectors, nlist=8)
+    query = vectors[17]
+
+    positions, scores = index.search(query, top_k=5, nprobe=8)
+
+    expected = np.argsort(-(vectors @ query))[:5]
+    assert positions.tolist() == expected.tolist()
+    assert positions[0] == 17
+    assert np.all(np.diff(scores) <= 0)
+
+
+def test_search_with_few_probes_finds_the_vector_itself():
+    vectors = unit_vectors(500, seed=1)
+    index = IVFFlatIndex.build(vectors, nlist=16)
+
+    for position in (0, 123, 499):
+        positions, _ = index.search(vectors[position], top_k=1, nprobe=1)
+        assert positions.tolist() == [position]
+
+
+def test_nlist_is_capped_by_the_number_of_vectors():
+    index = IVFFlatIndex.build(unit_vectors(3), nlist=10)
+
+    assert index.nlist == 3
+    assert len(index.search(unit_vectors(1, seed=2)[0], top_k=10)[0]) == 3
+
+
+def test_save_and_open_round_trip(tmp_path):
+    vectors = unit_vectors(100)
+    index = IVFFlatIndex.build(vectors, nlist=4, version=7)
+
+    index.save(tmp_path / "ann")
+    opened = IVFFlatIndex.open(tmp_path / "ann")
+
+    assert opened.version == 7
+    assert isinstance(opened.vectors, np.memmap)
+    query = vectors[42]
+    assert opened.search(query, 10)[0].tolist() == index.search(query, 10)[0].tolist()
+    # No temporary directory is left next to the index
+    assert [p.name for p in tmp_path.iterdir()] == ["ann"]
+
+
+def test_save_replaces_an_existing_index(tmp_path):
+    IVFFlatIndex.build(unit_vectors(50), nlist=4, version=1).save(tmp_path / "ann")
+    IVFFlatIndex.build(unit_vectors(80), nlist=4, version=2).save(tmp_path / "ann")
+
+    opened = IVFFlatIndex.open(tmp_path / "ann")
+
+    assert (opened.version, len(opened)) == (2, 80)
+
+
+def test_open_without_an_index_returns_none(tmp_path):
+    assert IVFFlatIndex.open(tmp_path / "missing") is None
@@ -0,0 +1,88 @@
+import os
+import time
+
+from app.services import cache as cache_module
+from app.services.cache import LRUCache, match_cache_key
+
+
+def test_evicts_least_recently_used_entry():
+    cache = LRUCache("test", max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    assert cache.evictions == 1
+
+
+def test_byte_budget_is_exact():
+    cache = LRUCache("test", max_bytes=10)
+    cache.set("a", "xxxx")  # 6 bytes of JSON
+    cache.set("b", "yyyy")
+
+    assert cache.get("a") is None
+    assert cache.stats()["bytes"] == 6
+
+    # Larger than the whole budget: not cached at all
+    cache.set("c", "z" * 20)
+    assert cache.get("c") is None
+    assert cache.get("b") == "yyyy"
+
+
+def test_expired_entry_is_a_miss(monkeypatch):
+    now = time.time()
+    cache = LRUCache("test", ttl_seconds=10)
+    monkeypatch.setattr(cache_module.time, "time", lambda: now)
+    cache.set("a", 1)
+
+    monkeypatch.setattr(cache_module.time, "time", lambda: now + 11)
+    assert cache.get("a") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_disk_tier_survives_a_restart(tmp_path):
+    LRUCache("test", disk_dir=str(tmp_path)).set("a", {"x": 1})
+
+    cache = LRUCache("test", disk_dir=str(tmp_path))
+    assert cache.get("a") == {"x": 1}
+    assert cache.get("a") == {"x": 1}
+    assert (cache.disk_hits, cache.hits) == (1, 1)
+
+
+def test_disk_hit_keeps_its_original_timestamp(tmp_path, monkeypatch):
+    now = time.time()
+    LRUCache("test", ttl_seconds=50, disk_dir=str(tmp_path)).set("a", 1)
+    written_at = now - 40
+    os.utime(tmp_path / "a.json", (written_at, written_at))
+
+    cache = LRUCache("test", ttl_seconds=50, disk_dir=str(tmp_path))
+    assert cache.get("a") == 1
+
+    # Promoted to memory, the entry still expires 50s after it was written
+    monkeypatch.setattr(cache_module.time, "time", lambda: now + 20)
+    assert cache.get("a") is None
+
+
+def test_disk_tier_is_bounded(tmp_path):
+    cache = LRUCache("test", disk_dir=str(tmp_path), disk_max_bytes=100)
+    for i in range(20):
+        cache.set(f"k{i:02d}", "x" * 20)  # 22 bytes each
+        os.utime(tmp_path / f"k{i:02d}.json", (1000 + i, 1000 + i))
+
+    files = sorted(path.name for path in tmp_path.glob("*.json"))
+    assert sum((tmp_path / name).stat().st_size for name in files) <= 100
+    # The newest entries are the ones kept
+    assert files[-1] == "k19.json"
+    assert cache.stats()["disk_evictions"] == 20 - len(files)
+
+
+def test_match_cache_key_ignores_institution_order():
+    key = match_cache_key(b"%PDF", ["NJIT", "TCNJ"], 3, "catalog-v1")
+
+    assert key == match_cache_key(b"%PDF", ["TCNJ", "NJIT", "NJIT"], 3, "catalog-v1")
+    assert key != match_cache_key(b"%PDF", ["NJIT", "TCNJ"], 3, "catalog-v2")
+    assert key != match_cache_key(b"%PDF", ["NJIT", "TCNJ"], 5, "catalog-v1")
+    assert key != match_cache_key(b"%PDF-other", ["NJIT", "TCNJ"], 3, "catalog-v1")
@@ -0,0 +1,106 @@
+import asyncio
+
+from app.services import catalog as catalog_module
+from app.services import scraper
+from app.services.catalog import FacultyCatalog
+from app.services.embedding_index import profile_hash
+
+
+def professor(pid, research_focus="Machine learning", **fields):
+    return {
+        "id": pid,
+        "name": f"Professor {pid}",
+        "institution": "NJIT",
+        "department": "Computer Science",
+        "research_focus": research_focus,
+        "lab_group": None,
+        "profile_url": f"https://njit.edu/{pid}",
+        **fields,
+    }
+
+
+def test_first_snapshot_is_all_changed(tmp_path):
+    catalog = FacultyCatalog(tmp_path / "catalog.sqlite3")
+    changed, removed = catalog.replace_institution("NJIT", [professor("a"), professor("b")])
+
+    assert [prof["id"] for prof in changed] == ["a", "b"]
+    assert removed == []
+    assert all(prof["content_hash"] == profile_hash(prof) for prof in changed)
+    assert catalog.version() == 1
+
+
+def test_refresh_reports_changed_and_removed(tmp_path):
+    catalog = FacultyCatalog(tmp_path / "catalog.sqlite3")
+    catalog.replace_institution("NJIT", [professor("a"), professor("b"), professor("c")])
+
+    changed, removed = catalog.replace_institution("NJIT", [
+        # Same profile up to case and spacing: not re-encoded
+        professor("a", research_focus="  machine   LEARNING "),
+        professor("b", research_focus="Computer vision"),
+        professor("d"),
+    ])
+
+    assert sorted(prof["id"] for prof in changed) == ["b", "d"]
+    assert removed == ["c"]
+    assert sorted(catalog.get_professors(["NJIT"])["id"]) == ["a", "b", "d"]
+    assert catalog.version() == 2
+
+
+def test_refresh_only_touches_its_institution(tmp_path):
+    catalog = FacultyCatalog(tmp_path / "catalog.sqlite3")
+    catalog.replace_institution("NJIT", [professor("a")])
+    catalog.replace_institution("TCNJ", [professor("t", institution="TCNJ")])
+
+    changed, removed = catalog.replace_institution("NJIT", [])
+
+    assert changed == []
+    assert removed == ["a"]
+    assert list(catalog.get_professors(["TCNJ"])["id"]) == ["t"]
+
+
+def test_unchanged_refresh_keeps_the_version(tmp_path):
+    catalog = FacultyCatalog(tmp_path / "catalog.sqlite3")
+    catalog.replace_institution("NJIT", [professor("a"), professor("b")])
+
+    changed, removed = catalog.replace_institution("NJIT", [professor("b"), professor("a")])
+
+    assert (changed, removed) == ([], [])
+    assert catalog.version() == 1
+
+
+def test_field_outside_the_hash_bumps_the_version(tmp_path):
+    catalog = FacultyCatalog(tmp_path / "catalog.sqlite3")
+    catalog.replace_institution("NJIT", [professor("a")])
+
+    changed, removed = catalog.replace_institution("NJIT", [professor("a", profile_url="https://njit.edu/new")])
+
+    # Nothing to re-encode, but served results change
+    assert (changed, removed) == ([], [])
+    assert catalog.version() == 2
+
+
+def test_refreshes_share_the_scrape_concurrency_limit(tmp_path, monkeypatch):
+    running = 0
+    peak = 0
+
+    async def fake_scrape(institution):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return [professor(f"{institution}-1", institution=institution)]
+
+    monkeypatch.setattr(catalog_module, "_catalog", FacultyCatalog(tmp_path / "catalog.sqlite3"))
+    monkeypatch.setattr(catalog_module, "_refresh_tasks", {})
+    monkeypatch.setattr(catalog_module, "reindex_professors", lambda changed, removed: None)
+    monkeypatch.setattr(scraper, "scrape_single_institution", fake_scrape)
+
+    async def refresh_all():
+        monkeypatch.setattr(scraper, "_scrape_semaphore", asyncio.Semaphore(2))
+        await asyncio.gather(*(catalog_module.schedule_refresh(inst) for inst in ["A", "B", "C", "D", "E"]))
+
+    asyncio.run(refresh_all())
+
+    assert peak == 2
+    assert len(catalog_module._catalog.get_professors(["A", "B", "C", "D", "E"])) == 5
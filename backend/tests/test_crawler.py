@@ -0,0 +1,57 @@
+from app.services.crawler import DEFAULT_CRAWL_SELECTORS, parse_listing_page, parse_profile_page
+
+URL = "https://cs.example.edu/people/faculty"
+
+CONFIG = {
+    "selectors": {
+        "professor_container": "div.faculty-member",
+        "name": "h3, .name",
+        "department": ".department",
+        "research": ".research",
+        "profile_link": "a",
+    },
+}
+
+LISTING = """
+<html><body>
+  <div class="faculty-member">
+    <h3>Ada Lovelace</h3><span class="department">Computer Science</span>
+    <p class="research">Analytical engines</p><a href="/people/ada">Profile</a>
+  </div>
+  <ul class="pager"><li class="next"><a href="?page=2">Next</a></li></ul>
+  <a rel="next" href="https://elsewhere.example.com/faculty?page=2">Mirror</a>
+</body></html>
+"""
+
+
+def test_listing_page_yields_cards_and_same_host_pagination():
+    cards, links = parse_listing_page(LISTING, URL, CONFIG, DEFAULT_CRAWL_SELECTORS, follow_pages=True)
+
+    assert cards == [{
+        "name": "Ada Lovelace",
+        "department": "Computer Science",
+        "research_focus": "Analytical engines",
+        "profile_url": "https://cs.example.edu/people/ada",
+    }]
+    assert links == ["https://cs.example.edu/people/faculty?page=2"]
+
+
+def test_listing_page_without_pagination_only_extracts_cards():
+    cards, links = parse_listing_page(LISTING, URL, CONFIG, DEFAULT_CRAWL_SELECTORS, follow_pages=False)
+
+    assert [card["name"] for card in cards] == ["Ada Lovelace"]
+    assert links == []
+
+
+def test_profile_page_falls_back_to_research_heading_and_lab_name():
+    html = """
+    <html><body>
+      <h2>Research Interests</h2><p>Program verification and type systems</p>
+      <p>She directs the Formal Methods Lab.</p>
+    </body></html>
+    """
+
+    assert parse_profile_page(html, DEFAULT_CRAWL_SELECTORS) == {
+        "research_focus": "Program verification and type systems",
+        "lab_group": "Formal Methods Lab",
+    }
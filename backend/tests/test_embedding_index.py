@@ -0,0 +1,229 @@
+import numpy as np
+import pytest
+
+from app.services import embedding_index
+from app.services.embedding_index import (
+    ProfessorEmbeddingIndex,
+    greedy_match_f1,
+    greedy_match_f1_matrix,
+)
+
+
+def token_embeddings(count, min_tokens=3, max_tokens=40, dim=16, seed=0):
+    """Random L2-normalized (tokens, dim) arrays, one per sequence."""
+    rng = np.random.default_rng(seed)
+    sequences = []
+    for _ in range(count):
+        rows = rng.normal(size=(rng.integers(min_tokens, max_tokens), dim)).astype(np.float32)
+        sequences.append(rows / np.linalg.norm(rows, axis=1, keepdims=True))
+    return sequences
+
+
+def stacked(sequences):
+    offsets = np.concatenate([[0], np.cumsum([len(s) for s in sequences])]).astype(np.int64)
+    return np.concatenate(sequences), offsets
+
+
+def pair_f1(ref, cand):
+    """BERTScore greedy matching of one pair, first and last tokens unweighted."""
+    sim = ref @ cand.T
+    ref_weights = np.ones(len(ref))
+    ref_weights[[0, -1]] = 0
+    cand_weights = np.ones(len(cand))
+    cand_weights[[0, -1]] = 0
+    precision = (sim.max(axis=0) * cand_weights).sum() / cand_weights.sum()
+    recall = (sim.max(axis=1) * ref_weights).sum() / ref_weights.sum()
+    return precision, recall, 2 * precision * recall / (precision + recall)
+
+
+def test_upsert_tracks_missing_and_bumps_version(tmp_path):
+    index = ProfessorEmbeddingIndex(tmp_path, "model")
+    index.upsert(["a", "b"], ["ha", "hb"], token_embeddings(2))
+
+    assert index.version == 1
+    assert index.ids == ["a", "b"]
+    assert index.missing(["a", "b", "c"], ["ha", "changed", "hc"]) == [1, 2]
+
+    index.upsert(["b"], ["changed"], token_embeddings(1, seed=1))
+    assert index.version == 2
+    assert index.missing(["a", "b"], ["ha", "changed"]) == []
+
+
+def test_remove_tombstones_and_compacts(tmp_path, monkeypatch):
+    monkeypatch.setattr(embedding_index, "TOMBSTONE_COMPACT_RATIO", 0.5)
+    ids = ["a", "b", "c", "d"]
+    index = ProfessorEmbeddingIndex(tmp_path, "model")
+    index.upsert(ids, ids, token_embeddings(4))
+
+    assert index.remove(["a", "unknown"]) == 1
+    assert index.version == 2
+    assert index.tombstones == {"a"}
+    assert index.ids == ids
+    assert index.missing(["a"], ["a"]) == [0]
+
+    # Removing it again changes nothing
+    assert index.remove(["a"]) == 0
+    assert index.version == 2
+
+    # Past the ratio the rows are cut out of the matrix
+    assert index.remove(["b", "c"]) == 2
+    assert index.version == 3
+    assert index.ids == ["d"]
+    assert index.tombstones == set()
+    assert index.offsets[-1] == len(index.embeddings)
+
+
+def test_upsert_revives_tombstoned_professor(tmp_path):
+    index = ProfessorEmbeddingIndex(tmp_path, "model")
+    index.upsert(["a", "b"], ["ha", "hb"], token_embeddings(2))
+    index.remove(["a"])
+
+    index.upsert(["a"], ["ha"], token_embeddings(1, seed=1))
+    assert index.tombstones == set()
+    assert sorted(index.ids) == ["a", "b"]
+    assert index.missing(["a", "b"], ["ha", "hb"]) == []
+
+
+def test_copy_leaves_original_untouched(tmp_path):
+    index = ProfessorEmbeddingIndex(tmp_path, "model")
+    index.upsert(["a", "b"], ["ha", "hb"], token_embeddings(2))
+    embeddings, offsets = index.gather(["a", "b"])
+
+    fresh = index.copy()
+    fresh.upsert(["c"], ["hc"], token_embeddings(1, seed=1))
+    fresh.remove(["a"])
+
+    assert index.version == 1
+    assert index.ids == ["a", "b"]
+    assert index.tombstones == set()
+    gathered, gathered_offsets = index.gather(["a", "b"])
+    np.testing.assert_array_equal(gathered, embeddings)
+    np.testing.assert_array_equal(gathered_offsets, offsets)
+    assert fresh.version == 3
+
+
+def test_upsert_appends_and_frees_the_old_slot(tmp_path):
+    ids = ["a", "b", "c", "d", "e"]
+    index = ProfessorEmbeddingIndex(tmp_path, "model")
+    index.upsert(ids, ids, token_embeddings(5))
+    before = index.embeddings
+
+    changed = token_embeddings(1, seed=1)
+    index.upsert(["b"], ["b2"], changed)
+
+    # Appended into spare capacity: the earlier rows were not copied
+    assert np.shares_memory(index.embeddings, before)
+    assert index.ids == ["a", None, "c", "d", "e", "b"]
+    assert index.missing(ids, ["a", "b2", "c", "d", "e"]) == []
+    embeddings, _ = index.gather(["b"])
+    np.testing.assert_array_equal(embeddings, changed[0])
+
+    index.save()
+    loaded = ProfessorEmbeddingIndex.load(tmp_path, "model")
+    assert loaded.ids == index.ids
+    assert loaded.missing(ids, ["a", "b2", "c", "d", "e"]) == []
+
+
+def test_freed_slots_are_compacted_past_the_ratio(tmp_path):
+    ids = ["a", "b", "c", "d"]
+    sequences = token_embeddings(4)
+    index = ProfessorEmbeddingIndex(tmp_path, "model")
+    index.upsert(ids, ids, sequences)
+
+    index.upsert(["a"], ["a2"], token_embeddings(1, seed=1))
+    assert None in index.ids
+
+    # A second freed slot crosses 25% of five slots
+    index.upsert(["b"], ["b2"], token_embeddings(1, seed=2))
+    assert index.ids == ["c", "d", "a", "b"]
+    assert index.offsets[-1] == len(index.embeddings)
+    embeddings, _ = index.gather(["c", "d"])
+    np.testing.assert_array_equal(embeddings, stacked(sequences[2:])[0])
+
+
+def test_appending_to_an_older_copy_never_overwrites_a_newer_one(tmp_path):
+    base = ProfessorEmbeddingIndex(tmp_path, "model")
+    base.upsert(["a"], ["ha"], token_embeddings(1))
+    base.upsert(["b"], ["hb"], token_embeddings(1, seed=1))
+
+    first = base.copy()
+    first.upsert(["c"], ["hc"], token_embeddings(1, seed=2))
+    expected, _ = first.gather(["a", "b", "c"])
+    # A copy of the same base claims the same spare rows
+    second = base.copy()
+    second.upsert(["d"], ["hd"], token_embeddings(1, seed=3))
+
+    gathered, _ = first.gather(["a", "b", "c"])
+    np.testing.assert_array_equal(gathered, expected)
+    assert not np.shares_memory(first.embeddings, second.embeddings)
+
+
+@pytest.mark.parametrize("storage_dtype", ["float32", "float16", "int8"])
+def test_save_and_load_round_trip(tmp_path, storage_dtype):
+    ids = ["a", "b", "c", "d", "e"]
+    sequences = token_embeddings(5)
+    index = ProfessorEmbeddingIndex(tmp_path, "model", storage_dtype)
+    index.upsert(ids, ids, sequences)
+    index.remove(["b"])
+
+    assert index.save() == index.version
+    assert ProfessorEmbeddingIndex.current_version(tmp_path) == index.version
+
+    loaded = ProfessorEmbeddingIndex.load(tmp_path, "model", storage_dtype)
+    assert isinstance(loaded.embeddings, np.memmap)
+    assert loaded.version == index.version
+    assert loaded.ids == index.ids
+    assert loaded.tombstones == {"b"}
+    embeddings, offsets = loaded.gather(["a", "e"])
+    expected, expected_offsets = stacked([sequences[0], sequences[4]])
+    np.testing.assert_array_equal(offsets, expected_offsets)
+    np.testing.assert_allclose(embeddings, expected, atol=0.01)
+
+    # Another model's index is not reused
+    assert len(ProfessorEmbeddingIndex.load(tmp_path, "other-model")) == 0
+
+
+def test_save_never_reuses_a_published_version(tmp_path):
+    first = ProfessorEmbeddingIndex(tmp_path, "model")
+    first.upsert(["a"], ["ha"], token_embeddings(1))
+    first.save()
+
+    # A second worker with its own index at the same version number
+    second = ProfessorEmbeddingIndex(tmp_path, "model")
+    second.upsert(["b"], ["hb"], token_embeddings(1, seed=1))
+    assert second.save() == first.version + 1
+    assert second.version == 1
+    assert ProfessorEmbeddingIndex.load(tmp_path, "model").ids == ["b"]
+
+
+def test_greedy_match_f1_matrix_matches_per_pair():
+    references = token_embeddings(5, seed=1)
+    candidates = token_embeddings(20, seed=2)
+    precision, recall, f1 = greedy_match_f1_matrix(*stacked(references), *stacked(candidates))
+
+    assert f1.shape == (5, 20)
+    for i, ref in enumerate(references):
+        for j, cand in enumerate(candidates):
+            expected = pair_f1(ref, cand)
+            np.testing.assert_allclose(
+                (precision[i, j], recall[i, j], f1[i, j]), expected, rtol=1e-5, atol=1e-6
+            )
+
+
+def test_greedy_match_f1_matches_matrix_row():
+    ref = token_embeddings(1, seed=3)[0]
+    candidates = token_embeddings(10, seed=4)
+    _, _, f1 = greedy_match_f1(ref, *stacked(candidates))
+    _, _, matrix_f1 = greedy_match_f1_matrix(*stacked([ref]), *stacked(candidates))
+    np.testing.assert_allclose(f1, matrix_f1[0], rtol=1e-6)
+
+
+@pytest.mark.parametrize("block_elements", [1, 100, 5000])
+def test_greedy_match_f1_matrix_tiles_match_single_block(monkeypatch, block_elements):
+    references = stacked(token_embeddings(6, seed=5))
+    candidates = stacked(token_embeddings(30, seed=6))
+    expected = greedy_match_f1_matrix(*references, *candidates)
+
+    monkeypatch.setattr(embedding_index, "SIMILARITY_BLOCK_ELEMENTS", block_elements)
+    for tiled, single in zip(greedy_match_f1_matrix(*references, *candidates), expected):
+        np.testing.assert_allclose(tiled, single, rtol=1e-6, atol=1e-7)
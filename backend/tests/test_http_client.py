@@ -0,0 +1,70 @@
+import asyncio
+from collections import OrderedDict
+
+import httpx
+import pytest
+
+from app.services import http_client
+
+
+URL = "https://faculty.example.edu/people"
+
+
+@pytest.fixture
+def server(monkeypatch):
+    """Serve URL with an ETag and record the conditional headers of every request."""
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        if request.headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(
+            200,
+            text="<html>faculty</html>",
+            headers={"ETag": '"v1"', "Last-Modified": "Mon, 05 Oct 2026 10:00:00 GMT"},
+        )
+
+    monkeypatch.setattr(http_client, "_client", httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    monkeypatch.setattr(http_client, "_page_cache", OrderedDict())
+    monkeypatch.setattr(http_client, "fetch_stats", {"requests": 0, "not_modified": 0})
+    return requests
+
+
+def fetch_twice():
+    async def run():
+        first = await http_client.fetch_html(URL)
+        second = await http_client.fetch_html(URL)
+        await http_client.close_http_client()
+        return first, second
+
+    return asyncio.run(run())
+
+
+def test_revalidates_and_serves_304_from_cache(server):
+    first, second = fetch_twice()
+
+    assert first == second == "<html>faculty</html>"
+    assert "If-None-Match" not in server[0].headers
+    assert server[1].headers["If-None-Match"] == '"v1"'
+    assert server[1].headers["If-Modified-Since"] == "Mon, 05 Oct 2026 10:00:00 GMT"
+    assert http_client.fetch_stats == {"requests": 2, "not_modified": 1}
+
+
+def test_page_without_validators_is_not_cached(monkeypatch):
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(200, text="<html>no validators</html>")
+
+    monkeypatch.setattr(http_client, "_client", httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    monkeypatch.setattr(http_client, "_page_cache", OrderedDict())
+    monkeypatch.setattr(http_client, "fetch_stats", {"requests": 0, "not_modified": 0})
+
+    first, second = fetch_twice()
+
+    assert first == second == "<html>no validators</html>"
+    assert all("If-None-Match" not in r.headers and "If-Modified-Since" not in r.headers for r in requests)
+    assert http_client.fetch_stats["not_modified"] == 0
+    assert URL not in http_client._page_cache
@@ -0,0 +1,100 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from app.services import ingest as ingest_module
+from app.services.ingest import completed_sources, ingest
+
+
+class BreakablePool(ThreadPoolExecutor):
+    """Thread pool that, like a process pool, refuses work once a worker died."""
+
+    def __init__(self, max_workers):
+        super().__init__(max_workers=max_workers)
+        self.broken = False
+
+    def submit(self, fn, *args):
+        if self.broken:
+            raise BrokenProcessPool("A child process terminated abruptly")
+        return super().submit(fn, *args)
+
+
+@pytest.fixture
+def corpus(tmp_path, monkeypatch):
+    root = tmp_path / "resumes"
+    root.mkdir()
+    for name in ("a.pdf", "b.pdf", "bad.pdf", "c.pdf", "d.pdf"):
+        (root / name).write_bytes(b"%PDF-1.7")
+    executors = []
+
+    def new_executor(workers, quiet):
+        executors.append(BreakablePool(workers))
+        return executors[-1]
+
+    def parse_batch(sources):
+        # bad.pdf kills its worker, which breaks the pool
+        if any(source == "bad.pdf" for source, _, _ in sources):
+            executors[-1].broken = True
+            raise BrokenProcessPool("A process in the process pool was terminated abruptly")
+        return [{**ingest_module.new_record(source), "resume": {"name": source[0]}} for source in sources]
+
+    monkeypatch.setattr(ingest_module, "parse_batch", parse_batch)
+    monkeypatch.setattr(ingest_module, "_new_executor", new_executor)
+    return root, executors
+
+
+def records(output):
+    return [json.loads(line) for line in output.read_text().splitlines()]
+
+
+def test_a_crashing_file_is_recorded_and_the_run_continues(tmp_path, corpus):
+    root, executors = corpus
+    output = tmp_path / "parsed.jsonl"
+
+    stats = ingest(root, output, workers=2, batch_size=2)
+
+    assert (stats["parsed"], stats["failed"]) == (4, 1)
+    # Restarted after the batch [bad.pdf, c.pdf] crashed and after bad.pdf first crashed alone
+    assert len(executors) == 1 + ingest_module.MAX_WORKER_CRASHES
+    by_source = {record["source"]: record for record in records(output)}
+    assert sorted(by_source) == ["a.pdf", "b.pdf", "bad.pdf", "c.pdf", "d.pdf"]
+    assert by_source["bad.pdf"]["error"] == "Parser worker crashed on this file"
+    assert by_source["d.pdf"]["resume"] == {"name": "d.pdf"}
+
+
+def test_resume_skips_every_recorded_source(tmp_path, corpus):
+    root, _ = corpus
+    output = tmp_path / "parsed.jsonl"
+    ingest(root, output, workers=2, batch_size=2)
+
+    stats = ingest(root, output, workers=2, batch_size=2)
+
+    assert (stats["parsed"], stats["failed"], stats["skipped"]) == (0, 0, 5)
+    assert len(records(output)) == 5
+
+
+def test_retry_failed_replaces_failure_records(tmp_path, corpus, monkeypatch):
+    root, _ = corpus
+    output = tmp_path / "parsed.jsonl"
+    ingest(root, output, workers=2, batch_size=2)
+    monkeypatch.setattr(
+        ingest_module,
+        "parse_batch",
+        lambda sources: [{**ingest_module.new_record(s), "resume": {}} for s in sources],
+    )
+
+    stats = ingest(root, output, workers=2, batch_size=2, retry_failed=True)
+
+    assert (stats["parsed"], stats["skipped"]) == (1, 4)
+    assert sorted(r["source"] for r in records(output)) == ["a.pdf", "b.pdf", "bad.pdf", "c.pdf", "d.pdf"]
+    assert all(r["error"] is None for r in records(output))
+
+
+def test_completed_sources_drops_a_torn_last_line(tmp_path):
+    output = tmp_path / "parsed.jsonl"
+    output.write_text('{"source": "a.pdf", "error": null}\n{"source": "b.p')
+
+    assert completed_sources(output) == {"a.pdf"}
+    assert output.read_text() == '{"source": "a.pdf", "error": null}\n'
@@ -0,0 +1,182 @@
+import asyncio
+
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+from app import main
+from app.services.resume_parser import ParsedResume
+
+PDF = b"%PDF-1.7\n" + b"0" * 128
+
+
+def parsed_resume(skill):
+    return ParsedResume(
+        skills_section="SKILLS",
+        experience_section="EXPERIENCE",
+        skills_raw_text=[skill],
+        experience_raw_text=[],
+        all_sections={},
+        section_mapping={},
+    )
+
+
+def professor(pid):
+    return {
+        "id": pid,
+        "name": f"Professor {pid}",
+        "institution": "NJIT",
+        "department": "Computer Science",
+        "research_focus": "Machine learning",
+        "lab_group": None,
+        "profile_url": None,
+    }
+
+
+class FakeParsePool:
+    def saturated(self):
+        return False
+
+    async def parse(self, pdf_bytes, wait=False):
+        return parsed_resume(pdf_bytes.decode(errors="ignore").split()[-1]), ""
+
+
+@pytest.fixture
+def client(monkeypatch):
+    async def load_professors(institutions):
+        return pd.DataFrame([professor("p1"), professor("p2")])
+
+    monkeypatch.setattr(main, "is_scorer_ready", lambda: True)
+    monkeypatch.setattr(main, "get_parse_pool", lambda: FakeParsePool())
+    monkeypatch.setattr(main, "load_professors", load_professors)
+    # No context manager, so the startup hooks (model load, refresher) don't run
+    return TestClient(main.app)
+
+
+def post_batch(client, files, top_k=1):
+    return client.post(
+        "/match/batch",
+        params={"institutions": ["NJIT"], "top_k": top_k},
+        files=[("resumes", (name, body, "application/pdf")) for name, body in files],
+    )
+
+
+def test_batch_ranks_every_parsed_resume_once(client, monkeypatch):
+    calls = []
+
+    def rank_professors_batch(profiles, professors_df, top_k):
+        calls.append([profile.skills_raw_text for profile in profiles])
+        return [[professor("p1")] for _ in profiles]
+
+    monkeypatch.setattr(main, "rank_professors_batch", rank_professors_batch)
+
+    response = post_batch(client, [("a.pdf", PDF + b" alpha"), ("b.pdf", PDF + b" beta")])
+
+    assert response.status_code == 200
+    assert calls == [[["alpha"], ["beta"]]]
+    results = response.json()["results"]
+    assert [r["filename"] for r in results] == ["a.pdf", "b.pdf"]
+    assert all(r["error"] is None for r in results)
+    assert [[p["id"] for p in r["top_professors"]] for r in results] == [["p1"], ["p1"]]
+
+
+def test_batch_ranks_off_the_event_loop(client, monkeypatch):
+    def rank_professors_batch(profiles, professors_df, top_k):
+        with pytest.raises(RuntimeError):
+            asyncio.get_running_loop()
+        return [[] for _ in profiles]
+
+    monkeypatch.setattr(main, "rank_professors_batch", rank_professors_batch)
+
+    assert post_batch(client, [("a.pdf", PDF + b" alpha")]).status_code == 200
+
+
+def test_batch_reports_bad_files_without_failing_the_rest(client, monkeypatch):
+    monkeypatch.setattr(
+        main, "rank_professors_batch", lambda profiles, df, top_k: [[professor("p2")] for _ in profiles]
+    )
+
+    response = post_batch(client, [("notes.txt", b"plain text"), ("a.pdf", PDF + b" alpha")])
+
+    assert response.status_code == 200
+    bad, good = response.json()["results"]
+    assert bad["error"] == "Resume file is not a PDF"
+    assert bad["top_professors"] == []
+    assert [p["id"] for p in good["top_professors"]] == ["p2"]
+
+
+def test_batch_answers_503_while_the_scorer_loads(client, monkeypatch):
+    def rank_professors_batch(profiles, professors_df, top_k):
+        raise main.ScorerNotReady("loading")
+
+    monkeypatch.setattr(main, "rank_professors_batch", rank_professors_batch)
+
+    response = post_batch(client, [("a.pdf", PDF + b" alpha")])
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "10"
+
+
+class RecordingParsePool(FakeParsePool):
+    def __init__(self):
+        self.parsed = []
+
+    async def parse(self, pdf_bytes, wait=False):
+        self.parsed.append(pdf_bytes)
+        return await super().parse(pdf_bytes, wait)
+
+
+def post_match(client, body, filename="resume.pdf"):
+    return client.post(
+        "/match",
+        params={"institutions": ["NJIT"]},
+        files={"resume": (filename, body, "application/pdf")},
+    )
+
+
+def test_match_rejects_a_file_without_the_pdf_header(client, monkeypatch):
+    pool = RecordingParsePool()
+    monkeypatch.setattr(main, "get_parse_pool", lambda: pool)
+
+    response = post_match(client, b"GIF89a" + b"0" * 4096, filename="resume.pdf")
+
+    assert response.status_code == 415
+    assert response.json()["detail"] == "Resume file is not a PDF"
+    assert pool.parsed == []
+
+
+def test_match_accepts_a_pdf_header_after_leading_junk(client, monkeypatch):
+    pool = RecordingParsePool()
+    monkeypatch.setattr(main, "get_parse_pool", lambda: pool)
+    monkeypatch.setattr(main, "rank_professors", lambda profile, df, top_k: [professor("p1")] * 3)
+
+    response = post_match(client, b"\r\n\xef\xbb\xbf" + PDF + b" alpha")
+
+    assert response.status_code == 200
+    assert len(pool.parsed) == 1
+
+
+def test_match_rejects_a_pdf_over_the_size_limit_while_reading_it(client, monkeypatch):
+    pool = RecordingParsePool()
+    monkeypatch.setattr(main, "get_parse_pool", lambda: pool)
+    monkeypatch.setattr(main, "MAX_RESUME_BYTES", 100_000)
+
+    # Under the Content-Length cutoff, so only the chunked read catches it
+    response = post_match(client, PDF + b"0" * 150_000)
+
+    assert response.status_code == 413
+    assert response.json()["detail"].startswith("Resume file is too large")
+    assert pool.parsed == []
+
+
+def test_match_refuses_an_oversized_content_length_before_reading(client, monkeypatch):
+    async def read_resume_upload(upload):
+        raise AssertionError("body should not be read")
+
+    monkeypatch.setattr(main, "MAX_RESUME_BYTES", 100_000)
+    monkeypatch.setattr(main, "read_resume_upload", read_resume_upload)
+
+    response = post_match(client, PDF + b"0" * 300_000)
+
+    assert response.status_code == 413
+    assert response.json()["detail"] == "Upload too large"
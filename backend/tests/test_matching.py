@@ -0,0 +1,139 @@
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services import matching
+from app.services.embedding_index import ProfessorEmbeddingIndex
+from app.services.matching import (
+    ann_row_map,
+    create_resume_text,
+    get_bm25_index,
+    warm_bm25_indexes,
+)
+from app.services.resume_parser import ParsedResume
+
+
+def parsed_resume(skills, experiences):
+    return ParsedResume(
+        skills_section="TECHNICAL SKILLS",
+        experience_section="WORK EXPERIENCE",
+        skills_raw_text=skills,
+        experience_raw_text=experiences,
+        all_sections={},
+        section_mapping={},
+    )
+
+
+def test_resume_text_is_built_from_extracted_entries():
+    resume = parsed_resume(
+        ["Python", "PyTorch"], ["Research assistant, Vision Lab, 2023 - built segmentation models"]
+    )
+
+    assert create_resume_text(resume) == (
+        "skills: Python PyTorch  "
+        "experiences: Research assistant, Vision Lab, 2023 - built segmentation models"
+    )
+
+
+def test_resume_text_ignores_section_header_names():
+    text = create_resume_text(parsed_resume([], []))
+
+    assert text == "skills:   experiences:"
+    assert "T E C H N I C A L" not in text
+
+
+def catalog_frame(version, institutions, focus="Machine learning"):
+    df = pd.DataFrame(
+        {"id": ["p1"], "research_focus": [focus], "department": ["CS"], "lab_group": [None]}
+    )
+    df.attrs["catalog_version"] = version
+    df.attrs["institutions"] = tuple(institutions)
+    return df
+
+
+def test_bm25_index_is_cached_per_catalog_version_and_institutions(monkeypatch):
+    monkeypatch.setattr(matching, "_bm25_cache", OrderedDict())
+
+    first = get_bm25_index(catalog_frame(1, ["NJIT"]))
+
+    assert get_bm25_index(catalog_frame(1, ["NJIT"])) is first
+    assert get_bm25_index(catalog_frame(2, ["NJIT"])) is not first
+    assert get_bm25_index(catalog_frame(1, ["NJIT", "TCNJ"])) is not first
+    # Frames not read from the catalog are never cached
+    assert get_bm25_index(pd.DataFrame({"research_focus": ["x"]})) is not get_bm25_index(
+        pd.DataFrame({"research_focus": ["x"]})
+    )
+
+
+def test_warm_bm25_indexes_rebuilds_queried_sets_and_drops_old_versions(monkeypatch):
+    monkeypatch.setattr(matching, "_bm25_cache", OrderedDict())
+    get_bm25_index(catalog_frame(1, ["NJIT"]))
+    get_bm25_index(catalog_frame(1, ["NJIT", "TCNJ"]))
+
+    warm_bm25_indexes(lambda institutions: catalog_frame(2, institutions, focus="Robotics"))
+
+    assert list(matching._bm25_cache) == [(2, ("NJIT",)), (2, ("NJIT", "TCNJ"))]
+    assert matching._bm25_cache[(2, ("NJIT",))].scores("robotics")[0] > 0
+
+
+class RecordingWriter:
+    def __init__(self):
+        self.jobs = []
+
+    def submit(self, fn, *args):
+        self.jobs.append((fn, args))
+
+
+def embedding_index(tmp_path, ids):
+    index = ProfessorEmbeddingIndex(tmp_path, "model")
+    rng = np.random.default_rng(0)
+    tokens = [rng.normal(size=(4, 8)).astype(np.float32) for _ in ids]
+    tokens = [t / np.linalg.norm(t, axis=1, keepdims=True) for t in tokens]
+    index.upsert(ids, [f"hash-{pid}" for pid in ids], tokens)
+    return index
+
+
+def ann_frame(ids, version=1):
+    df = pd.DataFrame({"id": ids, "content_hash": [f"hash-{pid}" for pid in ids]})
+    df.attrs["catalog_version"] = version
+    df.attrs["institutions"] = ("NJIT",)
+    return df
+
+
+@pytest.fixture
+def ann_state(monkeypatch):
+    writer = RecordingWriter()
+    monkeypatch.setattr(matching, "_ann_rows_cache", OrderedDict())
+    monkeypatch.setattr(matching, "_sync_requested", set())
+    monkeypatch.setattr(matching, "_index_writer", writer)
+    return writer
+
+
+def test_ann_row_map_is_cached_per_frame_and_index(tmp_path, monkeypatch, ann_state):
+    index = embedding_index(tmp_path, ["p1", "p2", "p3"])
+    monkeypatch.setattr(matching, "get_professor_index", lambda: index)
+
+    found, positions, row_of_position = ann_row_map(ann_frame(["p3", "p1"]))
+
+    assert found is index
+    assert positions.tolist() == index.positions_of(["p3", "p1"]).tolist()
+    assert row_of_position[positions].tolist() == [0, 1]
+    assert row_of_position[index.positions_of(["p2"])].tolist() == [-1]
+    # Same catalog version and index: served from the cache
+    assert ann_row_map(ann_frame(["p3", "p1"]))[1] is positions
+    assert not ann_state.jobs
+
+
+def test_ann_row_map_queues_a_background_sync_instead_of_encoding(tmp_path, monkeypatch, ann_state):
+    index = embedding_index(tmp_path, ["p1"])
+    monkeypatch.setattr(matching, "get_professor_index", lambda: index)
+
+    assert ann_row_map(ann_frame(["p1", "p2"])) is None
+    assert ann_row_map(ann_frame(["p1", "p2"])) is None
+
+    assert len(ann_state.jobs) == 1
+    job, (key, ids, _, hashes) = ann_state.jobs[0]
+    assert job is matching._sync_in_background
+    assert ids == ["p1", "p2"] and hashes == ["hash-p1", "hash-p2"]
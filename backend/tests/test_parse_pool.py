@@ -0,0 +1,124 @@
+import asyncio
+import os
+import threading
+import time
+
+import pytest
+
+from app.services import parse_pool
+from app.services.parse_pool import ParserBusy, ParseTimeout, ResumeParsePool
+from app.services.resume_parser import ParsedResume
+
+release_thread_parse = threading.Event()
+
+
+def fake_parse_resume(pdf_bytes):
+    """Stands in for the parser: b"hang" never returns, b"crash" kills the process."""
+    if pdf_bytes.startswith(b"hang"):
+        time.sleep(600)
+    if pdf_bytes.startswith(b"crash"):
+        os._exit(1)
+    if pdf_bytes.startswith(b"block"):
+        release_thread_parse.wait(10)
+    resume = ParsedResume(
+        skills_section="SKILLS",
+        experience_section="EXPERIENCE",
+        skills_raw_text=[pdf_bytes.decode()],
+        experience_raw_text=[],
+        all_sections={},
+        section_mapping={},
+    )
+    return resume, pdf_bytes.decode()
+
+
+class NoCache:
+    def get(self, key):
+        return None
+
+    def set(self, key, value):
+        pass
+
+
+@pytest.fixture(autouse=True)
+def fake_parser(monkeypatch):
+    # Forked children inherit the patched module, so no model is loaded anywhere
+    monkeypatch.setattr(parse_pool, "RESUME_PARSE_START_METHOD", "fork")
+    monkeypatch.setattr(parse_pool, "parse_resume", fake_parse_resume)
+    monkeypatch.setattr(parse_pool, "preload_resume_parser", lambda freeze=False: None)
+    monkeypatch.setattr(parse_pool, "parsed_resume_cache", NoCache())
+    release_thread_parse.clear()
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_admission_turns_uploads_away_once_every_slot_is_taken():
+    pool = ResumeParsePool(workers=0, queue_size=1, timeout=10)
+
+    async def scenario():
+        first = asyncio.create_task(pool.parse(b"block-1"))
+        second = asyncio.create_task(pool.parse(b"block-2"))
+        await asyncio.sleep(0.1)
+        assert pool.saturated()
+        with pytest.raises(ParserBusy):
+            await pool.parse(b"block-3")
+        # A batch upload queues for a slot instead
+        third = asyncio.create_task(pool.parse(b"block-3", wait=True))
+        release_thread_parse.set()
+        return await asyncio.gather(first, second, third)
+
+    try:
+        results = run(scenario())
+    finally:
+        pool.close()
+
+    assert [text for _, text in results] == ["block-1", "block-2", "block-3"]
+    assert pool.stats["rejected"] == 1
+    assert pool.stats["parsed"] == 3
+    assert not pool.saturated()
+
+
+def test_timeout_kills_only_the_hung_job_and_resubmits_the_others():
+    pool = ResumeParsePool(workers=1, queue_size=1, timeout=3)
+    pool.start()
+    first_executor = pool._executor
+
+    async def scenario():
+        hung = asyncio.create_task(pool.parse(b"hang"))
+        await asyncio.sleep(1)
+        # Queued behind the hung job, then taken down with the pool when its child is killed
+        innocent = asyncio.create_task(pool.parse(b"queued"))
+        with pytest.raises(ParseTimeout):
+            await hung
+        return await innocent
+
+    try:
+        _, text = run(scenario())
+    finally:
+        pool.close()
+
+    assert text == "queued"
+    assert pool._executor is not first_executor
+    assert pool.stats["timeouts"] == 1
+    assert pool.stats["crashes"] == 0
+    assert not pool.saturated()
+
+
+def test_a_crashing_upload_fails_and_the_pool_recovers():
+    pool = ResumeParsePool(workers=1, queue_size=1, timeout=20)
+
+    async def scenario():
+        with pytest.raises(RuntimeError, match="crashed"):
+            await pool.parse(b"crash")
+        return await pool.parse(b"fine")
+
+    try:
+        _, text = run(scenario())
+    finally:
+        pool.close()
+
+    assert text == "fine"
+    # Once per pool it broke: the first try and the retry
+    assert pool.stats["crashes"] == parse_pool.RESUME_PARSE_ATTEMPTS
+    assert pool.stats["parsed"] == 1
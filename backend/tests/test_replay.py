@@ -0,0 +1,45 @@
+import asyncio
+
+import httpx
+
+from app.services.replay import PageArchive, RecordingTransport, ReplayTransport
+
+OLD_URL = "https://faculty.example.edu/people"
+NEW_URL = "https://faculty.example.edu/directory/"
+
+
+def live_site(request: httpx.Request) -> httpx.Response:
+    """Unread streams, as a network transport returns them."""
+    if str(request.url) == OLD_URL:
+        return httpx.Response(301, headers={"Location": "/directory/"}, stream=httpx.ByteStream(b""))
+    if str(request.url) == NEW_URL:
+        body = httpx.ByteStream(b"<html>faculty</html>")
+        return httpx.Response(200, headers={"ETag": '"v1"', "Content-Type": "text/html"}, stream=body)
+    return httpx.Response(404, stream=httpx.ByteStream(b"not found"))
+
+
+def get(transport, url):
+    async def run():
+        async with httpx.AsyncClient(transport=transport, follow_redirects=True) as client:
+            response = await client.get(url)
+            return response.status_code, str(response.url), response.text
+
+    return asyncio.run(run())
+
+
+def test_recorded_redirect_chain_replays_offline(tmp_path):
+    recorded = get(RecordingTransport(PageArchive(tmp_path), httpx.MockTransport(live_site)), OLD_URL)
+
+    archive = PageArchive(tmp_path)
+    assert recorded == (200, NEW_URL, "<html>faculty</html>")
+    status, headers, _ = archive.get("GET", OLD_URL)
+    assert (status, headers) == (301, {"location": "/directory/"})
+    assert get(ReplayTransport(archive), OLD_URL) == recorded
+
+
+def test_missing_pages_are_not_archived(tmp_path):
+    transport = RecordingTransport(PageArchive(tmp_path), httpx.MockTransport(live_site))
+    get(transport, "https://faculty.example.edu/gone")
+
+    assert len(PageArchive(tmp_path)) == 0
+    assert get(ReplayTransport(PageArchive(tmp_path)), OLD_URL)[0] == 404
@@ -0,0 +1,70 @@
+from itertools import product
+
+import pytest
+
+from app.services.resume_parser import ResumeParser, keyword_group_matcher
+
+
+SKILLS = {
+    'skills', 'technical skills', 'core competencies', 'competencies',
+    'technologies', 'tools', 'programming', 'languages', 'expertise',
+    'capabilities', 'proficiencies', 'technical expertise', 'toolbox'
+}
+EXPERIENCE = {
+    'experience', 'work experience', 'professional experience',
+    'employment', 'career', 'work history', 'positions',
+    'professional background', 'internships', 'internship',
+    'projects', 'roles'
+}
+EDUCATION = {
+    'education', 'academic', 'degree', 'qualification',
+    'university', 'college', 'school', 'credentials'
+}
+
+
+def legacy_section_type(header: str):
+    """The per-keyword substring loop keyword_group_matcher replaced."""
+    header = header.lower()
+    for group, keywords in (("SKILLS", SKILLS), ("EXPERIENCE", EXPERIENCE), ("EDUCATION", EDUCATION)):
+        for keyword in keywords:
+            if keyword in header:
+                return group
+    return None
+
+
+@pytest.fixture(scope="module")
+def parser():
+    # Only the keyword matcher is exercised, so skip loading spaCy
+    parser = ResumeParser.__new__(ResumeParser)
+    parser.section_groups = ["SKILLS", "EXPERIENCE", "EDUCATION"]
+    parser.section_keyword_re, parser.section_keyword_groups = keyword_group_matcher({
+        "SKILLS": SKILLS, "EXPERIENCE": EXPERIENCE, "EDUCATION": EDUCATION,
+    })
+    return parser
+
+
+HEADERS = [
+    "", "Summary", "SKILLS", "Technical Skills & Tools", "Work Experience",
+    "Education and Projects", "Academic Projects", "Career Objectives",
+    "Professional Background", "internshipskills", "University Experience",
+    "Relevant Coursework", "Languages", "Publications", "School Roles",
+]
+
+
+@pytest.mark.parametrize("header", HEADERS)
+def test_matches_legacy_loop_on_headers(parser, header):
+    assert parser._keyword_section_type(header) == legacy_section_type(header)
+
+
+def test_matches_legacy_loop_on_keyword_pairs(parser):
+    keywords = sorted(SKILLS | EXPERIENCE | EDUCATION)
+    for first, second, separator in product(keywords, keywords, ["", " ", " & "]):
+        header = f"{first}{separator}{second}"
+        assert parser._keyword_section_type(header) == legacy_section_type(header), header
+
+
+def test_keyword_inside_a_longer_keyword_keeps_its_group():
+    pattern, groups = keyword_group_matcher({"A": {"skills"}, "B": {"technical skills set"}})
+
+    assert groups["technical skills set"] == "A"
+    assert groups[pattern.search("my technical skills set").group()] == "A"
@@ -0,0 +1,65 @@
+import pandas as pd
+
+from app.services.retrieval import BM25Index, professor_documents, recall_at_k, tokenize
+
+DOCUMENTS = [
+    "deep learning for computer vision",
+    "protein folding and computational biology",
+    "robot motion planning and control",
+    "computer vision for autonomous mobile robots",
+]
+
+
+def test_tokenize_drops_stop_words_and_keeps_language_names():
+    assert tokenize("Research in C++ and the C# language") == ["c++", "c#", "language"]
+
+
+def test_bm25_ranks_documents_sharing_query_terms():
+    bm25 = BM25Index(DOCUMENTS)
+
+    scores = bm25.scores("computer vision")
+
+    assert scores[1] == scores[2] == 0
+    assert scores[0] > 0 and scores[3] > 0
+    # The shorter document wins on equal term counts
+    assert scores[0] > scores[3]
+
+
+def test_bm25_rare_terms_outweigh_common_ones():
+    bm25 = BM25Index(DOCUMENTS)
+
+    scores = bm25.scores("robots vision")
+
+    assert scores[3] > scores[0]
+
+
+def test_bm25_search_returns_top_positions_in_corpus_order():
+    bm25 = BM25Index(DOCUMENTS)
+
+    assert bm25.search("robot vision robots", top_n=2).tolist() == [2, 3]
+    assert bm25.search("anything", top_n=10).tolist() == [0, 1, 2, 3]
+
+
+def test_bm25_unknown_terms_and_empty_corpus():
+    assert not BM25Index(DOCUMENTS).scores("quantum").any()
+    assert BM25Index([]).search("vision", top_n=5).tolist() == []
+
+
+def test_professor_documents_joins_retrieval_fields():
+    df = pd.DataFrame(
+        {
+            "name": ["Ada", "Alan"],
+            "research_focus": ["Vision", None],
+            "department": ["CS", "Math"],
+            "lab_group": [None, "Logic Lab"],
+        }
+    )
+
+    assert professor_documents(df) == ["Vision CS ", " Math Logic Lab"]
+    assert professor_documents(df[["name"]]) == ["", ""]
+
+
+def test_recall_at_k():
+    assert recall_at_k(["a", "b", "c"], ["c", "a", "x"], k=2) == 0.5
+    assert recall_at_k(["a", "b"], ["b", "a"], k=2) == 1.0
+    assert recall_at_k([], ["a"], k=3) == 1.0
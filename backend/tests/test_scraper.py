@@ -0,0 +1,92 @@
+import asyncio
+
+import pytest
+
+from app.services import scraper
+from app.services.scraper import AsyncTokenBucket, throttle
+
+
+class FakeClock:
+    """monotonic() that only moves when the code under test sleeps."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.sleeps.append(round(seconds, 6))
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(scraper.time, "monotonic", clock.monotonic)
+    monkeypatch.setattr(scraper.asyncio, "sleep", clock.sleep)
+    return clock
+
+
+def acquire(bucket, times):
+    async def run():
+        for _ in range(times):
+            await bucket.acquire()
+
+    asyncio.run(run())
+
+
+def test_bucket_allows_a_burst_then_paces_requests(clock):
+    bucket = AsyncTokenBucket(rate=0.5, capacity=2)
+
+    acquire(bucket, 3)
+
+    assert clock.sleeps == [2.0]
+
+
+def test_idle_time_refills_no_more_than_capacity(clock):
+    bucket = AsyncTokenBucket(rate=0.5, capacity=2)
+    acquire(bucket, 2)
+
+    clock.now += 60
+    acquire(bucket, 3)
+
+    assert clock.sleeps == [2.0]
+
+
+def test_each_host_gets_its_own_bucket(clock, monkeypatch):
+    monkeypatch.setattr(scraper, "_host_buckets", {})
+    monkeypatch.setattr(scraper, "HOST_RATE_PER_SECOND", 0.5)
+    monkeypatch.setattr(scraper, "HOST_BURST", 1)
+
+    async def run():
+        await throttle("https://cs.a.edu/people")
+        await throttle("https://cs.b.edu/people")
+        await throttle("https://cs.a.edu/people/ada")
+
+    asyncio.run(run())
+
+    # Only the second request to cs.a.edu waited
+    assert clock.sleeps == [2.0]
+    assert sorted(scraper._host_buckets) == ["cs.a.edu", "cs.b.edu"]
+
+
+def test_waiting_for_a_token_leaves_the_event_loop_free():
+    bucket = AsyncTokenBucket(rate=20, capacity=1)
+    events = []
+
+    async def fetch():
+        await bucket.acquire()
+        events.append("fetch")
+
+    async def other_work():
+        await asyncio.sleep(0)
+        events.append("other")
+
+    async def run():
+        await asyncio.gather(fetch(), fetch(), other_work())
+
+    asyncio.run(run())
+
+    assert events == ["fetch", "other", "fetch"]